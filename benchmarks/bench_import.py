@@ -0,0 +1,153 @@
+"""插件冷启动基准测试
+
+测量插件加载（导入 main 模块）的耗时和常驻内存，并检查重量级子系统
+（PIL 绘图、AI 提示词、AI 复盘）是否被延迟到首次使用时才导入。
+
+最后在独立的子进程中各重复加载数次，与基线对比：基线在加载时一并导入
+全部重量级子系统（即改为按需导入之前的加载方式），取耗时和内存增量的中位数。
+
+需要在装有 AstrBot 的环境中运行（插件目录的上一级会被加入 sys.path）：
+    python benchmarks/bench_import.py [重复次数]
+"""
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_PACKAGE = os.path.basename(PLUGIN_DIR)
+
+# 插件加载阶段不应出现的模块（相对插件包名）
+HEAVY_MODULES = {
+    "PIL 绘图": "PIL",
+    "AI 提示词": f"{PLUGIN_PACKAGE}.services.ai.prompts",
+    "AI 玩家服务": f"{PLUGIN_PACKAGE}.services.ai.service",
+    "AI 复盘": f"{PLUGIN_PACKAGE}.services.ai_reviewer",
+}
+
+# 基线：加载时一并导入的子系统
+EAGER_MODULES = [
+    f"{PLUGIN_PACKAGE}.services.ai",
+    f"{PLUGIN_PACKAGE}.services.ai_reviewer",
+    f"{PLUGIN_PACKAGE}.draw",
+]
+
+# 对比时默认的重复次数
+DEFAULT_REPEATS = 5
+
+
+def get_rss_mb() -> float:
+    """获取当前进程常驻内存（MB）"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 返回字节，Linux 返回 KB
+    return usage / 1024 / 1024 if sys.platform == "darwin" else usage / 1024
+
+
+def measure(label: str, func) -> None:
+    """执行 func 并打印耗时和内存变化"""
+    rss_before = get_rss_mb()
+    start = time.perf_counter()
+    func()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    rss_after = get_rss_mb()
+    print(
+        f"{label:<16} 耗时 {elapsed_ms:8.1f} ms | "
+        f"RSS {rss_before:7.1f} MB -> {rss_after:7.1f} MB (+{rss_after - rss_before:.1f} MB)"
+    )
+
+
+def report_heavy_modules(stage: str) -> None:
+    """打印重量级模块的加载状态"""
+    loaded = [name for name, module in HEAVY_MODULES.items() if module in sys.modules]
+    print(f"  [{stage}] 已加载的重量级模块：{', '.join(loaded) if loaded else '无'}")
+
+
+def load_once(mode: str) -> None:
+    """子进程：加载一次插件，输出 {"ms": 耗时, "rss_mb": 内存增量}
+
+    mode 为 lazy 时只导入 main；为 eager 时同时导入全部重量级子系统（基线）。
+    """
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+    importlib.import_module("astrbot.api.star")
+
+    rss_before = get_rss_mb()
+    start = time.perf_counter()
+    importlib.import_module(f"{PLUGIN_PACKAGE}.main")
+    if mode == "eager":
+        for module in EAGER_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps({"ms": elapsed_ms, "rss_mb": get_rss_mb() - rss_before}))
+
+
+def compare_with_baseline(repeats: int) -> None:
+    """在全新的子进程中分别加载 repeats 次，对比按需导入与基线"""
+    results = {}
+    for mode in ("eager", "lazy"):
+        samples = []
+        for _ in range(repeats):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode],
+                capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        results[mode] = (
+            statistics.median(s["ms"] for s in samples),
+            statistics.median(s["rss_mb"] for s in samples),
+        )
+
+    print(f"\n基线对比（{repeats} 次取中位数，每次为全新进程）：")
+    for mode, label in (("eager", "基线（全部导入）"), ("lazy", "按需导入")):
+        ms, rss = results[mode]
+        print(f"  {label:<10} 耗时 {ms:8.1f} ms | RSS +{rss:.1f} MB")
+    (eager_ms, eager_rss), (lazy_ms, lazy_rss) = results["eager"], results["lazy"]
+    if eager_ms > 0:
+        print(
+            f"  加载耗时减少 {eager_ms - lazy_ms:.1f} ms（{(eager_ms - lazy_ms) / eager_ms:.0%}），"
+            f"内存减少 {eager_rss - lazy_rss:.1f} MB"
+        )
+
+
+def main() -> None:
+    if len(sys.argv) >= 3 and sys.argv[1] == "--child":
+        load_once(sys.argv[2])
+        return
+    repeats = int(sys.argv[1]) if len(sys.argv) >= 2 else DEFAULT_REPEATS
+
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+
+    # AstrBot 本身的导入成本不计入插件加载
+    measure("导入 AstrBot", lambda: importlib.import_module("astrbot.api.star"))
+
+    measure("加载插件", lambda: importlib.import_module(f"{PLUGIN_PACKAGE}.main"))
+    report_heavy_modules("加载后")
+
+    # 模拟首次使用：AI 玩家服务、AI 复盘、帮助菜单绘图
+    measure("首次AI行动", lambda: importlib.import_module(f"{PLUGIN_PACKAGE}.services.ai"))
+    measure("首次复盘", lambda: importlib.import_module(f"{PLUGIN_PACKAGE}.services.ai_reviewer"))
+    try:
+        measure("首次绘图", lambda: importlib.import_module(f"{PLUGIN_PACKAGE}.draw"))
+    except ImportError as e:
+        print(f"首次绘图         跳过（{e}）")
+    report_heavy_modules("首次使用后")
+
+    compare_with_baseline(repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""板子平衡性模拟
+
+用规则型机器人（不调用LLM）按真实昼夜规则自我对局，输出各阵营胜率、
+95% 置信区间和模拟吞吐（局/秒）。不依赖 AstrBot，可直接运行：
+    python benchmarks/simulate_balance.py                      # 默认 9 人局（3狼 + 预女猎 + 3民）
+    python benchmarks/simulate_balance.py --wolves 4 --villagers 5 --games 200000
+    python benchmarks/simulate_balance.py --workers 1          # 单进程（对比吞吐）
+    python benchmarks/simulate_balance.py --check              # 自检：默认板子狼人胜率应在合理范围内
+"""
+import argparse
+import importlib
+import os
+import sys
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_PACKAGE = os.path.basename(PLUGIN_DIR)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="狼人杀板子平衡性模拟")
+    parser.add_argument("--wolves", type=int, default=3, help="狼人数")
+    parser.add_argument("--seers", type=int, default=1, help="预言家数")
+    parser.add_argument("--witches", type=int, default=1, help="女巫数")
+    parser.add_argument("--hunters", type=int, default=1, help="猎人数")
+    parser.add_argument("--villagers", type=int, default=3, help="平民数")
+    parser.add_argument("--games", type=int, default=100000, help="模拟局数")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--check", action="store_true", help="模拟默认板子，狼人胜率超出合理范围时以非零状态退出")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+    models = importlib.import_module(f"{PLUGIN_PACKAGE}.models")
+    simulator = importlib.import_module(f"{PLUGIN_PACKAGE}.simulation.simulator")
+
+    if args.check:
+        sys.exit(check_default_board(models, simulator, args))
+
+    config = models.GameConfig(
+        total_players=args.wolves + args.seers + args.witches + args.hunters + args.villagers,
+        werewolf_count=args.wolves,
+        seer_count=args.seers,
+        witch_count=args.witches,
+        hunter_count=args.hunters,
+        villager_count=args.villagers,
+    )
+    print(f"板子：{config.total_players}人局 {config.werewolf_count}狼 + {config.get_role_description()} + {config.villager_count}民")
+    result = simulator.simulate(config, games=args.games, workers=args.workers, seed=args.seed)
+    print(result.format())
+
+
+def check_default_board(models, simulator, args) -> int:
+    """默认板子自检：狼人胜率落在 PLAUSIBLE_WOLF_WIN_RATE 内返回 0，否则返回 1"""
+    config = models.GameConfig.default()
+    result = simulator.simulate(config, games=args.games, workers=args.workers, seed=args.seed)
+    print(result.format())
+
+    low, high = simulator.PLAUSIBLE_WOLF_WIN_RATE
+    wolf_rate = result.werewolf_wins / result.games
+    if low <= wolf_rate <= high:
+        print(f"✅ 默认板子狼人胜率 {wolf_rate:.1%} 在合理范围（{low:.0%} ~ {high:.0%}）内")
+        return 0
+    print(f"❌ 默认板子狼人胜率 {wolf_rate:.1%} 超出合理范围（{low:.0%} ~ {high:.0%}），请检查机器人策略")
+    return 1
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """狼人杀插件样式配置 - 暗夜狼嚎主题"""
 import os
+from functools import lru_cache
 from PIL import ImageFont
 
 # --- 基础配置 ---
@@ -68,8 +69,9 @@ FONT_PATH_BOLD = os.path.join(
 )
 
 
+@lru_cache(maxsize=None)
 def load_font(size: int) -> ImageFont.FreeTypeFont:
-    """加载字体，失败则使用默认字体"""
+    """加载字体，失败则使用默认字体（按字号缓存）"""
     try:
         if os.path.exists(FONT_PATH_BOLD):
             return ImageFont.truetype(FONT_PATH_BOLD, size)
@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING, AsyncGenerator
 from astrbot.api.event import AstrMessageEvent
 
 from .base import BaseCommandHandler
-from ..models import GamePhase
+from ..models import EventType, GamePhase
 from ..utils import cmd
 
 if TYPE_CHECKING:
@@ -165,14 +165,11 @@ class DayCommandHandler(BaseCommandHandler):
         # 记录投票
         room.vote_state.day_votes[player_id] = target_id
 
-        # 记录日志
+        # 记录事件
         voter = room.get_player(player_id)
         target = room.get_player(target_id)
         is_pk = room.vote_state.is_pk_vote
-        if is_pk:
-            room.log(f"🗳️ PK投票：{voter.display_name} 投给 {target.display_name}")
-        else:
-            room.log(f"🗳️ {voter.display_name} 投票给 {target.display_name}")
+        room.record_event(EventType.VOTE, voter.display_name, target.display_name, is_pk=is_pk, ai=False)
 
         # 同步投票到所有AI玩家上下文
         for p in room.players.values():
@@ -195,6 +192,9 @@ class DayCommandHandler(BaseCommandHandler):
         if not group_id:
             return
 
+        # 插件重启后尚未恢复的对局，借本条消息的Bot恢复
+        await self.game_manager.recover_pending(group_id, event.bot)
+
         room = self.game_manager.get_room(group_id)
         if not room:
             return
@@ -5,7 +5,7 @@ from astrbot.api.event import AstrMessageEvent
 from astrbot.api import logger
 
 from .base import BaseCommandHandler
-from ..models import GamePhase, Role
+from ..models import EventType, GamePhase, Role
 from ..utils import cmd
 
 if TYPE_CHECKING:
@@ -55,9 +55,9 @@ class NightCommandHandler(BaseCommandHandler):
         # 记录投票
         room.vote_state.night_votes[player_id] = target_id
 
-        # 记录日志
+        # 记录事件
         target_player = room.get_player(target_id)
-        room.log(f"🐺 {player.display_name}（狼人）选择刀 {target_player.display_name}")
+        room.record_event(EventType.WOLF_VOTE, player.display_name, target_player.display_name, ai=False)
 
         # 同步刀人选择到AI狼人队友上下文
         for teammate in room.get_alive_werewolves():
@@ -144,7 +144,7 @@ class NightCommandHandler(BaseCommandHandler):
         import time
         room.wolf_last_chat_time = time.time()
 
-        room.log(f"💬 {player.display_name}（狼人）密谋：{message_text}")
+        room.record_event(EventType.WOLF_CHAT, player.display_name, text=message_text, ai=False)
         yield event.plain_result(f"✅ 消息已发送给 {success_count} 名队友！")
 
     async def seer_check(self, event: AstrMessageEvent) -> AsyncGenerator:
@@ -187,13 +187,15 @@ class NightCommandHandler(BaseCommandHandler):
         # 获取验人结果
         target_player = room.get_player(target_id)
         is_werewolf = target_player and target_player.role == Role.WEREWOLF
+        if target_player:
+            room.record_event(
+                EventType.CHECK, player.display_name, target_player.display_name, is_werewolf=bool(is_werewolf), ai=False
+            )
 
         if is_werewolf:
             result_msg = f"🔮 验人结果：\n\n玩家 {target_player.display_name} 是 🐺 狼人！"
-            room.log(f"🔮 {player.display_name}（预言家）验 {target_player.display_name}：狼人")
         else:
             result_msg = f"🔮 验人结果：\n\n玩家 {target_player.display_name} 是 ✅ 好人！"
-            room.log(f"🔮 {player.display_name}（预言家）验 {target_player.display_name}：好人")
 
         yield event.plain_result(result_msg)
 
@@ -239,7 +241,7 @@ class NightCommandHandler(BaseCommandHandler):
         witch_state.has_acted = True
 
         saved_player = room.get_player(room.last_killed_id)
-        room.log(f"💊 {player.display_name}（女巫）使用解药救了 {saved_player.display_name}")
+        room.record_event(EventType.SAVE, player.display_name, saved_player.display_name, ai=False)
 
         yield event.plain_result(f"✅ 你使用解药救了 {saved_player.display_name}！")
 
@@ -299,7 +301,7 @@ class NightCommandHandler(BaseCommandHandler):
         witch_state.has_acted = True
 
         target_player = room.get_player(target_id)
-        room.log(f"💊 {player.display_name}（女巫）使用毒药毒了 {target_player.display_name}")
+        room.record_event(EventType.POISON, player.display_name, target_player.display_name, ai=False)
 
         yield event.plain_result(f"✅ 你使用毒药毒了 {target_player.display_name}！")
 
@@ -331,7 +333,7 @@ class NightCommandHandler(BaseCommandHandler):
             return
 
         witch_state.has_acted = True
-        room.log(f"💊 {player.display_name}（女巫）选择不操作")
+        room.record_event(EventType.WITCH_PASS, player.display_name, ai=False)
 
         yield event.plain_result("✅ 你选择不操作！")
 
@@ -1,6 +1,7 @@
 """查询命令处理"""
+import asyncio
 import os
-from typing import TYPE_CHECKING, AsyncGenerator
+from typing import TYPE_CHECKING, AsyncGenerator, Optional, Tuple
 from astrbot.api.event import AstrMessageEvent
 from astrbot.api import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
@@ -8,6 +9,8 @@ from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 from .base import BaseCommandHandler
 from ..models import GamePhase, Role
 from ..roles import RoleFactory
+from ..services.game_stats import LEADERBOARD_MIN_GAMES
+from ..utils import get_command_prefix
 
 if TYPE_CHECKING:
     from ..services import GameManager
@@ -18,9 +21,31 @@ class QueryCommandHandler(BaseCommandHandler):
 
     def __init__(self, game_manager: "GameManager"):
         super().__init__(game_manager)
-        # 使用 AstrBot 数据目录下的临时文件夹
+        # 使用 AstrBot 数据目录下的临时文件夹（首次生成图片时再创建）
         self.tmp_dir = os.path.join(get_astrbot_data_path(), "werewolf_temp")
+        # 已渲染的菜单图片缓存键（人数, 命令前缀）
+        self._menu_key: Optional[Tuple[int, str]] = None
+
+    def _ensure_tmp_dir(self) -> str:
+        """确保临时文件夹存在"""
         os.makedirs(self.tmp_dir, exist_ok=True)
+        return self.tmp_dir
+
+    def render_menu(self) -> str:
+        """渲染菜单图片并返回路径（人数和前缀不变时复用已渲染的图片）"""
+        total_players = self.game_manager.config.total_players
+        key = (total_players, get_command_prefix())
+        output_path = os.path.join(self._ensure_tmp_dir(), "werewolf_menu.png")
+
+        if self._menu_key == key and os.path.exists(output_path):
+            return output_path
+
+        from ..draw import draw_menu_image
+
+        image = draw_menu_image(total_players)
+        image.save(output_path)
+        self._menu_key = key
+        return output_path
 
     async def check_role(self, event: AstrMessageEvent) -> AsyncGenerator:
         """查看角色（返回文本）"""
@@ -71,18 +96,113 @@ class QueryCommandHandler(BaseCommandHandler):
 
         yield event.plain_result(status_text)
 
+    async def show_stats(self, event: AstrMessageEvent) -> AsyncGenerator:
+        """查看本群战绩（只读聚合表）"""
+        group_id = event.get_group_id()
+        if not group_id:
+            yield event.plain_result("❌ 请在群聊中使用此命令！")
+            return
+
+        archive = self.game_manager.archive
+        if not archive:
+            yield event.plain_result("❌ 未开启对局存档，暂无战绩！")
+            return
+
+        player_id = event.get_sender_id()
+        loop = asyncio.get_running_loop()
+        try:
+            stats, roles = await loop.run_in_executor(None, archive.player_stats, group_id, player_id)
+        except Exception as e:
+            logger.error(f"[狼人杀] 查询战绩失败: {e}")
+            yield event.plain_result("❌ 查询战绩失败，请稍后再试！")
+            return
+
+        if not stats:
+            yield event.plain_result("📊 你在本群还没有已完成的对局！")
+            return
+
+        games, wins = stats["games"], stats["wins"]
+        text = (
+            f"📊 {stats['name']} 的本群战绩\n\n"
+            f"对局：{games} 局，胜 {wins} 局（胜率 {_percent(wins, games)}）\n"
+            f"MVP：{stats['mvps']} 次\n"
+            f"存活到结束：{stats['survived']} 局\n"
+        )
+        if stats["seer_checks"]:
+            text += f"预言家查杀：{stats['seer_wolf_hits']}/{stats['seer_checks']}（{_percent(stats['seer_wolf_hits'], stats['seer_checks'])}）\n"
+        if stats["good_votes"]:
+            text += f"好人投票命中狼人：{stats['good_votes_on_wolves']}/{stats['good_votes']}（{_percent(stats['good_votes_on_wolves'], stats['good_votes'])}）\n"
+        if roles:
+            text += "\n各身份战绩：\n"
+            for r in roles:
+                role = Role(r["role"])
+                text += f"  {role.emoji} {role.display_name}：{r['games']} 局，胜率 {_percent(r['wins'], r['games'])}\n"
+
+        yield event.plain_result(text.rstrip())
+
+    async def show_leaderboard(self, event: AstrMessageEvent) -> AsyncGenerator:
+        """查看本群排行榜（只读聚合表）"""
+        group_id = event.get_group_id()
+        if not group_id:
+            yield event.plain_result("❌ 请在群聊中使用此命令！")
+            return
+
+        archive = self.game_manager.archive
+        if not archive:
+            yield event.plain_result("❌ 未开启对局存档，暂无排行！")
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            rows = await loop.run_in_executor(None, archive.leaderboard, group_id)
+            summary = await loop.run_in_executor(None, archive.group_stats, group_id)
+        except Exception as e:
+            logger.error(f"[狼人杀] 查询排行失败: {e}")
+            yield event.plain_result("❌ 查询排行失败，请稍后再试！")
+            return
+
+        if not summary:
+            yield event.plain_result("📊 本群还没有已完成的对局！")
+            return
+
+        text = (
+            f"🏆 本群狼人杀排行\n\n"
+            f"共 {summary['games']} 局：狼人胜 {summary['werewolf_wins']} 局，好人胜 {summary['villager_wins']} 局\n\n"
+        )
+        if not rows:
+            text += f"暂无玩家达到 {LEADERBOARD_MIN_GAMES} 局，继续加油！"
+        for i, row in enumerate(rows, 1):
+            text += (
+                f"{i}. {row['name']} - 胜率 {_percent(row['wins'], row['games'])}"
+                f"（{row['wins']}/{row['games']}），MVP {row['mvps']} 次\n"
+            )
+        yield event.plain_result(text.rstrip())
+
+    async def rebuild_stats(self, event: AstrMessageEvent) -> AsyncGenerator:
+        """由对局存档重建战绩统计（管理员专用）"""
+        archive = self.game_manager.archive
+        if not archive:
+            yield event.plain_result("❌ 未开启对局存档！")
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            count = await loop.run_in_executor(None, archive.rebuild_stats)
+        except Exception as e:
+            logger.error(f"[狼人杀] 重建战绩统计失败: {e}")
+            yield event.plain_result(f"❌ 重建战绩统计失败：{e}")
+            return
+
+        logger.info(f"[狼人杀] 已重建战绩统计，共 {count} 局")
+        yield event.plain_result(f"✅ 已重建战绩统计，共 {count} 局对局")
+
     async def show_help(self, event: AstrMessageEvent) -> AsyncGenerator:
         """显示帮助（返回菜单图片）"""
         config = self.game_manager.config
 
         # 尝试生成菜单图片
         try:
-            from ..draw import draw_menu_image
-
-            image = draw_menu_image(config.total_players)
-            output_path = os.path.join(self.tmp_dir, "werewolf_menu.png")
-            image.save(output_path)
-
+            output_path = self.render_menu()
             yield event.image_result(output_path)
         except Exception as e:
             logger.warning(f"[狼人杀] 生成菜单图片失败: {e}，降级为文本")
@@ -95,6 +215,8 @@ class QueryCommandHandler(BaseCommandHandler):
                 "  /开始游戏 - 开始游戏（房主）\n"
                 "  /查角色 - 查看角色（私聊）\n"
                 "  /游戏状态 - 查看游戏状态\n"
+                "  /狼人杀战绩 - 查看自己在本群的战绩\n"
+                "  /狼人杀排行 - 查看本群排行榜\n"
                 "  /结束游戏 - 结束游戏（房主）\n\n"
                 f"游戏命令（使用编号1-{config.total_players}）：\n"
                 "  /办掉 编号 - 狼人夜晚办掉（如：/办掉 1）\n"
@@ -118,3 +240,8 @@ class QueryCommandHandler(BaseCommandHandler):
                 "• 好人胜利：狼人全部出局"
             )
             yield event.plain_result(help_text)
+
+
+def _percent(part: int, total: int) -> str:
+    """百分比文本"""
+    return f"{part * 100 // total}%" if total else "-"
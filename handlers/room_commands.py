@@ -212,6 +212,10 @@ class RoomCommandHandler(BaseCommandHandler):
         # 添加AI玩家
         ai_player = self.game_manager.add_ai_player(room, ai_name, ai_config)
 
+        # 房间内首个AI玩家加入时，在后台预热模型
+        if len(self.game_manager.get_ai_players(room)) == 1:
+            self.game_manager.schedule_ai_warmup()
+
         yield event.plain_result(
             f"{ai_player.name} 加入游戏！\n\n"
             f"当前人数：{room.player_count}/{self.game_manager.config.total_players}"
@@ -272,7 +276,7 @@ class RoomCommandHandler(BaseCommandHandler):
             return
 
         # 移除玩家
-        del room.players[ai_player_id]
+        room.remove_player(ai_player_id)
 
         yield event.plain_result(
             f"✅ AI玩家 {target_str} 已被踢出！\n\n"
@@ -4,6 +4,8 @@
 神职：预言家 + 女巫 + 猎人
 流程：创建房间 → 分配角色 → 夜晚（狼人办掉→预言家验人→女巫行动） → 白天投票 → 判断胜负
 """
+import asyncio
+
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
 from astrbot.api.event import filter, AstrMessageEvent
@@ -47,6 +49,12 @@ class WerewolfPlugin(Star):
         # 日志
         self._log_startup()
 
+        # 后台预热（字体、菜单图片；AI模型在AI玩家加入房间时才预热）
+        self._schedule_warmup()
+
+        # 恢复插件重启前中断的对局
+        self._schedule_recovery()
+
     def _init_command_prefix(self) -> None:
         """从 AstrBot 配置读取命令前缀"""
         try:
@@ -86,6 +94,37 @@ class WerewolfPlugin(Star):
             f"AI复盘：{ai_status}"
         )
 
+    def _schedule_warmup(self) -> None:
+        """插件加载后在后台预热，避免第一局承担冷启动开销"""
+        if not self.game_config.enable_warmup:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("[狼人杀] 当前没有运行中的事件循环，跳过预热")
+            return
+        self.game_manager.spawn_background(self._warm_up())
+
+    def _schedule_recovery(self) -> None:
+        """后台恢复中断的对局（没有事件循环时，等各群下一条消息再恢复）"""
+        if not self.game_manager.room_store:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("[狼人杀] 当前没有运行中的事件循环，中断的对局将在群消息到达时恢复")
+            return
+        self.game_manager.spawn_background(self.game_manager.recover_rooms())
+
+    async def _warm_up(self) -> None:
+        """预热字体和菜单图片（不构建AI服务，保持按需加载）"""
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.query_handler.render_menu)
+            logger.info("[狼人杀] 预热完成")
+        except Exception as e:
+            logger.warning(f"[狼人杀] 预热失败: {e}")
+
     # ==================== 房间管理命令 ====================
 
     @filter.command("创建房间")
@@ -228,6 +267,25 @@ class WerewolfPlugin(Star):
         async for result in self.query_handler.show_status(event):
             yield result
 
+    @filter.command("狼人杀战绩")
+    async def show_stats(self, event: AstrMessageEvent):
+        """查看自己在本群的战绩"""
+        async for result in self.query_handler.show_stats(event):
+            yield result
+
+    @filter.command("狼人杀排行")
+    async def show_leaderboard(self, event: AstrMessageEvent):
+        """查看本群排行榜"""
+        async for result in self.query_handler.show_leaderboard(event):
+            yield result
+
+    @filter.permission_type(PermissionType.ADMIN)
+    @filter.command("狼人杀重建统计")
+    async def rebuild_stats(self, event: AstrMessageEvent):
+        """由对局存档重建战绩统计（管理员专用）"""
+        async for result in self.query_handler.rebuild_stats(event):
+            yield result
+
     @filter.command("狼人杀帮助")
     async def show_help(self, event: AstrMessageEvent):
         """显示帮助信息"""
@@ -243,7 +301,18 @@ class WerewolfPlugin(Star):
 
     async def terminate(self):
         """插件终止时"""
-        # 清理所有房间
+        # 开启对局恢复时保存进行中的对局，重启后继续
+        if self.game_config.resume_interrupted_games:
+            await self.game_manager.suspend_rooms()
+
+        # 清理其余房间
         for group_id in list(self.game_manager.rooms.keys()):
             await self.game_manager.cleanup_room(group_id)
+
+        # 停止后台AI复盘
+        self.game_manager.close_review_queue()
+
+        # 写完排队中的对局存档
+        if self.game_manager.archive:
+            self.game_manager.archive.close()
         logger.info("[狼人杀] 插件已终止")
@@ -4,6 +4,8 @@ from .config import GameConfig
 from .player import Player
 from .room import GameRoom, VoteState, SpeakingState
 from .ai_player import AIPlayerConfig, AIPlayerContext
+from .events import EventLog, EventType, GameEvent, render_event
+from .replay import apply_event, replay_room
 
 __all__ = [
     "GamePhase",
@@ -15,4 +17,10 @@ __all__ = [
     "SpeakingState",
     "AIPlayerConfig",
     "AIPlayerContext",
+    "EventLog",
+    "EventType",
+    "GameEvent",
+    "render_event",
+    "apply_event",
+    "replay_room",
 ]
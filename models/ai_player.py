@@ -1,6 +1,23 @@
 """AI玩家数据模型"""
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+# 提示词段落顺序（to_prompt_sections 按此顺序输出）
+PROMPT_SECTION_ORDER = (
+    "rules", "first_day", "night_deaths", "exiles", "phase", "identity",
+    "wolf_chat", "seer_results", "alive", "witch", "summaries", "events", "speeches",
+    "votes", "vote_discussions",
+)
+
+# 记录类段落默认展示的最近条数（votes 指历史轮次的投票）
+PROMPT_SECTION_LIMITS = {
+    "wolf_chat": 10,
+    "summaries": 10,
+    "events": 10,
+    "speeches": 15,
+    "votes": 5,
+    "vote_discussions": 30,
+}
 
 
 @dataclass
@@ -40,6 +57,7 @@ class AIPlayerContext:
 
     # 游戏进程记录
     game_events: List[str] = field(default_factory=list)    # 重要事件记录
+    event_rounds: List[int] = field(default_factory=list)   # 各事件所属回合（与 game_events 一一对应）
     speeches: List[dict] = field(default_factory=list)      # 发言记录
     vote_history: List[dict] = field(default_factory=list)  # 投票记录
 
@@ -59,6 +77,10 @@ class AIPlayerContext:
     # 投票期间讨论记录（所有人可见，投票前的重要参考）
     vote_discussions: List[dict] = field(default_factory=list)  # [{player, content, round}, ...]
 
+    # 已结束回合的摘要（天亮时压缩，替代这些回合的原始记录）
+    round_summaries: List[dict] = field(default_factory=list)  # [{round, night, day, votes, claims, last_words, wolf_kills, wolf_chat}, ...]
+    compacted_round: int = 0            # 已压缩到第几回合
+
     def add_wolf_chat(self, sender_name: str, content: str, round_num: int) -> None:
         """添加狼人密谋消息"""
         self.wolf_chat_messages.append({
@@ -70,6 +92,7 @@ class AIPlayerContext:
     def add_event(self, event: str) -> None:
         """添加事件记录"""
         self.game_events.append(event)
+        self.event_rounds.append(self.current_round)
 
     def add_speech(self, player_name: str, content: str, is_pk: bool = False) -> None:
         """添加发言记录"""
@@ -89,10 +112,11 @@ class AIPlayerContext:
             "round": self.current_round
         })
 
-    def add_seer_result(self, target_name: str, is_werewolf: bool) -> None:
+    def add_seer_result(self, target_name: str, is_werewolf: bool, target_number: int = None) -> None:
         """添加验人结果"""
         self.seer_results.append({
             "target": target_name,
+            "target_number": target_number,
             "is_werewolf": is_werewolf,
             "round": self.current_round
         })
@@ -112,26 +136,52 @@ class AIPlayerContext:
 
     def to_prompt_context(self) -> str:
         """将上下文转换为提示词格式"""
+        return "\n".join(text for _, text in self.to_prompt_sections())
+
+    def to_prompt_sections(self, limits: Optional[Dict[str, int]] = None) -> List[Tuple[str, str]]:
+        """将上下文按段落转换为提示词，返回 [(段落key, 文本), ...]
+
+        Args:
+            limits: 各记录类段落展示的最近条数，覆盖 PROMPT_SECTION_LIMITS
+        """
+        sections = []
+        for key in PROMPT_SECTION_ORDER:
+            text = self.render_section(key, (limits or {}).get(key))
+            if text:
+                sections.append((key, text))
+        return sections
+
+    def render_section(self, key: str, limit: Optional[int] = None) -> str:
+        """渲染单个提示词段落（没有内容时返回空字符串）"""
+        if limit is None:
+            limit = PROMPT_SECTION_LIMITS.get(key, 0)
+        lines = getattr(self, f"_section_{key}")(limit)
+        return "\n".join(lines)
+
+    def _section_rules(self, limit: int) -> List[str]:
         # 在函数内部导入避免循环依赖
         from ..services.ai.prompts import GAME_RULES
 
-        lines = []
-
         # 📜 游戏规则说明（让所有AI了解基本规则，避免质疑女巫等角色的能力）
-        lines.append(GAME_RULES)
-        lines.append("")
+        return [GAME_RULES, ""]
 
+    def _section_first_day(self, limit: int) -> List[str]:
         # 🌅 首日特殊声明（防止AI产生虚假记忆）
         if self.current_round == 1 and len(self.speeches) == 0:
-            lines.append("🌅 【重要】这是游戏的第一天！")
-            lines.append("⚠️ 昨晚只分配了身份，没有任何玩家发言，没有任何公开信息。")
-            lines.append("⚠️ 严禁编造\"昨天XXX说了\"之类的虚假信息！")
-            lines.append("")
-
+            return [
+                "🌅 【重要】这是游戏的第一天！",
+                "⚠️ 昨晚只分配了身份，没有任何玩家发言，没有任何公开信息。",
+                "⚠️ 严禁编造\"昨天XXX说了\"之类的虚假信息！",
+                "",
+            ]
+        return []
+
+    def _section_night_deaths(self, limit: int) -> List[str]:
         # 🚨 昨晚死亡情况（最重要！放在最前面强调）
         last_night_deaths = [e for e in self.game_events if f"第{self.current_round}夜死亡" in e]
         last_night_peaceful = [e for e in self.game_events if f"第{self.current_round}夜：平安夜" in e]
 
+        lines = []
         if last_night_deaths:
             lines.append("🚨🚨🚨【昨晚死亡公告 - 必须认真阅读！】🚨🚨🚨")
             for death_event in last_night_deaths:
@@ -142,106 +192,158 @@ class AIPlayerContext:
             lines.append("🌙【昨晚是平安夜】")
             lines.append("昨晚没有人死亡，女巫可能救了人。")
             lines.append("")
+        return lines
 
+    def _section_exiles(self, limit: int) -> List[str]:
         # 🗳️ 投票放逐结果（重要！突出显示）
         exile_events = [e for e in self.game_events if "投票放逐" in e and "被放逐出局" in e]
-        if exile_events:
-            lines.append("🗳️🗳️🗳️【投票放逐记录 - 关键信息！】🗳️🗳️🗳️")
-            for exile_event in exile_events:
-                lines.append(f"⚖️ {exile_event}")
-            lines.append("💡 分析：谁投了被放逐者？谁保了他？这能暴露阵营！")
-            lines.append("")
+        if not exile_events:
+            return []
+        lines = ["🗳️🗳️🗳️【投票放逐记录 - 关键信息！】🗳️🗳️🗳️"]
+        for exile_event in exile_events:
+            lines.append(f"⚖️ {exile_event}")
+        lines.append("💡 分析：谁投了被放逐者？谁保了他？这能暴露阵营！")
+        lines.append("")
+        return lines
 
+    def _section_phase(self, limit: int) -> List[str]:
         # 当前阶段
-        if self.current_phase:
-            lines.append(f"【当前阶段】")
-            lines.append(f"⏰ {self.current_phase}")
-            lines.append("")
+        if not self.current_phase:
+            return []
+        return [f"【当前阶段】", f"⏰ {self.current_phase}", ""]
 
+    def _section_identity(self, limit: int) -> List[str]:
         # 基本信息
-        lines.append(f"【你的身份】")
-        lines.append(f"你是 {self.player_number}号玩家，身份是 {self.role_name}")
-
+        lines = [f"【你的身份】", f"你是 {self.player_number}号玩家，身份是 {self.role_name}"]
         if self.is_werewolf and self.werewolf_teammates:
             lines.append(f"你的狼人队友是：{', '.join(self.werewolf_teammates)}")
+        return lines
 
+    def _section_wolf_chat(self, limit: int) -> List[str]:
         # 狼人密谋记录（仅狼人可见）
-        if self.is_werewolf and self.wolf_chat_messages:
-            lines.append(f"\n【狼人密谋记录 - 绝密！严禁在白天提及！】")
-            lines.append(f"⚠️ 以下是你们狼人队友在夜晚的私密交流，只有狼人能看到，白天绝对不能透露！")
-            for msg in self.wolf_chat_messages[-10:]:  # 只显示最近10条
-                lines.append(f"[第{msg['round']}晚夜间密谋] {msg['sender']}: {msg['content']}")
-
+        if not (self.is_werewolf and self.wolf_chat_messages):
+            return []
+        lines = [
+            f"\n【狼人密谋记录 - 绝密！严禁在白天提及！】",
+            f"⚠️ 以下是你们狼人队友在夜晚的私密交流，只有狼人能看到，白天绝对不能透露！",
+        ]
+        for msg in self.wolf_chat_messages[-limit:]:
+            lines.append(f"[第{msg['round']}晚夜间密谋] {msg['sender']}: {msg['content']}")
+        return lines
+
+    def _section_seer_results(self, limit: int) -> List[str]:
         # 验人结果
-        if self.seer_results:
-            lines.append(f"\n【验人结果】")
-            for result in self.seer_results:
-                status = "狼人" if result["is_werewolf"] else "好人"
-                lines.append(f"第{result['round']}晚：{result['target']} 是 {status}")
-
+        if not self.seer_results:
+            return []
+        lines = [f"\n【验人结果】"]
+        for result in self.seer_results:
+            status = "狼人" if result["is_werewolf"] else "好人"
+            lines.append(f"第{result['round']}晚：{result['target']} 是 {status}")
+        return lines
+
+    def _section_alive(self, limit: int) -> List[str]:
         # 存活情况
-        lines.append(f"\n【当前存活玩家】")
-        lines.append(", ".join(self.alive_players) if self.alive_players else "无")
-
+        lines = [f"\n【当前存活玩家】", ", ".join(self.alive_players) if self.alive_players else "无"]
         if self.dead_players:
             lines.append(f"\n【已死亡玩家】")
             lines.append(", ".join(self.dead_players))
+        return lines
 
+    def _section_witch(self, limit: int) -> List[str]:
         # 女巫药水状态
-        if self.role_name == "女巫":
-            lines.append(f"\n【你的女巫技能信息 - 仅你可见】")
-            lines.append(f"解药：{'已用' if self.witch_antidote_used else '可用'}")
-            lines.append(f"毒药：{'已用' if self.witch_poison_used else '可用'}")
-            if self.last_killed_player:
-                lines.append(f"今晚被狼人杀死的是：{self.last_killed_player}")
-            if self.witch_saved_player:
-                lines.append(f"🩹 你救过的人：{self.witch_saved_player}")
-            if self.witch_poisoned_player:
-                lines.append(f"☠️ 你毒过的人：{self.witch_poisoned_player}")
-            lines.append(f"（注：以上是你作为女巫的私密视角，公开说出会暴露身份，除非你决定跳女巫）")
-
+        if self.role_name != "女巫":
+            return []
+        lines = [
+            f"\n【你的女巫技能信息 - 仅你可见】",
+            f"解药：{'已用' if self.witch_antidote_used else '可用'}",
+            f"毒药：{'已用' if self.witch_poison_used else '可用'}",
+        ]
+        if self.last_killed_player:
+            lines.append(f"今晚被狼人杀死的是：{self.last_killed_player}")
+        if self.witch_saved_player:
+            lines.append(f"🩹 你救过的人：{self.witch_saved_player}")
+        if self.witch_poisoned_player:
+            lines.append(f"☠️ 你毒过的人：{self.witch_poisoned_player}")
+        lines.append(f"（注：以上是你作为女巫的私密视角，公开说出会暴露身份，除非你决定跳女巫）")
+        return lines
+
+    def _section_summaries(self, limit: int) -> List[str]:
+        # 往轮回顾（已压缩回合的摘要）
+        if not self.round_summaries:
+            return []
+        lines = [f"\n【往轮回顾】"]
+        for summary in self.round_summaries[-limit:]:
+            parts = []
+            if summary["night"]:
+                parts.append(f"夜里{summary['night']}")
+            if summary["day"]:
+                parts.append(f"白天{'，'.join(summary['day'])}")
+            lines.append(f"第{summary['round']}轮：{'；'.join(parts) or '无人出局'}")
+            if summary["votes"]:
+                lines.append(f"  投票：{'；'.join(summary['votes'])}")
+            if summary["claims"]:
+                lines.append(f"  跳身份/报查验：{'；'.join(summary['claims'])}")
+            for last_words in summary["last_words"]:
+                lines.append(f"  遗言 {last_words}")
+            if summary.get("wolf_kills"):
+                lines.append(f"  狼队刀人：{'；'.join(summary['wolf_kills'])}")
+            if summary.get("wolf_chat"):
+                lines.append(f"  狼队密谋：{summary['wolf_chat']}")
+        return lines
+
+    def _section_events(self, limit: int) -> List[str]:
         # 重要事件
-        if self.game_events:
-            lines.append(f"\n【重要事件】")
-            for event in self.game_events[-10:]:  # 只显示最近10条
-                lines.append(f"- {event}")
-
+        if not self.game_events:
+            return []
+        lines = [f"\n【重要事件】"]
+        for event in self.game_events[-limit:]:
+            lines.append(f"- {event}")
+        return lines
+
+    def _section_speeches(self, limit: int) -> List[str]:
         # 发言记录
-        if self.speeches:
-            lines.append(f"\n【发言记录】")
-            for speech in self.speeches[-15:]:  # 只显示最近15条
-                prefix = "[PK]" if speech.get("is_pk") else ""
-                lines.append(f"{prefix}{speech['player']}: {speech['content'][:100]}")
-
+        if not self.speeches:
+            return []
+        lines = [f"\n【发言记录】"]
+        for speech in self.speeches[-limit:]:
+            prefix = "[PK]" if speech.get("is_pk") else ""
+            lines.append(f"{prefix}{speech['player']}: {speech['content'][:100]}")
+        return lines
+
+    def _section_votes(self, limit: int) -> List[str]:
         # 投票记录（重要！分析投票可以推断阵营）
-        if self.vote_history:
-            lines.append(f"\n🗳️【投票记录 - 分析投票方向可推断阵营！】")
-            # 按轮次分组显示
-            current_round_votes = [v for v in self.vote_history if v.get("round") == self.current_round]
-            prev_round_votes = [v for v in self.vote_history if v.get("round") != self.current_round]
-
-            if prev_round_votes:
-                lines.append("历史投票：")
-                for vote in prev_round_votes[-5:]:
-                    prefix = "[PK]" if vote.get("is_pk") else ""
-                    lines.append(f"  {prefix}第{vote['round']}轮: {vote['voter']} → {vote['target']}")
-
-            if current_round_votes:
-                lines.append("本轮投票：")
-                for vote in current_round_votes:
-                    prefix = "[PK]" if vote.get("is_pk") else ""
-                    lines.append(f"  {prefix}{vote['voter']} → {vote['target']}")
-
-            lines.append("💡 思考：投同一人的可能是同阵营，保人的要警惕！")
-
+        if not self.vote_history:
+            return []
+        lines = [f"\n🗳️【投票记录 - 分析投票方向可推断阵营！】"]
+        # 按轮次分组显示
+        current_round_votes = [v for v in self.vote_history if v.get("round") == self.current_round]
+        prev_round_votes = [v for v in self.vote_history if v.get("round") != self.current_round]
+
+        if prev_round_votes:
+            lines.append("历史投票：")
+            for vote in prev_round_votes[-limit:]:
+                prefix = "[PK]" if vote.get("is_pk") else ""
+                lines.append(f"  {prefix}第{vote['round']}轮: {vote['voter']} → {vote['target']}")
+
+        if current_round_votes:
+            lines.append("本轮投票：")
+            for vote in current_round_votes:
+                prefix = "[PK]" if vote.get("is_pk") else ""
+                lines.append(f"  {prefix}{vote['voter']} → {vote['target']}")
+
+        lines.append("💡 思考：投同一人的可能是同阵营，保人的要警惕！")
+        return lines
+
+    def _section_vote_discussions(self, limit: int) -> List[str]:
         # 投票期间讨论（重要！这是投票前的最新观点）
-        if self.vote_discussions:
-            current_round_discussions = [d for d in self.vote_discussions if d.get("round") == self.current_round]
-            if current_round_discussions:
-                lines.append(f"\n💬💬💬【投票期间讨论 - 必读！这是大家投票前的最新观点！】💬💬💬")
-                lines.append("⚠️ 以下是在投票阶段，大家针对本次投票发表的看法和讨论：")
-                for disc in current_round_discussions:  # 显示全部
-                    lines.append(f"  💭 {disc['player']}：{disc['content'][:120]}")
-                lines.append("💡 分析：谁在带节奏？谁在保谁？谁在攻击谁？这些讨论会影响投票结果！")
-
-        return "\n".join(lines)
+        current_round_discussions = [d for d in self.vote_discussions if d.get("round") == self.current_round]
+        if not current_round_discussions:
+            return []
+        lines = [
+            f"\n💬💬💬【投票期间讨论 - 必读！这是大家投票前的最新观点！】💬💬💬",
+            "⚠️ 以下是在投票阶段，大家针对本次投票发表的看法和讨论：",
+        ]
+        for disc in current_round_discussions[-limit:]:
+            lines.append(f"  💭 {disc['player']}：{disc['content'][:120]}")
+        lines.append("💡 分析：谁在带节奏？谁在保谁？谁在攻击谁？这些讨论会影响投票结果！")
+        return lines
@@ -35,6 +35,57 @@ class GameConfig:
     enable_ai_review: bool = True
     ai_review_model: str = ""
     ai_review_prompt: str = ""
+    ai_review_timeout: int = 120
+    ai_review_mode: str = "auto"  # auto / single / map_reduce
+    enable_game_report: bool = True
+
+    # 调试配置
+    debug_index_check: bool = False
+
+    # 预热配置
+    enable_warmup: bool = True
+    warmup_probe_request: bool = False
+
+    # AI决策协议配置
+    ai_structured_output: bool = True
+    ai_wolf_team_mode: bool = True
+    ai_stream_speech: bool = True
+    ai_early_exit: bool = True
+
+    # 规则决策配置（llm / heuristic）
+    ai_brain_mode: str = "llm"
+    ai_decision_deadline: int = 60
+
+    # 模型路由配置（按行动分快速档/强档，负载高或阶段快超时时降级）
+    ai_fast_model: str = ""
+    ai_model_routes: List[str] = field(default_factory=list)
+    ai_route_queue_threshold: int = 4
+    ai_route_deadline_margin: int = 20
+
+    # 对冲请求配置
+    ai_fallback_models: List[str] = field(default_factory=list)
+    ai_hedge_percentile: float = 0.9
+    ai_hedge_min_delay: float = 3.0
+
+    # 响应缓存配置（回放/回归测试用，线上对局不建议开启）
+    ai_response_cache: bool = False
+
+    # 发言行为标签定义（"标签:关键词1,关键词2"，覆盖或追加默认标签）
+    ai_behavior_tags: List[str] = field(default_factory=list)
+
+    # 天亮时压缩往轮记录为摘要
+    ai_round_compaction: bool = True
+
+    # 房间持久化与重启恢复
+    enable_room_persistence: bool = True
+    resume_interrupted_games: bool = True
+
+    # 对局存档（SQLite）
+    enable_game_archive: bool = True
+
+    # 上下文预算配置（token，0表示不限制）
+    ai_context_budget: int = 3000
+    ai_context_budget_overrides: List[str] = field(default_factory=list)
 
     def get_roles_pool(self) -> List[Role]:
         """获取角色池"""
@@ -96,6 +147,33 @@ class GameConfig:
             enable_ai_review=config.get("enable_ai_review", True),
             ai_review_model=config.get("ai_review_model", ""),
             ai_review_prompt=config.get("ai_review_prompt", ""),
+            ai_review_timeout=config.get("ai_review_timeout", 120),
+            ai_review_mode=config.get("ai_review_mode", "auto"),
+            enable_game_report=config.get("enable_game_report", True),
+            debug_index_check=config.get("debug_index_check", False),
+            enable_warmup=config.get("enable_warmup", True),
+            warmup_probe_request=config.get("warmup_probe_request", False),
+            ai_structured_output=config.get("ai_structured_output", True),
+            ai_wolf_team_mode=config.get("ai_wolf_team_mode", True),
+            ai_stream_speech=config.get("ai_stream_speech", True),
+            ai_early_exit=config.get("ai_early_exit", True),
+            ai_brain_mode=config.get("ai_brain_mode", "llm"),
+            ai_decision_deadline=config.get("ai_decision_deadline", 60),
+            ai_fast_model=config.get("ai_fast_model", ""),
+            ai_model_routes=list(config.get("ai_model_routes", [])),
+            ai_route_queue_threshold=config.get("ai_route_queue_threshold", 4),
+            ai_route_deadline_margin=config.get("ai_route_deadline_margin", 20),
+            ai_fallback_models=list(config.get("ai_fallback_models", [])),
+            ai_hedge_percentile=config.get("ai_hedge_percentile", 0.9),
+            ai_hedge_min_delay=config.get("ai_hedge_min_delay", 3.0),
+            ai_response_cache=config.get("ai_response_cache", False),
+            ai_behavior_tags=list(config.get("ai_behavior_tags", [])),
+            ai_round_compaction=config.get("ai_round_compaction", True),
+            enable_room_persistence=config.get("enable_room_persistence", True),
+            resume_interrupted_games=config.get("resume_interrupted_games", True),
+            enable_game_archive=config.get("enable_game_archive", True),
+            ai_context_budget=config.get("ai_context_budget", 3000),
+            ai_context_budget_overrides=list(config.get("ai_context_budget_overrides", [])),
         )
 
     @classmethod
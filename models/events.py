@@ -0,0 +1,186 @@
+"""游戏事件模型 - 结构化事件记录，按回合和类型建立索引
+
+事件记录是对局的唯一事实来源：游戏日志文本（复盘用）由 render_event 渲染得到，
+房间状态可通过 models.replay 在任意事件位置重建。
+"""
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class EventType(Enum):
+    """事件类型"""
+    GAME_START = "game_start"  # 开局（data.players 为玩家编号、昵称、身份）
+    ROUND_START = "round_start"  # 入夜
+    WOLF_VOTE = "wolf_vote"  # 单个狼人选择刀人（actor 为空表示AI兜底）
+    WOLF_CHAT = "wolf_chat"  # 狼人密谋
+    KILL = "kill"          # 狼人最终刀人（target 为空表示无人被刀；仅狼人和女巫可知）
+    SAVE = "save"          # 女巫救人（仅女巫可知）
+    POISON = "poison"      # 女巫毒人（仅女巫可知）
+    WITCH_PASS = "witch_pass"  # 女巫不操作
+    CHECK = "check"        # 预言家查验（仅预言家可知）
+    DAWN = "dawn"          # 天亮公布（data.deaths 为死亡名单，空表示平安夜）
+    DEATH = "death"        # 玩家死亡（公开）
+    SPEECH = "speech"      # 白天/PK发言
+    LAST_WORDS = "last_words"  # 遗言
+    VOTE = "vote"          # 投票（target 为空表示弃票）
+    EXILE = "exile"        # 投票放逐（公开）
+    NO_EXILE = "no_exile"  # 投票后无人出局（data.reason: timeout/tie/pk_tie/none）
+    SHOT = "shot"          # 猎人开枪（target 为空表示未开枪）
+    CLAIM = "claim"        # 发言中跳身份/报查验（公开）
+    GAME_END = "game_end"  # 对局结束（data.winner）
+
+
+@dataclass
+class GameEvent:
+    """游戏事件
+
+    actor/target 为玩家显示名（如"3号.小明"），附加信息放在 data 中。
+    """
+    type: EventType
+    round: int
+    actor: Optional[str] = None
+    target: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可JSON保存的字典"""
+        return {**asdict(self), "type": self.type.value}
+
+
+class EventLog:
+    """游戏事件记录（只追加），按回合、类型建立索引"""
+
+    def __init__(self):
+        self._events: List[GameEvent] = []
+        self._by_type: Dict[EventType, List[GameEvent]] = defaultdict(list)
+        self._by_round_type: Dict[Tuple[int, EventType], List[GameEvent]] = defaultdict(list)
+
+    def add(
+        self,
+        event_type: EventType,
+        round_num: int,
+        actor: Optional[str] = None,
+        target: Optional[str] = None,
+        **data: Any
+    ) -> GameEvent:
+        """追加一条事件"""
+        event = GameEvent(event_type, round_num, actor, target, data)
+        self._events.append(event)
+        self._by_type[event_type].append(event)
+        self._by_round_type[(round_num, event_type)].append(event)
+        return event
+
+    def of_type(self, event_type: EventType) -> List[GameEvent]:
+        """某类型的全部事件"""
+        return self._by_type.get(event_type, [])
+
+    def in_round(self, round_num: int, event_type: EventType) -> List[GameEvent]:
+        """某回合某类型的事件"""
+        return self._by_round_type.get((round_num, event_type), [])
+
+    def last(self, round_num: int, event_type: EventType) -> Optional[GameEvent]:
+        """某回合某类型的最后一条事件"""
+        events = self.in_round(round_num, event_type)
+        return events[-1] if events else None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def __getitem__(self, index):
+        return self._events[index]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """序列化为可JSON保存的列表"""
+        return [e.to_dict() for e in self._events]
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[Dict[str, Any]]) -> "EventLog":
+        """从 to_dicts 的结果恢复"""
+        log = cls()
+        for item in items:
+            log.add_dict(item)
+        return log
+
+    def add_dict(self, item: Dict[str, Any]) -> GameEvent:
+        """追加一条序列化的事件"""
+        return self.add(
+            EventType(item["type"]), item["round"],
+            item.get("actor"), item.get("target"), **item.get("data", {})
+        )
+
+
+# ==================== 日志渲染 ====================
+
+LOG_SEPARATOR = "=" * 30
+
+
+def _tag(role: str, event: GameEvent) -> str:
+    """玩家身份标注，如（狼人AI）"""
+    return f"（{role}{'AI' if event.data.get('ai') else ''}）"
+
+
+def render_event(event: GameEvent) -> Optional[str]:
+    """将事件渲染为游戏日志文本（不进入日志的事件返回 None）"""
+    t, actor, target, data = event.type, event.actor, event.target, event.data
+
+    if t == EventType.ROUND_START:
+        return f"{LOG_SEPARATOR}\n第{event.round}晚\n{LOG_SEPARATOR}"
+    if t == EventType.WOLF_VOTE:
+        if actor is None:
+            return f"🐺 狼人AI兜底：选择刀 {target}"
+        return f"🐺 {actor}{_tag('狼人', event)}选择刀 {target}"
+    if t == EventType.WOLF_CHAT:
+        return f"💬 {actor}{_tag('狼人', event)}密谋：{data.get('text', '')}"
+    if t == EventType.KILL:
+        if target is None:
+            return "🐺 狼人超时：未投票，今晚无人被刀"
+        return f"🌙 狼人最终决定刀 {target}"
+    if t == EventType.CHECK:
+        result = "狼人" if data.get("is_werewolf") else "好人"
+        return f"🔮 {actor}{_tag('预言家', event)}验 {target}：{result}"
+    if t == EventType.SAVE:
+        return f"💊 {actor}{_tag('女巫', event)}使用解药救了 {target}"
+    if t == EventType.POISON:
+        return f"💊 {actor}{_tag('女巫', event)}使用毒药毒了 {target}"
+    if t == EventType.WITCH_PASS:
+        return f"💊 {actor}{_tag('女巫', event)}选择不操作"
+    if t == EventType.SPEECH:
+        phase_tag = "💬PK发言" if data.get("is_pk") else "💬发言"
+        return f"{phase_tag}：{actor} - {data.get('text') or '[未捕获到文字内容]'}"
+    if t == EventType.LAST_WORDS:
+        return f"💀遗言：{actor} - {data.get('text') or '[未捕获到文字内容]'}"
+    if t == EventType.VOTE:
+        pk_tag = "PK" if data.get("is_pk") else ""
+        if not data.get("ai"):
+            if pk_tag:
+                return f"🗳️ PK投票：{actor} 投给 {target}"
+            return f"🗳️ {actor} 投票给 {target}"
+        if target is None:
+            note = f"（{data['note']}）" if data.get("note") else ""
+            return f"🗳️ {pk_tag}投票：{actor}（AI）弃票{note}"
+        return f"🗳️ {pk_tag}投票：{actor}（AI）投给 {target}"
+    if t == EventType.EXILE:
+        return f"📊 {'PK' if data.get('is_pk') else ''}投票结果：{target} 被放逐"
+    if t == EventType.NO_EXILE:
+        if data.get("reason") == "timeout":
+            return "📊 投票超时：无人投票，本轮无人出局"
+        if data.get("reason") == "pk_tie":
+            return "📊 PK投票结果：仍然平票，本轮无人出局"
+        return None
+    if t == EventType.SHOT:
+        if target is not None:
+            return f"🔫 {actor}{_tag('猎人', event)}开枪带走 {target}"
+        if data.get("reason") == "timeout":
+            return f"🔫 {actor}（猎人）超时未开枪"
+        return f"🔫 {actor}{_tag('猎人', event)}选择不开枪"
+    return None
+
+
+def render_log(events: Iterable[GameEvent]) -> List[str]:
+    """渲染完整游戏日志"""
+    return [line for line in map(render_event, events) if line is not None]
@@ -0,0 +1,126 @@
+"""对局重放 - 由事件记录重建任意时刻的房间状态
+
+事件记录只追加，重放从开局事件开始依次应用，得到的房间与实时对局在
+阶段、回合、存活、夜间/投票状态和女巫药剂上保持一致（定时器、AI上下文等运行时状态不在其中）。
+"""
+from typing import Dict, Iterable, Optional
+
+from .config import GameConfig
+from .enums import GamePhase, Role
+from .events import EventType, GameEvent
+from .player import Player
+from .room import GameRoom
+
+
+def replay_room(
+    events: Iterable[GameEvent],
+    upto: Optional[int] = None,
+    config: Optional[GameConfig] = None
+) -> GameRoom:
+    """按事件重建房间状态
+
+    Args:
+        events: 事件记录（EventLog 或事件列表），第一条须为开局事件
+        upto: 只应用前 upto 条事件（None 表示全部）
+        config: 房间配置（不传则使用默认配置）
+
+    Raises:
+        ValueError: 事件记录不以开局事件开头
+    """
+    events = list(events)[:upto]
+    if not events or events[0].type != EventType.GAME_START:
+        raise ValueError("事件记录须以开局事件开头")
+
+    start = events[0].data
+    room = GameRoom(
+        group_id=start.get("group_id", ""),
+        creator_id=start.get("creator_id", ""),
+        config=config or GameConfig(),
+    )
+    ids: Dict[str, str] = {}  # 显示名 -> 玩家ID
+    for info in start.get("players", []):
+        player = Player(info["id"], info["name"], info["number"], is_ai=info.get("is_ai", False))
+        if info.get("role"):
+            player.assign_role(Role(info["role"]))
+        room.add_player(player)
+        room.number_to_player[player.number] = player.id
+        ids[player.display_name] = player.id
+
+    for event in events:
+        room.events.add(event.type, event.round, event.actor, event.target, **event.data)
+        apply_event(room, event, ids)
+    return room
+
+
+def apply_event(room: GameRoom, event: GameEvent, ids: Optional[Dict[str, str]] = None) -> None:
+    """将单条事件应用到房间状态（不追加到事件记录）
+
+    Args:
+        ids: 显示名到玩家ID的映射（不传则按房间玩家生成）
+    """
+    if ids is None:
+        ids = {p.display_name: p.id for p in room.players.values()}
+    t = event.type
+    actor_id = ids.get(event.actor or "")
+    target_id = ids.get(event.target or "")
+
+    if t == EventType.GAME_START:
+        room.phase = GamePhase.NIGHT_WOLF
+        room.current_round = 0
+    elif t == EventType.ROUND_START:
+        room.start_new_night()
+        room.current_round = event.round
+    elif t == EventType.WOLF_VOTE:
+        if actor_id:
+            room.vote_state.night_votes[actor_id] = target_id
+        else:
+            # AI兜底：所有存活狼人投同一目标
+            for wolf in room.get_alive_werewolves():
+                room.vote_state.night_votes[wolf.id] = target_id
+    elif t == EventType.KILL:
+        room.vote_state.clear_night_votes()
+        room.last_killed_id = target_id
+        room.phase = GamePhase.NIGHT_SEER
+    elif t == EventType.CHECK:
+        room.seer_checked = True
+        room.phase = GamePhase.NIGHT_WITCH
+    elif t == EventType.SAVE:
+        room.witch_state.saved_player_id = target_id
+        room.witch_state.antidote_used = True
+        room.witch_state.has_acted = True
+    elif t == EventType.POISON:
+        room.witch_state.poisoned_player_id = target_id
+        room.witch_state.poison_used = True
+        room.witch_state.has_acted = True
+    elif t == EventType.WITCH_PASS:
+        room.witch_state.has_acted = True
+    elif t == EventType.DEATH:
+        if target_id:
+            room.kill_player(target_id)
+    elif t == EventType.DAWN:
+        if room.witch_state.saved_player_id:
+            room.last_killed_id = None
+        room.phase = GamePhase.DAY_SPEAKING
+    elif t == EventType.LAST_WORDS:
+        room.phase = GamePhase.LAST_WORDS
+    elif t == EventType.SPEECH:
+        room.end_first_night()
+        room.phase = GamePhase.DAY_PK if event.data.get("is_pk") else GamePhase.DAY_SPEAKING
+    elif t == EventType.VOTE:
+        room.phase = GamePhase.DAY_VOTE
+        room.vote_state.is_pk_vote = bool(event.data.get("is_pk"))
+        if actor_id:
+            room.vote_state.day_votes[actor_id] = target_id or "ABSTAIN"
+    elif t == EventType.EXILE:
+        room.vote_state.clear_day_votes()
+        room.last_killed_id = target_id
+        room.last_words_from_vote = True
+    elif t == EventType.NO_EXILE:
+        room.vote_state.clear_day_votes()
+        if event.data.get("reason") == "tie":
+            room.vote_state.pk_players = [ids[name] for name in event.data.get("pk_players", []) if name in ids]
+    elif t == EventType.SHOT:
+        room.hunter_state.has_shot = True
+        room.hunter_state.pending_shot_player_id = None
+    elif t == EventType.GAME_END:
+        room.phase = GamePhase.FINISHED
@@ -1,10 +1,13 @@
 """游戏房间数据模型"""
 from dataclasses import dataclass, field
-from typing import Dict, Set, List, Optional, Any, TYPE_CHECKING
+from typing import Dict, Set, List, Optional, Any, Tuple, TYPE_CHECKING
 import asyncio
+import time
+from dataclasses import asdict
 from .enums import GamePhase, Role
 from .player import Player
 from .config import GameConfig
+from .events import EventLog, EventType, GameEvent, render_log
 
 if TYPE_CHECKING:
     from ..roles import WitchState, HunterState
@@ -61,6 +64,7 @@ class GameRoom:
     # 游戏状态
     phase: GamePhase = GamePhase.WAITING
     current_round: int = 0                               # 当前回合数
+    started_at: Optional[float] = None                   # 开局时间戳
     is_first_night: bool = True                          # 是否第一晚
 
     # 夜晚状态
@@ -79,6 +83,9 @@ class GameRoom:
     # 遗言状态
     last_words_from_vote: bool = False                   # 遗言是否来自投票放逐
 
+    # AI配置
+    behavior_tags: Dict[str, List[str]] = field(default_factory=dict)  # 行为标签表 {玩家显示名: 最近一次发言的标签}
+
     # 子状态
     witch_state: Any = None  # WitchState, 延迟初始化避免循环导入
     hunter_state: Any = None  # HunterState, 延迟初始化避免循环导入
@@ -99,15 +106,74 @@ class GameRoom:
 
     # 定时器
     timer_task: Optional[asyncio.Task] = None
-
-    # 游戏日志
-    game_log: List[str] = field(default_factory=list)
+    timer_phase: Optional[GamePhase] = None              # 定时器所属阶段
+    timer_deadline: Optional[float] = None               # 定时器到期时间戳（重启后据此恢复定时器）
+
+    # 持久化
+    journal: Any = None  # RoomJournal，快照和预写日志（未启用持久化时为空）
+
+    # 游戏事件（只追加；日志文本、复盘和状态重放均由此派生）
+    events: EventLog = field(default_factory=EventLog)
+
+    # 玩家索引（随加入/移除、死亡、分配角色增量维护，存活人数和身份查询无需遍历玩家）
+    _alive: Dict[str, Player] = field(default_factory=dict, repr=False)              # {玩家ID: 存活玩家}
+    _by_role: Dict[Optional[Role], Dict[str, Player]] = field(default_factory=dict, repr=False)
+    _alive_by_role: Dict[Optional[Role], Dict[str, Player]] = field(default_factory=dict, repr=False)
+
+    # ========== 玩家索引 ==========
+
+    def _index(self, player: Player) -> None:
+        self._by_role.setdefault(player.role, {})[player.id] = player
+        if player.is_alive:
+            self._alive[player.id] = player
+            self._alive_by_role.setdefault(player.role, {})[player.id] = player
+
+    def _unindex(self, player: Player) -> None:
+        self._by_role.get(player.role, {}).pop(player.id, None)
+        self._alive.pop(player.id, None)
+        self._alive_by_role.get(player.role, {}).pop(player.id, None)
+
+    def reindex(self) -> None:
+        """按玩家列表重建索引（批量分配角色后调用，索引顺序与玩家列表一致）"""
+        self._alive.clear()
+        self._by_role.clear()
+        self._alive_by_role.clear()
+        for player in self.players.values():
+            self._index(player)
+        self._debug_check()
+
+    def check_indexes(self) -> None:
+        """一致性自检：索引与遍历玩家的结果不一致时抛出 AssertionError"""
+        alive = [p.id for p in self.players.values() if p.is_alive]
+        assert list(self._alive) == alive, f"存活索引不一致：{list(self._alive)} != {alive}"
+        for role in set(self._by_role) | {p.role for p in self.players.values()}:
+            members = [p.id for p in self.players.values() if p.role == role]
+            alive_members = [pid for pid in members if self.players[pid].is_alive]
+            assert sorted(self._by_role.get(role, {})) == sorted(members), f"{role} 身份索引不一致"
+            assert sorted(self._alive_by_role.get(role, {})) == sorted(alive_members), f"{role} 存活身份索引不一致"
+
+    def _debug_check(self) -> None:
+        if self.config.debug_index_check:
+            self.check_indexes()
 
     # ========== 玩家管理方法 ==========
 
     def add_player(self, player: Player) -> None:
         """添加玩家"""
+        old = self.players.get(player.id)
+        if old:
+            self._unindex(old)
         self.players[player.id] = player
+        self._index(player)
+        self._debug_check()
+
+    def remove_player(self, player_id: str) -> Optional[Player]:
+        """移除玩家"""
+        player = self.players.pop(player_id, None)
+        if player:
+            self._unindex(player)
+            self._debug_check()
+        return player
 
     def get_player(self, player_id: str) -> Optional[Player]:
         """获取玩家"""
@@ -120,19 +186,37 @@ class GameRoom:
 
     def get_alive_players(self) -> List[Player]:
         """获取所有存活玩家"""
-        return [p for p in self.players.values() if p.is_alive]
+        return list(self._alive.values())
 
     def get_alive_player_ids(self) -> Set[str]:
         """获取所有存活玩家ID"""
-        return {p.id for p in self.players.values() if p.is_alive}
+        return set(self._alive)
 
     def get_players_by_role(self, role: Role) -> List[Player]:
         """获取指定角色的所有玩家"""
-        return [p for p in self.players.values() if p.role == role]
+        return list(self._by_role.get(role, {}).values())
 
     def get_alive_players_by_role(self, role: Role) -> List[Player]:
         """获取指定角色的存活玩家"""
-        return [p for p in self.players.values() if p.role == role and p.is_alive]
+        return list(self._alive_by_role.get(role, {}).values())
+
+    def alive_role_count(self, role: Role) -> int:
+        """指定角色的存活人数"""
+        return len(self._alive_by_role.get(role, ()))
+
+    def alive_faction_counts(self) -> Tuple[int, int, int]:
+        """存活的 (狼人数, 好人数, 神职数)"""
+        wolves = gods = goods = 0
+        for role, members in self._alive_by_role.items():
+            if role is None:
+                continue
+            if role.is_werewolf:
+                wolves += len(members)
+            else:
+                goods += len(members)
+                if role.is_god:
+                    gods += len(members)
+        return wolves, goods, gods
 
     def get_werewolves(self) -> List[Player]:
         """获取所有狼人"""
@@ -148,14 +232,16 @@ class GameRoom:
 
     def is_player_alive(self, player_id: str) -> bool:
         """玩家是否存活"""
-        player = self.get_player(player_id)
-        return player.is_alive if player else False
+        return player_id in self._alive
 
     def kill_player(self, player_id: str) -> Optional[Player]:
         """杀死玩家"""
         player = self.get_player(player_id)
         if player:
+            self._alive.pop(player_id, None)
+            self._alive_by_role.get(player.role, {}).pop(player_id, None)
             player.kill()
+            self._debug_check()
         return player
 
     @property
@@ -166,7 +252,7 @@ class GameRoom:
     @property
     def alive_count(self) -> int:
         """存活玩家数量"""
-        return len(self.get_alive_players())
+        return len(self._alive)
 
     @property
     def is_full(self) -> bool:
@@ -175,20 +261,20 @@ class GameRoom:
 
     # ========== 角色查询方法 ==========
 
+    def _first_of_role(self, role: Role) -> Optional[Player]:
+        return next(iter(self._by_role.get(role, {}).values()), None)
+
     def get_seer(self) -> Optional[Player]:
         """获取预言家"""
-        seers = self.get_players_by_role(Role.SEER)
-        return seers[0] if seers else None
+        return self._first_of_role(Role.SEER)
 
     def get_witch(self) -> Optional[Player]:
         """获取女巫"""
-        witches = self.get_players_by_role(Role.WITCH)
-        return witches[0] if witches else None
+        return self._first_of_role(Role.WITCH)
 
     def get_hunter(self) -> Optional[Player]:
         """获取猎人"""
-        hunters = self.get_players_by_role(Role.HUNTER)
-        return hunters[0] if hunters else None
+        return self._first_of_role(Role.HUNTER)
 
     def is_seer_alive(self) -> bool:
         """预言家是否存活"""
@@ -250,31 +336,144 @@ class GameRoom:
     # ========== 定时器管理方法 ==========
 
     def cancel_timer(self) -> None:
-        """取消当前定时器"""
+        """取消当前定时器（同时清除到期时间，避免按过期的定时器判断阶段剩余时间）"""
         if self.timer_task and not self.timer_task.done():
             self.timer_task.cancel()
             self.timer_task = None
-
-    def set_timer(self, task: asyncio.Task) -> None:
-        """设置定时器"""
+        self.timer_phase = None
+        self.timer_deadline = None
+
+    def timer_remaining(self) -> Optional[float]:
+        """当前阶段定时器的剩余秒数（没有进行中的本阶段定时器时返回 None）"""
+        if (
+            self.timer_task is None
+            or self.timer_task.done()
+            or self.timer_phase != self.phase
+            or self.timer_deadline is None
+        ):
+            return None
+        return self.timer_deadline - time.time()
+
+    def set_timer(self, task: asyncio.Task, timeout: Optional[float] = None) -> None:
+        """设置定时器（阶段切换点，启用持久化时写入快照）"""
         self.cancel_timer()
         self.timer_task = task
+        self.timer_phase = self.phase
+        self.timer_deadline = time.time() + timeout if timeout else None
+        if self.journal:
+            self.journal.checkpoint(self)
+
+    # ========== 事件方法 ==========
+
+    def record_event(
+        self,
+        event_type: EventType,
+        actor: Optional[str] = None,
+        target: Optional[str] = None,
+        **data: Any
+    ) -> GameEvent:
+        """记录本回合的结构化事件"""
+        event = self.events.add(event_type, self.current_round, actor, target, **data)
+        if self.journal:
+            self.journal.append_event(event)
+        return event
 
-    # ========== 日志方法 ==========
-
-    def log(self, message: str) -> None:
-        """添加游戏日志"""
-        self.game_log.append(message)
-
-    def log_separator(self) -> None:
-        """添加分隔线"""
-        self.game_log.append("=" * 30)
-
-    def log_round_start(self) -> None:
-        """记录回合开始"""
-        self.log_separator()
-        self.log(f"第{self.current_round}晚")
-        self.log_separator()
+    @property
+    def game_log(self) -> List[str]:
+        """游戏日志文本（由事件渲染）"""
+        return render_log(self.events)
+
+    # ========== 快照方法 ==========
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """导出可JSON保存的房间快照（不含定时器、Bot等运行时对象和AI上下文）"""
+        hunter_state = asdict(self.hunter_state)
+        if self.hunter_state.death_type:
+            hunter_state["death_type"] = self.hunter_state.death_type.value
+        return {
+            "group_id": self.group_id,
+            "creator_id": self.creator_id,
+            "msg_origin": self.msg_origin if isinstance(self.msg_origin, str) else None,
+            "phase": self.phase.name,
+            "current_round": self.current_round,
+            "started_at": self.started_at,
+            "is_first_night": self.is_first_night,
+            "last_killed_id": self.last_killed_id,
+            "seer_checked": self.seer_checked,
+            "last_words_from_vote": self.last_words_from_vote,
+            "timer_phase": self.timer_phase.name if self.timer_phase else None,
+            "timer_deadline": self.timer_deadline,
+            "players": [
+                {
+                    "id": p.id, "name": p.name, "number": p.number,
+                    "role": p.role.value if p.role else None,
+                    "is_alive": p.is_alive, "original_card": p.original_card,
+                    "is_ai": p.is_ai, "ai_config": asdict(p.ai_config) if p.ai_config else None,
+                }
+                for p in self.players.values()
+            ],
+            "banned_player_ids": sorted(self.banned_player_ids),
+            "temp_admin_ids": sorted(self.temp_admin_ids),
+            "witch_state": asdict(self.witch_state),
+            "hunter_state": hunter_state,
+            "vote_state": asdict(self.vote_state),
+            "speaking_state": {
+                "order": list(self.speaking_state.order),
+                "current_index": self.speaking_state.current_index,
+                "current_speaker_id": self.speaking_state.current_speaker_id,
+            },
+            "events": self.events.to_dicts(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any], config: GameConfig) -> "GameRoom":
+        """从快照恢复房间"""
+        from .ai_player import AIPlayerConfig
+        from ..roles import HunterDeathType
+
+        room = cls(
+            group_id=data["group_id"],
+            creator_id=data["creator_id"],
+            config=config,
+            msg_origin=data.get("msg_origin"),
+        )
+        room.phase = GamePhase[data["phase"]]
+        room.current_round = data["current_round"]
+        room.started_at = data.get("started_at")
+        room.is_first_night = data["is_first_night"]
+        room.last_killed_id = data.get("last_killed_id")
+        room.seer_checked = data.get("seer_checked", False)
+        room.last_words_from_vote = data.get("last_words_from_vote", False)
+        room.timer_phase = GamePhase[data["timer_phase"]] if data.get("timer_phase") else None
+        room.timer_deadline = data.get("timer_deadline")
+
+        for info in data["players"]:
+            ai_config = AIPlayerConfig(**info["ai_config"]) if info.get("ai_config") else None
+            player = Player(
+                id=info["id"], name=info["name"], number=info["number"],
+                role=Role(info["role"]) if info.get("role") else None,
+                is_alive=info["is_alive"], original_card=info.get("original_card", ""),
+                is_ai=info.get("is_ai", False), ai_config=ai_config,
+            )
+            room.add_player(player)
+            if player.number:
+                room.number_to_player[player.number] = player.id
+
+        room.banned_player_ids = set(data.get("banned_player_ids", []))
+        room.temp_admin_ids = set(data.get("temp_admin_ids", []))
+        for key, value in data.get("witch_state", {}).items():
+            setattr(room.witch_state, key, value)
+        for key, value in data.get("hunter_state", {}).items():
+            setattr(room.hunter_state, key, value)
+        if room.hunter_state.death_type:
+            room.hunter_state.death_type = HunterDeathType(room.hunter_state.death_type)
+        room.vote_state = VoteState(**data.get("vote_state", {}))
+        speaking = data.get("speaking_state", {})
+        room.speaking_state.order = list(speaking.get("order", []))
+        room.speaking_state.current_index = speaking.get("current_index", 0)
+        room.speaking_state.current_speaker_id = speaking.get("current_speaker_id")
+        room.events = EventLog.from_dicts(data.get("events", []))
+        return room
 
     # ========== 目标解析方法 ==========
 
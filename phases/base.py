@@ -2,6 +2,7 @@
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 import asyncio
+import time
 from astrbot.api import logger
 
 if TYPE_CHECKING:
@@ -9,6 +10,10 @@ if TYPE_CHECKING:
     from ..services import GameManager
 
 
+# 重启后恢复定时器时至少留给玩家的时间（秒）
+RESUME_MIN_SECONDS = 30
+
+
 class BasePhase(ABC):
     """游戏阶段基类"""
 
@@ -38,16 +43,27 @@ class BasePhase(ABC):
         """超时时调用"""
         pass
 
+    async def resume(self, room: "GameRoom") -> None:
+        """插件重启后继续本阶段：按剩余时间重新启动定时器，本阶段没有定时器（AI驱动）时重新进入"""
+        if room.timer_phase != room.phase or room.timer_deadline is None:
+            await self.on_enter(room)
+            return
+        remaining = max(room.timer_deadline - time.time(), RESUME_MIN_SECONDS)
+        logger.info(f"[狼人杀] 群 {room.group_id} {self.name}恢复定时器，剩余 {remaining:.0f} 秒")
+        await self.start_timer(room, remaining)
+
     async def start_timer(self, room: "GameRoom", timeout: float = None) -> None:
         """启动定时器"""
         timeout = timeout or self.timeout_seconds
         task = asyncio.create_task(self._timer_task(room, timeout))
-        room.set_timer(task)
+        room.set_timer(task, timeout)
 
     async def _timer_task(self, room: "GameRoom", timeout: float) -> None:
         """定时器任务"""
         try:
             await asyncio.sleep(timeout)
+            room.timer_phase = None
+            room.timer_deadline = None
 
             # 检查房间是否还存在
             if room.group_id not in self.game_manager.rooms:
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase
+from ..models import EventType, GamePhase
 from ..services import BanService
 from ..utils import cmd
 
@@ -101,8 +101,7 @@ class DaySpeakingPhase(BasePhase):
             if len(full_speech) > 200:
                 full_speech = full_speech[:200] + "..."
 
-            phase_tag = "💬PK发言" if is_pk else "💬发言"
-            room.log(f"{phase_tag}：{player.display_name} - {full_speech}")
+            room.record_event(EventType.SPEECH, player.display_name, text=full_speech, is_pk=is_pk)
 
             logger.info(f"[记录发言] 开始同步发言到AI上下文，内容={full_speech[:50]}...")
 
@@ -113,10 +112,13 @@ class DaySpeakingPhase(BasePhase):
                     p.ai_context.add_speech(player.display_name, full_speech, is_pk)
                     ai_sync_count += 1
 
+            # 有AI玩家时计算发言者的行为标签和跳身份/报查验事件
+            if ai_sync_count:
+                self.game_manager.ai_player_service.record_speech(player, room, full_speech)
+
             logger.info(f"[记录发言] 完成，已同步到 {ai_sync_count} 个AI")
         else:
-            phase_tag = "💬PK发言" if is_pk else "💬发言"
-            room.log(f"{phase_tag}：{player.display_name} - [未捕获到文字内容]")
+            room.record_event(EventType.SPEECH, player.display_name, text="", is_pk=is_pk)
             logger.warning(f"[记录发言] ⚠️ {player.display_name} 的发言内容为空！")
 
         # 清空缓存
@@ -176,14 +178,26 @@ class DaySpeakingPhase(BasePhase):
             # 更新AI上下文
             ai_service.update_ai_context(player, room)
 
-            # 生成发言
-            speech = await ai_service.generate_speech(player, room, is_pk)
-
-            # 发送发言到群
             phase_tag = "[PK发言]" if is_pk else ""
-            await self.message_service.send_group_message(
-                room, f"{phase_tag}{player.display_name}：{speech}"
-            )
+
+            if room.config.ai_stream_speech:
+                # 流式发言：每生成一句就按顺序发到群里
+                prefix = f"{phase_tag}{player.display_name}："
+
+                async def post_chunk(chunk: str) -> None:
+                    nonlocal prefix
+                    await self.message_service.send_group_message_paced(room, f"{prefix}{chunk}")
+                    prefix = ""
+
+                speech = await ai_service.stream_speech(player, room, post_chunk, is_pk)
+            else:
+                # 生成发言
+                speech = await ai_service.generate_speech(player, room, is_pk)
+
+                # 发送发言到群
+                await self.message_service.send_group_message(
+                    room, f"{phase_tag}{player.display_name}：{speech}"
+                )
 
             # 记录发言（会自动同步到所有AI上下文）
             room.speaking_state.current_speech = [speech]
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Dict, List
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import EventType, GamePhase, Role
 from ..roles import HunterDeathType
 from ..services import BanService
 
@@ -70,6 +70,17 @@ class DayVotePhase(BasePhase):
         # 启动定时器（带30秒AI发言和投票）
         await self._start_vote_timer(room, has_ai=len(ai_players) > 0)
 
+    async def resume(self, room: "GameRoom") -> None:
+        """插件重启后继续投票（已投的票保留，投票定时器重新计时）"""
+        if room.timer_phase != room.phase:
+            if room.vote_state.is_pk_vote:
+                await self.enter_pk_vote(room)
+            else:
+                await self.on_enter(room)
+            return
+        has_ai = any(p.is_ai and p.id not in room.vote_state.day_votes for p in room.get_alive_players())
+        await self._start_vote_timer(room, has_ai=has_ai)
+
     async def enter_pk_vote(self, room: "GameRoom") -> None:
         """进入PK投票"""
         room.phase = GamePhase.DAY_VOTE
@@ -120,8 +131,6 @@ class DayVotePhase(BasePhase):
             if not player.is_ai:
                 continue
 
-            pk_tag = "PK" if is_pk else ""
-
             try:
                 # 更新AI上下文
                 ai_service.update_ai_context(player, room)
@@ -156,8 +165,8 @@ class DayVotePhase(BasePhase):
                             room, f"🗳️ {player.display_name} 投票给 {target_player.display_name}"
                         )
 
-                        # 记录日志
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）投给 {target_player.display_name}")
+                        # 记录事件
+                        room.record_event(EventType.VOTE, player.display_name, target_player.display_name, is_pk=is_pk, ai=True)
                         logger.info(f"[狼人杀] AI玩家 {player.name} 投票给 {target_player.display_name}")
 
                         # 记录到所有AI上下文
@@ -170,14 +179,14 @@ class DayVotePhase(BasePhase):
                         await self.message_service.send_group_message(
                             room, f"🗳️ {player.display_name} 选择弃票"
                         )
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票")
+                        room.record_event(EventType.VOTE, player.display_name, is_pk=is_pk, ai=True)
                 else:
                     # AI选择弃票 - 记录为投给"ABSTAIN"表示弃票
                     room.vote_state.day_votes[player.id] = "ABSTAIN"
                     await self.message_service.send_group_message(
                         room, f"🗳️ {player.display_name} 选择弃票"
                     )
-                    room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票")
+                    room.record_event(EventType.VOTE, player.display_name, is_pk=is_pk, ai=True)
                     logger.info(f"[狼人杀] AI玩家 {player.name} 选择弃票")
 
             except Exception as e:
@@ -187,7 +196,7 @@ class DayVotePhase(BasePhase):
                 await self.message_service.send_group_message(
                     room, f"🗳️ {player.display_name} 选择弃票"
                 )
-                room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票（异常）")
+                room.record_event(EventType.VOTE, player.display_name, is_pk=is_pk, ai=True, note="异常")
 
     async def _check_all_voted(self, room: "GameRoom") -> bool:
         """检查是否所有人都投票了"""
@@ -259,7 +268,7 @@ class DayVotePhase(BasePhase):
                 logger.error(f"[狼人杀] 投票超时处理失败: {e}")
 
         task = asyncio.create_task(vote_timer())
-        room.set_timer(task)
+        room.set_timer(task, self.timeout_seconds)
 
     async def _handle_ai_discussion_and_votes(self, room: "GameRoom", is_pk: bool = False, pk_candidates: List[int] = None) -> None:
         """处理AI发言和投票"""
@@ -294,8 +303,6 @@ class DayVotePhase(BasePhase):
                         if p.is_ai and p.ai_context:
                             p.ai_context.add_vote_discussion(player.display_name, discussion[:120])
 
-                pk_tag = "PK" if is_pk else ""
-
                 if target_number:
                     target_player = room.get_player_by_number(target_number)
                     if target_player and target_player.is_alive and target_player.id != player.id:
@@ -306,8 +313,8 @@ class DayVotePhase(BasePhase):
                             room, f"🗳️ {player.display_name} 投票给 {target_player.display_name}"
                         )
 
-                        # 记录日志
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）投给 {target_player.display_name}")
+                        # 记录事件
+                        room.record_event(EventType.VOTE, player.display_name, target_player.display_name, is_pk=is_pk, ai=True)
                         logger.info(f"[狼人杀] AI玩家 {player.name} 投票给 {target_player.display_name}")
 
                         # 记录到所有AI上下文
@@ -324,7 +331,7 @@ class DayVotePhase(BasePhase):
                         await self.message_service.send_group_message(
                             room, f"🗳️ {player.display_name} 选择弃票"
                         )
-                        room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票（目标无效）")
+                        room.record_event(EventType.VOTE, player.display_name, is_pk=is_pk, ai=True, note="目标无效")
                         logger.info(f"[狼人杀] AI玩家 {player.name} 投票目标无效，转为弃票")
 
                         # 检查是否所有人都投完了
@@ -336,7 +343,7 @@ class DayVotePhase(BasePhase):
                     await self.message_service.send_group_message(
                         room, f"🗳️ {player.display_name} 选择弃票"
                     )
-                    room.log(f"🗳️ {pk_tag}投票：{player.display_name}（AI）弃票")
+                    room.record_event(EventType.VOTE, player.display_name, is_pk=is_pk, ai=True)
                     logger.info(f"[狼人杀] AI玩家 {player.name} 选择弃票")
 
                     # 检查是否所有人都投完了
@@ -347,6 +354,7 @@ class DayVotePhase(BasePhase):
                 # 单个AI失败不影响其他AI
                 logger.error(f"[狼人杀] AI玩家 {player.name} 投票异常: {e}")
                 room.vote_state.day_votes[player.id] = "ABSTAIN"
+                room.record_event(EventType.VOTE, player.display_name, is_pk=is_pk, ai=True, note="异常")
 
     async def on_timeout(self, room: "GameRoom") -> None:
         """投票超时"""
@@ -361,7 +369,7 @@ class DayVotePhase(BasePhase):
             await self._process_vote_result(room)
         else:
             # 无人投票，进入下一夜晚
-            room.log("📊 投票超时：无人投票，本轮无人出局")
+            room.record_event(EventType.NO_EXILE, reason="timeout")
             await self._enter_night(room)
 
     async def on_all_voted(self, room: "GameRoom") -> None:
@@ -414,16 +422,18 @@ class DayVotePhase(BasePhase):
 
             if not was_pk_vote:
                 # 第一次平票，进入PK
+                room.record_event(EventType.NO_EXILE, reason="tie", pk_players=pk_names)
                 from .day_speaking import DaySpeakingPhase
                 speaking_phase = DaySpeakingPhase(self.game_manager)
                 await speaking_phase.enter_pk_phase(room, room.vote_state.pk_players)
             else:
                 # PK后仍平票，无人出局
-                room.log("📊 PK投票结果：仍然平票，本轮无人出局")
+                room.record_event(EventType.NO_EXILE, reason="pk_tie")
                 await self._enter_night(room)
             return
 
         if not exiled_id:
+            room.record_event(EventType.NO_EXILE, reason="none")
             # 同步无人出局到AI上下文
             for p in room.players.values():
                 if p.is_ai and p.ai_context:
@@ -438,8 +448,9 @@ class DayVotePhase(BasePhase):
             await self._enter_night(room)
             return
 
-        # 记录日志（这里用 was_pk_vote 因为状态可能已被清除）
-        room.log(f"📊 {'PK' if was_pk_vote else ''}投票结果：{exiled_player.display_name} 被放逐")
+        # 记录事件（这里用 was_pk_vote 因为状态可能已被清除）
+        room.record_event(EventType.EXILE, target=exiled_player.display_name, is_pk=was_pk_vote)
+        room.record_event(EventType.DEATH, target=exiled_player.display_name, cause="exile", night=False)
 
         # 发送投票结果
         await self.message_service.announce_vote_result(
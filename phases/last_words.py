@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase
+from ..models import EventType, GamePhase
 from ..services import BanService
 from ..utils import cmd
 
@@ -138,14 +138,18 @@ class LastWordsPhase(BasePhase):
             full_speech = " ".join(speech_list)
             if len(full_speech) > 200:
                 full_speech = full_speech[:200] + "..."
-            room.log(f"💀遗言：{player.display_name} - {full_speech}")
+            room.record_event(EventType.LAST_WORDS, player.display_name, text=full_speech)
 
             # 同步遗言到所有AI玩家上下文
             for p in room.players.values():
                 if p.is_ai and p.ai_context:
                     p.ai_context.add_event(f"遗言 {player.display_name}：{full_speech}")
+
+            # 遗言里的跳身份/报查验同样记为事件
+            if any(p.is_ai for p in room.players.values()):
+                self.game_manager.ai_player_service.record_speech(player, room, full_speech)
         else:
-            room.log(f"💀遗言：{player.display_name} - [未捕获到文字内容]")
+            room.record_event(EventType.LAST_WORDS, player.display_name, text="")
 
         # 清空缓存
         room.speaking_state.current_speech.clear()
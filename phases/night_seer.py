@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import EventType, GamePhase, Role
 
 if TYPE_CHECKING:
     from ..models import GameRoom
@@ -78,14 +78,15 @@ class NightSeerPhase(BasePhase):
             if target_player and target_player.id != seer.id:
                 # 获取验人结果
                 is_werewolf = target_player.role == Role.WEREWOLF
+                room.record_event(
+                    EventType.CHECK, seer.display_name, target_player.display_name, is_werewolf=is_werewolf, ai=True
+                )
 
                 # 记录到AI上下文
                 if seer.ai_context:
-                    seer.ai_context.add_seer_result(target_player.display_name, is_werewolf)
+                    seer.ai_context.add_seer_result(target_player.display_name, is_werewolf, target_player.number)
 
-                # 记录日志
                 result_str = "狼人" if is_werewolf else "好人"
-                room.log(f"🔮 {seer.display_name}（预言家AI）验 {target_player.display_name}：{result_str}")
                 logger.info(f"[狼人杀] AI预言家 {seer.name} 验 {target_player.display_name}：{result_str}")
 
         room.seer_checked = True
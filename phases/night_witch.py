@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import EventType, GamePhase, Role
 from ..roles import HunterDeathType
 from ..services import BanService
 from ..roles import WitchRole
@@ -90,7 +90,7 @@ class NightWitchPhase(BasePhase):
             witch_state.saved_player_id = room.last_killed_id
             witch_state.antidote_used = True
             witch_state.has_acted = True
-            room.log(f"💊 {witch.display_name}（女巫AI）使用解药救了 {killed_player_name}")
+            room.record_event(EventType.SAVE, witch.display_name, killed_player_name, ai=True)
             logger.info(f"[狼人杀] AI女巫 {witch.name} 救了 {killed_player_name}")
             # 记录到女巫的AI上下文
             if witch.ai_context:
@@ -103,7 +103,7 @@ class NightWitchPhase(BasePhase):
                 witch_state.poisoned_player_id = target_player.id
                 witch_state.poison_used = True
                 witch_state.has_acted = True
-                room.log(f"💊 {witch.display_name}（女巫AI）使用毒药毒了 {target_player.display_name}")
+                room.record_event(EventType.POISON, witch.display_name, target_player.display_name, ai=True)
                 logger.info(f"[狼人杀] AI女巫 {witch.name} 毒了 {target_player.display_name}")
                 # 记录到女巫的AI上下文
                 if witch.ai_context:
@@ -111,7 +111,7 @@ class NightWitchPhase(BasePhase):
 
         else:
             witch_state.has_acted = True
-            room.log(f"💊 {witch.display_name}（女巫AI）选择不操作")
+            room.record_event(EventType.WITCH_PASS, witch.display_name, ai=True)
             logger.info(f"[狼人杀] AI女巫 {witch.name} 不操作")
 
         await self._finish_night(room)
@@ -256,14 +256,18 @@ class NightWitchPhase(BasePhase):
         if poisoned_name:
             dead_names.append(poisoned_name)
 
+        room.record_event(EventType.DAWN, deaths=dead_names)
+
         if dead_names:
             event = f"第{room.current_round}夜死亡：{', '.join(dead_names)}"
         else:
             event = f"第{room.current_round}夜：平安夜"
 
-        # 添加到所有AI玩家的上下文
+        # 压缩已结束回合的记录，再添加到所有AI玩家的上下文
+        ai_service = self.game_manager.ai_player_service
         for player in room.players.values():
             if player.is_ai and player.ai_context:
+                ai_service.compact_ai_context(player, room)
                 player.ai_context.add_event(event)
 
     async def _wait_for_hunter_shot(self, room: "GameRoom") -> None:
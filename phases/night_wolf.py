@@ -2,14 +2,15 @@
 import asyncio
 import random
 import time
+from collections import Counter
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BasePhase
-from ..models import GamePhase, Role
+from ..models import EventType, GamePhase, Role
 
 if TYPE_CHECKING:
-    from ..models import GameRoom
+    from ..models import GameRoom, Player
 
 # AI投票前预留时间（秒）- 在超时前这么多秒强制AI投票
 AI_VOTE_BEFORE_TIMEOUT_SECONDS = 30
@@ -74,22 +75,26 @@ class NightWolfPhase(BasePhase):
             start_time = asyncio.get_event_loop().time()
             timeout = 60
 
-            # 处理密谋
             if room.phase != GamePhase.NIGHT_WOLF:
                 logger.info(f"[狼人杀] 群 {room.group_id} 全AI狼人处理：阶段已变更，跳过密谋")
                 return
-            await self._handle_ai_werewolf_chat(room)
 
-            # 检查超时和阶段
-            elapsed = asyncio.get_event_loop().time() - start_time
-            if elapsed > timeout:
-                raise asyncio.TimeoutError()
-            if room.phase != GamePhase.NIGHT_WOLF:
-                logger.info(f"[狼人杀] 群 {room.group_id} 全AI狼人处理：阶段已变更，跳过投票")
-                return
+            # 团队模式：一次调用完成密谋和投票，失败再逐个处理
+            if not (self._use_team_mode(room)
+                    and await self._handle_ai_werewolf_team(room, send_chat=True, apply_votes=True)):
+                # 处理密谋
+                await self._handle_ai_werewolf_chat(room, allow_team=False)
 
-            # 处理投票
-            await self._handle_ai_werewolf_vote(room)
+                # 检查超时和阶段
+                elapsed = asyncio.get_event_loop().time() - start_time
+                if elapsed > timeout:
+                    raise asyncio.TimeoutError()
+                if room.phase != GamePhase.NIGHT_WOLF:
+                    logger.info(f"[狼人杀] 群 {room.group_id} 全AI狼人处理：阶段已变更，跳过投票")
+                    return
+
+                # 处理投票
+                await self._handle_ai_werewolf_vote(room, allow_team=False)
 
             # 再次检查阶段
             if room.phase != GamePhase.NIGHT_WOLF:
@@ -135,7 +140,7 @@ class NightWolfPhase(BasePhase):
             # 所有狼人都投同一个目标
             for wolf in alive_wolves:
                 room.vote_state.night_votes[wolf.id] = target.id
-            room.log(f"🐺 狼人AI兜底：选择刀 {target.display_name}")
+            room.record_event(EventType.WOLF_VOTE, target=target.display_name, ai=True, fallback=True)
             logger.info(f"[狼人杀] 狼人AI兜底投票: {target.display_name}")
 
     async def _ai_vote_timer(self, room: "GameRoom", delay: float) -> None:
@@ -181,12 +186,61 @@ class NightWolfPhase(BasePhase):
         except Exception as e:
             logger.error(f"[狼人杀] AI狼人主动密谋失败: {e}")
 
-    async def _handle_ai_werewolf_chat(self, room: "GameRoom") -> None:
+    def _use_team_mode(self, room: "GameRoom") -> bool:
+        """是否使用狼队统一决策"""
+        return room.config.ai_wolf_team_mode
+
+    async def _handle_ai_werewolf_team(
+        self,
+        room: "GameRoom",
+        send_chat: bool = True,
+        apply_votes: bool = True
+    ) -> bool:
+        """狼队统一决策：一次LLM调用生成所有AI狼人的密谋和刀人选择
+
+        Returns:
+            是否成功（失败时由调用方回退到逐个决策）
+        """
+        ai_service = self.game_manager.ai_player_service
+        ai_wolves = [w for w in room.get_alive_werewolves() if w.is_ai]
+        if not ai_wolves:
+            return True
+
+        for wolf in ai_wolves:
+            ai_service.update_ai_context(wolf, room)
+
+        plan = await ai_service.decide_werewolf_team(ai_wolves, room)
+        if not plan or room.phase != GamePhase.NIGHT_WOLF:
+            return False
+
+        if send_chat:
+            for wolf in ai_wolves:
+                decision = plan.get(wolf.number)
+                if decision and decision.speech:
+                    await self._broadcast_wolf_chat(room, wolf, decision.speech[:50])
+
+        if apply_votes:
+            # 没给出目标的狼人跟随全队多数目标
+            targets = [d.target for d in plan.values() if d.target]
+            majority = Counter(targets).most_common(1)[0][0] if targets else None
+            for wolf in ai_wolves:
+                decision = plan.get(wolf.number)
+                target_number = decision.target if decision and decision.target else majority
+                if target_number:
+                    self._apply_wolf_vote(room, wolf, target_number)
+
+        logger.info(f"[狼人杀] 群 {room.group_id} 狼队统一决策完成（{len(ai_wolves)}个AI狼人）")
+        return True
+
+    async def _handle_ai_werewolf_chat(self, room: "GameRoom", allow_team: bool = True) -> None:
         """AI狼人密谋：生成消息并发给队友"""
+        if allow_team and self._use_team_mode(room):
+            if await self._handle_ai_werewolf_team(room, send_chat=True, apply_votes=False):
+                return
+
         ai_service = self.game_manager.ai_player_service
-        alive_wolves = room.get_alive_werewolves()
 
-        for wolf in alive_wolves:
+        for wolf in room.get_alive_werewolves():
             if not wolf.is_ai:
                 continue
 
@@ -198,31 +252,36 @@ class NightWolfPhase(BasePhase):
 
             # 生成密谋消息
             chat_message = await ai_service.decide_werewolf_chat(wolf, room)
-            if not chat_message:
-                continue
-
-            # 记录日志
-            room.log(f"💬 {wolf.display_name}（狼人AI）密谋：{chat_message}")
-            logger.info(f"[狼人杀] AI狼人 {wolf.name} 密谋：{chat_message}")
-
-            # 发送给其他狼人队友
-            teammates = [w for w in alive_wolves if w.id != wolf.id]
-            for teammate in teammates:
-                if teammate.is_ai:
-                    # AI队友：加入上下文
-                    if teammate.ai_context:
-                        teammate.ai_context.add_wolf_chat(
-                            wolf.display_name,
-                            chat_message,
-                            room.current_round
-                        )
-                else:
-                    # 人类队友：发送私聊
-                    msg = f"🐺 队友 {wolf.display_name} 说：\n{chat_message}"
-                    await self.message_service.send_private_message(room, teammate.id, msg)
-
-    async def _handle_ai_werewolf_vote(self, room: "GameRoom") -> None:
+            if chat_message:
+                await self._broadcast_wolf_chat(room, wolf, chat_message)
+
+    async def _broadcast_wolf_chat(self, room: "GameRoom", wolf: "Player", chat_message: str) -> None:
+        """记录AI狼人的密谋并发给队友"""
+        room.record_event(EventType.WOLF_CHAT, wolf.display_name, text=chat_message, ai=True)
+        logger.info(f"[狼人杀] AI狼人 {wolf.name} 密谋：{chat_message}")
+
+        # 发送给其他狼人队友
+        teammates = [w for w in room.get_alive_werewolves() if w.id != wolf.id]
+        for teammate in teammates:
+            if teammate.is_ai:
+                # AI队友：加入上下文
+                if teammate.ai_context:
+                    teammate.ai_context.add_wolf_chat(
+                        wolf.display_name,
+                        chat_message,
+                        room.current_round
+                    )
+            else:
+                # 人类队友：发送私聊
+                msg = f"🐺 队友 {wolf.display_name} 说：\n{chat_message}"
+                await self.message_service.send_private_message(room, teammate.id, msg)
+
+    async def _handle_ai_werewolf_vote(self, room: "GameRoom", allow_team: bool = True) -> None:
         """AI狼人投票：基于密谋信息决策击杀目标"""
+        if allow_team and self._use_team_mode(room):
+            if await self._handle_ai_werewolf_team(room, send_chat=False, apply_votes=True):
+                return
+
         ai_service = self.game_manager.ai_player_service
 
         for wolf in room.get_alive_werewolves():
@@ -238,16 +297,24 @@ class NightWolfPhase(BasePhase):
             # AI决策击杀目标
             target_number = await ai_service.decide_werewolf_kill(wolf, room)
             if target_number:
-                target_player = room.get_player_by_number(target_number)
-                if target_player and target_player.is_alive:
-                    room.vote_state.night_votes[wolf.id] = target_player.id
-                    room.log(f"🐺 {wolf.display_name}（狼人AI）选择刀 {target_player.display_name}")
-                    logger.info(f"[狼人杀] AI狼人 {wolf.name} 选择击杀 {target_player.display_name}")
+                self._apply_wolf_vote(room, wolf, target_number)
+
+    def _apply_wolf_vote(self, room: "GameRoom", wolf: "Player", target_number: int) -> None:
+        """记录AI狼人的刀人选择并同步给AI队友"""
+        target_player = room.get_player_by_number(target_number)
+        if not target_player or not target_player.is_alive:
+            return
+
+        room.vote_state.night_votes[wolf.id] = target_player.id
+        room.record_event(EventType.WOLF_VOTE, wolf.display_name, target_player.display_name, ai=True)
+        logger.info(f"[狼人杀] AI狼人 {wolf.name} 选择击杀 {target_player.display_name}")
 
-                    # 同步刀人选择到其他狼人AI上下文
-                    for teammate in room.get_alive_werewolves():
-                        if teammate.id != wolf.id and teammate.is_ai and teammate.ai_context:
-                            teammate.ai_context.add_event(f"狼队友 {wolf.display_name} 选择刀 {target_player.display_name}")
+        # 记入自己和其他狼人AI的上下文（回合摘要据此保留刀口）
+        if wolf.ai_context:
+            wolf.ai_context.add_event(f"你选择刀 {target_player.display_name}")
+        for teammate in room.get_alive_werewolves():
+            if teammate.id != wolf.id and teammate.is_ai and teammate.ai_context:
+                teammate.ai_context.add_event(f"狼队友 {wolf.display_name} 选择刀 {target_player.display_name}")
 
     async def _check_all_voted(self, room: "GameRoom") -> bool:
         """检查是否所有狼人都已投票"""
@@ -282,8 +349,8 @@ class NightWolfPhase(BasePhase):
             # 有投票，处理
             await self._finish_and_next(room)
         else:
-            # 无投票，记录日志，直接进入预言家阶段
-            room.log("🐺 狼人超时：未投票，今晚无人被刀")
+            # 无投票，记录事件，直接进入预言家阶段
+            room.record_event(EventType.KILL, timeout=True)
             await self._enter_seer_phase(room)
 
     async def on_human_wolves_voted(self, room: "GameRoom") -> None:
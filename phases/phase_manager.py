@@ -4,7 +4,7 @@ import random
 from typing import TYPE_CHECKING
 from astrbot.api import logger
 
-from ..models import GamePhase
+from ..models import EventType, GamePhase
 from ..roles import HunterDeathType
 from ..services import BanService
 from ..roles import HunterRole
@@ -26,7 +26,7 @@ class PhaseManager:
     async def enter_night_phase(self, room: "GameRoom") -> None:
         """进入夜晚阶段"""
         room.start_new_night()
-        room.log_round_start()
+        room.record_event(EventType.ROUND_START)
 
         # 开启全员禁言
         await BanService.set_group_whole_ban(room, True)
@@ -77,6 +77,35 @@ class PhaseManager:
         last_words_phase = LastWordsPhase(self.game_manager)
         await last_words_phase.on_enter(room)
 
+    # ========== 重启恢复 ==========
+
+    async def resume_phase(self, room: "GameRoom") -> None:
+        """插件重启后从当前阶段继续（猎人待开枪时先等待开枪）"""
+        hunter_state = room.hunter_state
+        if hunter_state.pending_shot_player_id and hunter_state.death_type:
+            await self.wait_for_hunter_shot(room, hunter_state.death_type.value)
+            return
+
+        from .night_wolf import NightWolfPhase
+        from .night_seer import NightSeerPhase
+        from .night_witch import NightWitchPhase
+        from .day_speaking import DaySpeakingPhase
+        from .day_vote import DayVotePhase
+        from .last_words import LastWordsPhase
+        phase_classes = {
+            GamePhase.NIGHT_WOLF: NightWolfPhase,
+            GamePhase.NIGHT_SEER: NightSeerPhase,
+            GamePhase.NIGHT_WITCH: NightWitchPhase,
+            GamePhase.DAY_SPEAKING: DaySpeakingPhase,
+            GamePhase.DAY_PK: DaySpeakingPhase,
+            GamePhase.DAY_VOTE: DayVotePhase,
+            GamePhase.LAST_WORDS: LastWordsPhase,
+        }
+        phase_class = phase_classes.get(room.phase)
+        if phase_class is None:
+            raise ValueError(f"阶段 {room.phase.value} 无法恢复")
+        await phase_class(self.game_manager).resume(room)
+
     # ========== 猎人开枪 ==========
 
     async def wait_for_hunter_shot(self, room: "GameRoom", death_type: str) -> None:
@@ -122,7 +151,7 @@ class PhaseManager:
                 room.hunter_state.pending_shot_player_id = None
                 room.hunter_state.has_shot = True
 
-                room.log(f"🔫 {hunter_name}（猎人）超时未开枪")
+                room.record_event(EventType.SHOT, hunter_name, reason="timeout", ai=False)
                 await self.message_service.send_group_message(
                     room, f"⏰ {hunter_name} 开枪超时！放弃开枪机会。"
                 )
@@ -136,7 +165,7 @@ class PhaseManager:
                 logger.error(f"[狼人杀] 猎人开枪超时处理失败: {e}")
 
         task = asyncio.create_task(hunter_timer())
-        room.set_timer(task)
+        room.set_timer(task, timeout)
 
     async def _handle_ai_hunter_shot(self, room: "GameRoom", hunter, death_type: str) -> None:
         """处理AI猎人开枪"""
@@ -156,8 +185,9 @@ class PhaseManager:
                 room.hunter_state.has_shot = True
                 room.hunter_state.pending_shot_player_id = None
 
-                # 记录日志
-                room.log(f"🔫 {hunter.display_name}（猎人AI）开枪带走 {target_player.display_name}")
+                # 记录事件
+                room.record_event(EventType.SHOT, hunter.display_name, target_player.display_name, ai=True)
+                room.record_event(EventType.DEATH, target=target_player.display_name, cause="shot", night=False)
                 logger.info(f"[狼人杀] AI猎人 {hunter.name} 开枪带走 {target_player.display_name}")
 
                 # 禁言被带走的玩家（跳过AI）
@@ -183,7 +213,7 @@ class PhaseManager:
         # 不开枪
         room.hunter_state.has_shot = True
         room.hunter_state.pending_shot_player_id = None
-        room.log(f"🔫 {hunter.display_name}（猎人AI）选择不开枪")
+        room.record_event(EventType.SHOT, hunter.display_name, reason="skip", ai=True)
         logger.info(f"[狼人杀] AI猎人 {hunter.name} 不开枪")
 
         await self.message_service.send_group_message(
@@ -210,8 +240,9 @@ class PhaseManager:
         room.hunter_state.has_shot = True
         room.hunter_state.pending_shot_player_id = None
 
-        # 记录日志
-        room.log(f"🔫 {hunter.display_name}（猎人）开枪带走 {target.display_name}")
+        # 记录事件
+        room.record_event(EventType.SHOT, hunter.display_name, target.display_name, ai=False)
+        room.record_event(EventType.DEATH, target=target.display_name, cause="shot", night=False)
 
         # 禁言被带走的玩家
         await BanService.ban_player(room, target_id)
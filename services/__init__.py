@@ -2,16 +2,44 @@
 from .message_service import MessageService
 from .ban_service import BanService
 from .victory_checker import VictoryChecker
-from .ai_reviewer import AIReviewer
+from .room_store import RoomStore, RoomJournal
+from .game_archive import GameArchive
+from .game_stats import GameStats
+from .game_report import GameReport, PlayerReport
+from .review_queue import ReviewQueue, ReviewJob
 from .game_manager import GameManager
-# AI服务已模块化重构，从新位置导入
-from .ai import AIPlayerService
 
 __all__ = [
     "MessageService",
     "BanService",
     "VictoryChecker",
+    "RoomStore",
+    "RoomJournal",
+    "GameArchive",
+    "GameStats",
+    "GameReport",
+    "PlayerReport",
+    "ReviewQueue",
+    "ReviewJob",
     "AIReviewer",
     "GameManager",
     "AIPlayerService",
 ]
+
+
+# AI复盘和AI玩家服务会加载大量提示词模块，按需导入以缩短插件加载时间
+_LAZY_EXPORTS = {
+    "AIReviewer": (".ai_reviewer", "AIReviewer"),
+    "AIPlayerService": (".ai", "AIPlayerService"),
+}
+
+
+def __getattr__(name: str):
+    """延迟导入重量级服务"""
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module_name, attr = _LAZY_EXPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -22,8 +22,17 @@
   │   └── vote.py       # 投票决策
   ├── context/          # 上下文模块
   │   ├── builder.py    # 上下文构建
-  │   └── analyzer.py   # 局势分析、行为分析
+  │   ├── analyzer.py   # 局势分析、行为分析
+  │   ├── tagger.py     # 行为标签器（发言时一次性打标签）
+  │   ├── budget.py     # 上下文预算（按行动优先级裁剪）
+  │   └── summary.py    # 回合摘要（天亮时压缩往轮记录）
   ├── validators.py     # 统一验证器（防止操作死亡玩家）
+  ├── protocol.py       # 结构化决策协议（输出格式、解析与修复）
+  ├── providers.py      # 模型注册表（句柄缓存、健康状况、熔断）
+  ├── router.py         # 模型路由（按行动分档、负载高时降级）
+  ├── cache.py          # LLM响应缓存（回放/模拟对局）
+  ├── heuristic.py      # 规则决策（LLM失败/超时兜底、压测模式）
+  ├── metrics.py        # 运行指标
   └── service.py        # 主服务（整合入口）
 
 使用:
@@ -1,5 +1,5 @@
 """行动模块 - AI玩家的各种行动决策"""
-from .base import BaseAction
+from .base import BaseAction, PLAYER_SYSTEM_PROMPT
 from .werewolf import WerewolfAction
 from .seer import SeerAction
 from .witch import WitchAction
@@ -9,6 +9,7 @@ from .vote import VoteAction
 
 __all__ = [
     'BaseAction',
+    'PLAYER_SYSTEM_PROMPT',
     'WerewolfAction',
     'SeerAction',
     'WitchAction',
@@ -1,11 +1,35 @@
 """行动基类 - 所有AI行动的基础"""
 import asyncio
 import re
-from typing import Optional, TYPE_CHECKING
+import time
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, TYPE_CHECKING
 from astrbot.api import logger
 
+from ..cache import LLMResponseCache
+from ..context import ContextBudget, PromptSection, estimate_tokens
+from ..metrics import metrics
+from ..providers import ProviderRegistry
+from ..router import ModelRouter
+from ..protocol import (
+    Decision,
+    DecisionParser,
+    DecisionSpec,
+    KIND_TARGET,
+    KIND_VOTE,
+    build_retry_prompt,
+    format_instructions
+)
+from ..validators import TargetValidator
+from ..prompts import LEGACY_OUTPUT_FORMATS
+
 if TYPE_CHECKING:
-    from ....models import Player
+    from ....models import GameRoom, Player
+
+# 对冲延迟使用分位数所需的最少耗时样本数
+HEDGE_MIN_SAMPLES = 5
+
+# AI玩家统一系统提示词
+PLAYER_SYSTEM_PROMPT = "你是一个沉浸式狼人杀玩家。你必须完全代入你的角色，像真人一样说话，绝对不能暴露你是AI。回复要简洁自然，像在群里聊天。"
 
 
 class BaseAction:
@@ -13,19 +37,21 @@ class BaseAction:
 
     LLM_TIMEOUT_SECONDS = 30
 
-    def __init__(self, context):
+    def __init__(
+        self,
+        context,
+        providers: Optional[ProviderRegistry] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        router: Optional[ModelRouter] = None
+    ):
         self.context = context
+        self.providers = providers or ProviderRegistry(context)
+        self.response_cache = response_cache
+        self.router = router or ModelRouter()
 
     def _get_provider(self, model_id: str = ""):
-        """获取LLM provider"""
-        if model_id:
-            provider = self.context.get_provider_by_id(model_id)
-            if not provider:
-                logger.warning(f"[狼人杀AI] 未找到模型 '{model_id}'，使用默认模型")
-                provider = self.context.get_using_provider()
-        else:
-            provider = self.context.get_using_provider()
-        return provider
+        """获取LLM provider（句柄由注册表缓存）"""
+        return self.providers.get(model_id)
 
     async def _call_llm(
         self,
@@ -33,44 +59,76 @@ class BaseAction:
         player: "Player",
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        timeout: float = None
+        timeout: float = None,
+        room: Optional["GameRoom"] = None,
+        action: str = "",
+        model_id: Optional[str] = None
     ) -> Optional[str]:
-        """调用LLM获取AI决策（带重试和超时保护）"""
-        model_id = ""
+        """调用LLM获取AI决策（带模型路由、重试、超时保护、熔断和对冲请求）
+
+        model_id 为已路由的模型时不再重复路由（同一次决策只计一次路由指标）。
+        """
+        if model_id is None:
+            model_id = self.router.route(player, room, action)
+        home_model = ""
         if player.ai_config:
-            model_id = player.ai_config.model_id
+            home_model = player.ai_config.model_id
             max_retries = player.ai_config.max_retries
             retry_delay = player.ai_config.retry_delay
 
         if timeout is None:
             timeout = self.LLM_TIMEOUT_SECONDS
 
-        provider = self._get_provider(model_id)
-        if not provider:
+        # 回放/模拟对局优先使用响应缓存
+        cache_key = None
+        if self._response_cache_enabled(room):
+            cache_key = LLMResponseCache.make_key(model_id, PLAYER_SYSTEM_PROMPT, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                metrics.incr("cache.hit")
+                logger.info(f"[狼人杀AI] {player.name} 决策（缓存）: {cached[:100]}")
+                return cached
+            metrics.incr("cache.miss")
+
+        if not self._get_provider(model_id):
             logger.error(f"[狼人杀AI] 无法获取LLM provider")
             return None
 
+        if action:
+            metrics.observe(f"prompt_tokens.{action}", estimate_tokens(prompt))
+
+        # 路由到快速档时，玩家自己的模型排在备用模型之前
+        candidates = [model_id, home_model] + self._fallback_models(room, model_id)
+
         for attempt in range(max_retries):
+            # 跳过熔断中的模型
+            models = self.providers.available(candidates)
+            if not models:
+                metrics.incr("circuit.short_circuit")
+                logger.warning(f"[狼人杀AI] {player.name} 的所有可用模型均处于熔断状态，跳过调用")
+                return None
+            primary, backups = models[0], models[1:]
+            if primary != model_id:
+                metrics.incr("circuit.rerouted")
+                logger.info(f"[狼人杀AI] 模型 '{model_id or '默认'}' 熔断中，{player.name} 改用 '{primary}'")
+
+            hedge_delay = self._hedge_delay(room, primary, timeout) if backups else timeout
+
             try:
-                response = await asyncio.wait_for(
-                    provider.text_chat(
-                        prompt=prompt,
-                        system_prompt="你是一个沉浸式狼人杀玩家。你必须完全代入你的角色，像真人一样说话，绝对不能暴露你是AI。回复要简洁自然，像在群里聊天。"
-                    ),
-                    timeout=timeout
+                result = await self._hedged_request(
+                    prompt, primary, backups[:1], timeout, hedge_delay, action
                 )
-
-                if response.result_chain:
-                    result = response.result_chain.get_plain_text().strip()
-                    if result:  # 只有非空结果才返回
-                        logger.info(f"[狼人杀AI] {player.name} 决策: {result[:100]}")
-                        return result
-                    else:
-                        logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用返回空内容")
-                else:
-                    logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用返回空响应")
+                if result:  # 只有非空结果才返回
+                    logger.info(f"[狼人杀AI] {player.name} 决策: {result[:100]}")
+                    if cache_key:
+                        self.response_cache.put(cache_key, result)
+                        if self.response_cache.needs_save:
+                            await self.response_cache.save()
+                    return result
+                logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用返回空内容")
 
             except asyncio.TimeoutError:
+                self.providers.record_failure(primary)
                 logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用超时（{timeout}秒）")
             except Exception as e:
                 logger.warning(f"[狼人杀AI] {player.name} 第{attempt + 1}次调用失败: {e}")
@@ -82,6 +140,338 @@ class BaseAction:
         logger.error(f"[狼人杀AI] {player.name} 所有重试均失败")
         return None
 
+    async def _request(self, model_id: str, prompt: str, action: str = "") -> str:
+        """向指定模型发送一次请求，返回纯文本（可能为空），结果计入模型健康状况"""
+        provider = self._get_provider(model_id)
+        if not provider:
+            return ""
+
+        self.providers.begin(model_id)
+        start = time.perf_counter()
+        try:
+            with self.router.track():
+                response = await provider.text_chat(
+                    prompt=prompt,
+                    system_prompt=PLAYER_SYSTEM_PROMPT
+                )
+        except asyncio.CancelledError:
+            # 超时或对冲落败被取消，不计入成败
+            self.providers.release(model_id)
+            raise
+        except Exception:
+            self.providers.record_failure(model_id)
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._record_latency(model_id, latency_ms, action)
+
+        result = ""
+        if response and response.result_chain:
+            result = response.result_chain.get_plain_text().strip()
+        if result:
+            self.providers.record_success(model_id, latency_ms)
+        else:
+            self.providers.record_failure(model_id)
+        return result
+
+    async def _hedged_request(
+        self,
+        prompt: str,
+        model_id: str,
+        fallbacks: List[str],
+        timeout: float,
+        hedge_delay: float,
+        action: str = ""
+    ) -> str:
+        """对冲请求：主模型超过对冲延迟仍未返回时，并发请求备用模型，取先返回的有效结果"""
+        if not fallbacks or hedge_delay >= timeout:
+            return await asyncio.wait_for(self._request(model_id, prompt, action), timeout=timeout)
+
+        primary = asyncio.ensure_future(self._request(model_id, prompt, action))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            # 主模型偏慢，发出对冲请求
+            metrics.incr("hedge.fired")
+            logger.info(
+                f"[狼人杀AI] 模型 '{model_id or '默认'}' {hedge_delay:.1f}秒未响应，"
+                f"向备用模型 '{fallbacks[0]}' 发出对冲请求"
+            )
+            hedge = asyncio.ensure_future(self._request(fallbacks[0], prompt, action))
+            tasks.add(hedge)
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout - hedge_delay
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, deadline - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None and task.result():
+                        if task is hedge:
+                            metrics.incr("hedge.won")
+                        return task.result()
+
+            # 两个请求都没有有效结果
+            if primary.exception():
+                raise primary.exception()
+            return ""
+        finally:
+            # 取消落败的请求
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _response_cache_enabled(self, room: Optional["GameRoom"]) -> bool:
+        """是否使用响应缓存（全局回放模式）"""
+        if self.response_cache is None or room is None:
+            return False
+        return room.config.ai_response_cache
+
+    @staticmethod
+    def _fallback_models(room: Optional["GameRoom"], model_id: str) -> List[str]:
+        """获取备用模型列表（排除主模型）"""
+        if not room:
+            return []
+        return [m for m in room.config.ai_fallback_models if m and m != model_id]
+
+    def _hedge_delay(self, room: "GameRoom", model_id: str, timeout: float) -> float:
+        """对冲延迟：主模型近期耗时的分位数，不低于配置的下限
+
+        样本不足时取超时时间的一半。
+        """
+        percentile = self.providers.latency_percentile(model_id, room.config.ai_hedge_percentile)
+        if percentile is None or self.providers.latency_samples(model_id) < HEDGE_MIN_SAMPLES:
+            delay = timeout / 2
+        else:
+            delay = percentile / 1000
+        return min(max(delay, room.config.ai_hedge_min_delay), timeout)
+
+    def _record_latency(self, model_id: str, latency_ms: float, action: str = "") -> None:
+        """记录调用耗时，首次调用额外记录冷/热启动耗时"""
+        metrics.observe("llm_latency", latency_ms)
+        if action:
+            metrics.observe(f"llm_latency.{action}", latency_ms)
+        if self.providers.first_call(model_id):
+            state = "warm" if self.providers.is_warmed(model_id) else "cold"
+            metrics.observe(f"first_action_latency.{state}", latency_ms)
+            logger.info(
+                f"[狼人杀AI] 模型 '{model_id or '默认'}' 首次AI行动耗时 {latency_ms:.0f}ms"
+                f"（{'已预热' if state == 'warm' else '未预热'}）"
+            )
+
+    @staticmethod
+    def _build_context(
+        player: "Player",
+        room: "GameRoom",
+        action: str,
+        extras: Iterable[Tuple[str, str]] = ()
+    ) -> str:
+        """构建上下文并按行动预算裁剪
+
+        Args:
+            extras: 追加的分析段落 [(段落key, 文本), ...]，空文本会被跳过
+        """
+        if player.ai_context:
+            sections = ContextBudget.sections_from_context(player.ai_context)
+        else:
+            sections = [PromptSection("identity", f"你是{player.number}号玩家")]
+        sections += [PromptSection(key, text) for key, text in extras if text]
+        return ContextBudget.for_room(room, action).fit(sections, player.name)
+
+    @staticmethod
+    def _structured_output(room: "GameRoom") -> bool:
+        """房间是否启用结构化输出"""
+        return room.config.ai_structured_output
+
+    def _output_format(self, room: "GameRoom", spec: DecisionSpec) -> str:
+        """获取提示词末尾的输出格式说明（没有旧版格式的决策始终使用结构化输出）"""
+        if self._structured_output(room) or spec.action not in LEGACY_OUTPUT_FORMATS:
+            return format_instructions(spec)
+        return LEGACY_OUTPUT_FORMATS[spec.action]
+
+    async def _decide(
+        self,
+        prompt: str,
+        player: "Player",
+        room: "GameRoom",
+        spec: DecisionSpec
+    ) -> Optional[Decision]:
+        """调用LLM并按决策协议解析
+
+        只需要编号的决策优先流式调用，目标一出现就结束生成；
+        否则先严格解析，失败则本地修复；仍失败时（仅结构化模式）重新询问一次模型。
+        """
+        response = None
+        model_id = self.router.route(player, room, spec.action)
+        if room.config.ai_early_exit and spec.kind in (KIND_TARGET, KIND_VOTE):
+            decision, response = await self._stream_decide(prompt, player, room, spec, model_id)
+            if decision:
+                return decision
+
+        if response is None:
+            response = await self._call_llm(
+                prompt, player, room=room, action=spec.action, model_id=model_id
+            )
+        if not response:
+            return None
+
+        decision = DecisionParser.parse(response, spec)
+        if decision is None and self._structured_output(room):
+            logger.warning(f"[狼人杀AI] {player.name} 的{spec.action}决策无法解析，重新询问")
+            response = await self._call_llm(
+                build_retry_prompt(prompt, spec, response), player,
+                room=room, action=spec.action, model_id=model_id
+            )
+            if response:
+                decision = DecisionParser.parse(response, spec)
+
+        if decision is None:
+            logger.warning(
+                f"[狼人杀AI] {player.name} 的{spec.action}决策解析失败"
+                f"（失败率 {DecisionParser.failure_rate(spec.action):.0%}）"
+            )
+        return decision
+
+    async def _stream_decide(
+        self,
+        prompt: str,
+        player: "Player",
+        room: "GameRoom",
+        spec: DecisionSpec,
+        model_id: str
+    ) -> Tuple[Optional[Decision], Optional[str]]:
+        """流式决策：目标编号一出现就按当前房间状态校验，并取消剩余的生成
+
+        model_id 为 _decide 已路由的模型。首段和段间等待各不超过 LLM_TIMEOUT_SECONDS。
+
+        Returns:
+            (提前得到的决策, 完整回复)；不支持流式或调用失败时都为 None
+        """
+        provider = self._streaming_provider(model_id, room)
+        if provider is None:
+            return None, None
+
+        text = ""
+        received = False
+        recorded = False
+        start = time.perf_counter()
+        self.providers.begin(model_id)
+        deltas = self._stream_text(provider, prompt)
+        try:
+            while True:
+                delta = await self._next_delta(deltas)
+                if delta is None:
+                    break
+                received = True
+                text += delta
+                decision = DecisionParser.parse_partial(text, spec)
+                if decision is None:
+                    continue
+                if decision.target is not None and not TargetValidator.validate_target(
+                    room, decision.target, spec.action
+                ):
+                    # 生成期间局势已变化（目标已出局），改用普通调用重新决策
+                    return None, None
+                latency_ms = (time.perf_counter() - start) * 1000
+                self.providers.record_success(model_id, latency_ms)
+                recorded = True
+                self._record_early_exit(player, spec.action, latency_ms)
+                return decision, text
+
+            # 生成完毕仍未提前得到合法目标，交给完整解析流程
+            latency_ms = (time.perf_counter() - start) * 1000
+            text = text.strip()
+            if text:
+                self.providers.record_success(model_id, latency_ms)
+                self._record_latency(model_id, latency_ms, spec.action)
+                logger.info(f"[狼人杀AI] {player.name} 决策: {text[:100]}")
+            else:
+                self.providers.record_failure(model_id)
+            recorded = True
+            return None, text or None
+        except asyncio.TimeoutError:
+            logger.warning(f"[狼人杀AI] {player.name} 流式决策 {self.LLM_TIMEOUT_SECONDS} 秒没有新内容")
+            self.providers.record_failure(model_id)
+            recorded = True
+            return None, None
+        except Exception as e:
+            if not received and isinstance(e, (NotImplementedError, AttributeError)):
+                # provider 未实现流式输出，交给普通调用（finally 中释放探测名额）
+                return None, None
+            logger.warning(f"[狼人杀AI] {player.name} 流式决策失败: {e}")
+            self.providers.record_failure(model_id)
+            recorded = True
+            return None, None
+        finally:
+            if not recorded:
+                # 提前放弃、不支持流式或被取消（如超过决策时限）时释放半开探测名额
+                self.providers.release(model_id)
+            await deltas.aclose()
+
+    def _record_early_exit(self, player: "Player", action: str, latency_ms: float) -> None:
+        """记录提前结束的耗时，并与该行动完整生成的中位耗时比较"""
+        metrics.incr(f"early_exit.{action}")
+        metrics.observe(f"early_exit_latency.{action}", latency_ms)
+        baseline = metrics.percentile(f"llm_latency.{action}", 0.5)
+        if baseline is None:
+            logger.info(f"[狼人杀AI] {player.name} 的{action}决策提前结束，耗时 {latency_ms:.0f}ms")
+            return
+        saved = max(baseline - latency_ms, 0.0)
+        metrics.observe(f"early_exit_saved.{action}", saved)
+        logger.info(
+            f"[狼人杀AI] {player.name} 的{action}决策提前结束，耗时 {latency_ms:.0f}ms，"
+            f"较完整生成中位数约节省 {saved:.0f}ms"
+        )
+
+    def _streaming_provider(self, model_id: str, room: "GameRoom"):
+        """获取可流式调用的 provider（不支持流式、熔断中或启用响应缓存时返回 None）"""
+        provider = self._get_provider(model_id)
+        if (
+            provider is None
+            or not hasattr(provider, "text_chat_stream")
+            or not self.providers.is_available(model_id)
+            or self._response_cache_enabled(room)
+        ):
+            return None
+        return provider
+
+    async def _next_delta(self, deltas: AsyncIterator[str]) -> Optional[str]:
+        """等待下一段流式输出，流结束时返回 None
+
+        首段和段间等待各不超过 LLM_TIMEOUT_SECONDS，超时抛出 asyncio.TimeoutError。
+        """
+        try:
+            return await asyncio.wait_for(deltas.__anext__(), timeout=self.LLM_TIMEOUT_SECONDS)
+        except StopAsyncIteration:
+            return None
+
+    async def _stream_text(self, provider, prompt: str) -> AsyncIterator[str]:
+        """逐段产出流式输出的增量文本（提前退出时请调用 aclose 取消生成）"""
+        stream = provider.text_chat_stream(prompt=prompt, system_prompt=PLAYER_SYSTEM_PROMPT)
+        try:
+            with self.router.track():
+                async for response in stream:
+                    # 只处理增量片段，最后的完整响应忽略
+                    if getattr(response, "is_chunk", False) and response.result_chain:
+                        yield response.result_chain.get_plain_text()
+        finally:
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+
+    @staticmethod
+    def _log_fallback(player: "Player", action: str) -> None:
+        """记录一次LLM决策失败后改用规则决策"""
+        metrics.incr(f"heuristic.fallback.{action}")
+        logger.info(f"[狼人杀AI] {player.name} 的{action}决策失败，改用规则决策")
+
     @staticmethod
     def extract_number(response: str) -> Optional[int]:
         """从响应中提取数字"""
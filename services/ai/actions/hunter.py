@@ -1,9 +1,10 @@
 """猎人行动 - 开枪决策"""
 from typing import Optional, TYPE_CHECKING
-from astrbot.api import logger
 
 from .base import BaseAction
+from ..heuristic import HeuristicBrain
 from ..validators import TargetValidator
+from ..protocol import DecisionSpec
 from ..context import ContextBuilder
 from ..prompts import (
     ANTI_HALLUCINATION_PROTOCOL,
@@ -20,25 +21,26 @@ class HunterAction(BaseAction):
 
     async def decide_shoot(self, player: "Player", room: "GameRoom") -> Optional[int]:
         """AI猎人决定开枪目标"""
-        context = ContextBuilder.build_context(player, room)
+        context = self._build_context(player, room, "hunter_shoot")
         role_key = ContextBuilder.get_role_key(player)
         soul_setting = ROLE_SOUL_SETTINGS.get(role_key, "")
 
+        spec = DecisionSpec(
+            action="hunter_shoot",
+            valid_targets=TargetValidator.get_valid_targets(room, exclude_player=player),
+            allow_none=True,
+            none_label="不开枪"
+        )
+
         prompt = ROLE_PROMPTS["hunter_shoot"].format(
             anti_hallucination=ANTI_HALLUCINATION_PROTOCOL,
             soul_setting=soul_setting,
-            context=context
+            context=context,
+            output_format=self._output_format(room, spec)
         )
 
-        response = await self._call_llm(prompt, player)
-        if response:
-            if "不开枪" in response or "不开" in response:
-                return None
-            target = self.extract_number(response)
-            if target:
-                # 验证开枪目标
-                validated = TargetValidator.validate_kill_target(room, target, player)
-                if validated:
-                    return validated
-                logger.warning(f"[狼人杀AI] 猎人 {player.name} 选择的目标 {target} 无效，取消开枪")
-        return None
+        decision = await self._decide(prompt, player, room, spec)
+        if decision:
+            return decision.target
+        self._log_fallback(player, spec.action)
+        return HeuristicBrain.hunter_shoot(player, room)
@@ -1,9 +1,10 @@
 """预言家行动 - 验人"""
 from typing import Optional, TYPE_CHECKING
-from astrbot.api import logger
 
 from .base import BaseAction
+from ..heuristic import HeuristicBrain
 from ..validators import TargetValidator
+from ..protocol import DecisionSpec
 from ..context import ContextBuilder
 from ..prompts import (
     ANTI_HALLUCINATION_PROTOCOL,
@@ -20,32 +21,27 @@ class SeerAction(BaseAction):
 
     async def decide_check(self, player: "Player", room: "GameRoom") -> Optional[int]:
         """AI预言家选择验人目标"""
-        context = ContextBuilder.build_context(player, room)
+        context = self._build_context(player, room, "seer_check")
         role_key = ContextBuilder.get_role_key(player)
         soul_setting = ROLE_SOUL_SETTINGS.get(role_key, "")
 
+        # 可验存活的其他玩家，排除已经验过的人
+        valid_targets = TargetValidator.get_valid_targets(room, exclude_player=player)
+        if player.ai_context and player.ai_context.seer_results:
+            checked = {r.get('target_number') for r in player.ai_context.seer_results}
+            unchecked = [t for t in valid_targets if t not in checked]
+            valid_targets = unchecked or valid_targets
+        spec = DecisionSpec(action="seer_check", valid_targets=valid_targets)
+
         prompt = ROLE_PROMPTS["seer_check"].format(
             anti_hallucination=ANTI_HALLUCINATION_PROTOCOL,
             soul_setting=soul_setting,
-            context=context
+            context=context,
+            output_format=self._output_format(room, spec)
         )
 
-        response = await self._call_llm(prompt, player)
-        if response:
-            target = self.extract_number(response)
-            if target:
-                # 预言家可以验存活的人
-                validated = TargetValidator.validate_check_target(room, target, player)
-                if validated:
-                    return validated
-                # 如果验证失败，随机选择
-                logger.warning(f"[狼人杀AI] 预言家 {player.name} 选择的目标无效，随机选择")
-                valid_targets = TargetValidator.get_valid_targets(room, exclude_player=player)
-                # 排除已经验过的人
-                if player.ai_context and player.ai_context.seer_results:
-                    checked = [r.get('target_number') for r in player.ai_context.seer_results]
-                    valid_targets = [t for t in valid_targets if t not in checked]
-                if valid_targets:
-                    import random
-                    return random.choice(valid_targets)
-        return None
+        decision = await self._decide(prompt, player, room, spec)
+        if decision:
+            return decision.target
+        self._log_fallback(player, spec.action)
+        return HeuristicBrain.seer_check(player, room)
@@ -1,10 +1,14 @@
 """发言行动 - 白天发言和遗言"""
+import asyncio
 import re
 import random
-from typing import List, TYPE_CHECKING
+import time
+from typing import Awaitable, Callable, List, Optional, TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BaseAction
+from ..heuristic import HeuristicBrain
+from ..metrics import metrics
 from ..context import ContextBuilder, SituationAnalyzer, BehaviorAnalyzer
 from ..prompts import (
     ANTI_HALLUCINATION_PROTOCOL,
@@ -20,12 +24,26 @@ from ..prompts import (
 if TYPE_CHECKING:
     from ....models import GameRoom, Player
 
+# 发言最大长度
+MAX_SPEECH_LENGTH = 300
+# 流式发言每段的最短长度（太短的句子与下一句合并发送）
+MIN_CHUNK_LENGTH = 15
+
+# 句子结束标点
+_SENTENCE_END_RE = re.compile(r"[。！？!?…~～\n]+")
+_SPEECH_PREFIX_RE = re.compile(r'^[\[【]?(发言|说话|speech)[\]】]?[：:]\s*', re.IGNORECASE)
+
+
+def _strip_speech_prefix(text: str) -> str:
+    """去掉模型自带的"发言："前缀"""
+    return _SPEECH_PREFIX_RE.sub('', text)
+
 
 class SpeechAction(BaseAction):
     """发言行动"""
 
-    def __init__(self, context):
-        super().__init__(context)
+    def __init__(self, context, providers=None, response_cache=None, router=None):
+        super().__init__(context, providers, response_cache, router)
         self._player_personalities = {}
 
     def _get_player_personality(self, player: "Player") -> str:
@@ -36,30 +54,16 @@ class SpeechAction(BaseAction):
             logger.info(f"[狼人杀AI] 为 {player.name} 分配性格: {personality_key}")
         return PERSONALITY_TEMPLATES[self._player_personalities[player.id]]
 
-    async def generate_speech(self, player: "Player", room: "GameRoom", is_pk: bool = False) -> str:
-        """AI生成白天发言"""
-        context = ContextBuilder.build_context(player, room)
-        context += "\n" + SituationAnalyzer.get_situation_awareness(room)
-
-        # 检查特殊事件
-        special_event_tip = ContextBuilder.get_special_event_tip(player, room)
-        if special_event_tip:
-            context += "\n" + special_event_tip
-
-        # 添加战术指令
-        tactical_directive = SituationAnalyzer.get_tactical_directive(player, room)
-        if tactical_directive:
-            context += "\n" + tactical_directive
-
-        # 添加对跳辩论提示词
-        duel_context = SituationAnalyzer.get_duel_context(player, room)
-        if duel_context:
-            context += "\n" + duel_context
-
-        # 添加玩家行为分析
-        behavior_analysis = BehaviorAnalyzer.get_behavior_analysis_prompt(player, room)
-        if behavior_analysis:
-            context += "\n" + behavior_analysis
+    def _build_speech_prompt(self, player: "Player", room: "GameRoom", is_pk: bool) -> str:
+        """构建白天/PK发言提示词"""
+        # 上下文 + 局势分析、特殊事件、战术指令、对跳辩论、玩家行为分析（超出预算时按优先级裁剪）
+        context = self._build_context(player, room, "pk_speech" if is_pk else "day_speech", [
+            ("situation", SituationAnalyzer.get_situation_awareness(room)),
+            ("special_event", ContextBuilder.get_special_event_tip(player, room)),
+            ("tactical", SituationAnalyzer.get_tactical_directive(player, room)),
+            ("duel", SituationAnalyzer.get_duel_context(player, room)),
+            ("behavior", BehaviorAnalyzer.get_behavior_analysis_prompt(player, room)),
+        ])
 
         role_key = ContextBuilder.get_role_key(player)
         role_name = player.role.display_name if player.role else "玩家"
@@ -101,21 +105,143 @@ class SpeechAction(BaseAction):
                 human_style=HUMAN_STYLE_TIPS
             )
 
-        response = await self._call_llm(prompt, player)
+        return prompt
+
+    async def generate_speech(
+        self,
+        player: "Player",
+        room: "GameRoom",
+        is_pk: bool = False,
+        model_id: Optional[str] = None
+    ) -> str:
+        """AI生成白天发言（model_id 为流式发言已路由的模型，避免重复路由）"""
+        prompt = self._build_speech_prompt(player, room, is_pk)
+
+        response = await self._call_llm(
+            prompt, player, room=room, action="pk_speech" if is_pk else "day_speech", model_id=model_id
+        )
         if response:
-            response = re.sub(r'^[\[【]?(发言|说话|speech)[\]】]?[：:]\s*', '', response, flags=re.IGNORECASE)
-            return response[:300]
+            return _strip_speech_prefix(response)[:MAX_SPEECH_LENGTH]
+
+        self._log_fallback(player, "pk_speech" if is_pk else "day_speech")
+        return HeuristicBrain.speech(player, room, is_pk)
+
+    async def stream_speech(
+        self,
+        player: "Player",
+        room: "GameRoom",
+        on_chunk: Callable[[str], Awaitable[None]],
+        is_pk: bool = False
+    ) -> str:
+        """流式生成白天发言：每凑满一句就通过 on_chunk 发出，返回完整发言
 
-        defaults = [
-            "我先听听大家怎么说吧",
-            "目前信息太少了，我再观察一下",
-            "emmm 我暂时没什么想法",
-        ]
-        return random.choice(defaults)
+        provider 不支持流式输出、启用了响应缓存或流式调用失败（含首段/段间超时）
+        且一句都没发出时，回退为一次性生成并整段发出。
+        """
+        start = time.perf_counter()
+        action = "pk_speech" if is_pk else "day_speech"
+        model_id = self.router.route(player, room, action)
+        provider = self._streaming_provider(model_id, room)
+
+        if provider is not None:
+            prompt = self._build_speech_prompt(player, room, is_pk)
+            speech = await self._stream_llm(prompt, player, provider, model_id, on_chunk, start, action)
+            if speech:
+                return speech
+
+        speech = await self.generate_speech(player, room, is_pk, model_id=model_id)
+        metrics.observe("speech_first_chunk.full", (time.perf_counter() - start) * 1000)
+        await on_chunk(speech)
+        return speech
+
+    async def _stream_llm(
+        self,
+        prompt: str,
+        player: "Player",
+        provider,
+        model_id: str,
+        on_chunk: Callable[[str], Awaitable[None]],
+        start: float,
+        action: str
+    ) -> str:
+        """逐句转发流式输出，返回已发出的完整内容（一句都没发出时返回空字符串）
+
+        首段和段间等待超时或出错时，以已发出的内容结束发言。
+        """
+        sent: List[str] = []
+        sent_length = 0
+        buffer = ""
+        received = False
+        failed = False
+        self.providers.begin(model_id)
+        deltas = self._stream_text(provider, prompt)
+
+        async def emit(text: str) -> None:
+            nonlocal sent_length
+            text = text.strip()
+            if not sent:
+                text = _strip_speech_prefix(text)
+                metrics.observe("speech_first_chunk.stream", (time.perf_counter() - start) * 1000)
+            text = text[:MAX_SPEECH_LENGTH - sent_length]
+            if text:
+                await on_chunk(text)
+                sent.append(text)
+                sent_length += len(text)
+
+        try:
+            while True:
+                delta = await self._next_delta(deltas)
+                if delta is None:
+                    break
+                received = True
+                buffer += delta
+
+                # 按句子切分，凑够最短长度再发
+                while sent_length < MAX_SPEECH_LENGTH:
+                    match = _SENTENCE_END_RE.search(buffer, MIN_CHUNK_LENGTH)
+                    if not match:
+                        break
+                    await emit(buffer[:match.end()])
+                    buffer = buffer[match.end():]
+                if sent_length >= MAX_SPEECH_LENGTH:
+                    break
+
+            if buffer and sent_length < MAX_SPEECH_LENGTH:
+                await emit(buffer)
+
+        except asyncio.TimeoutError:
+            failed = True
+            logger.warning(
+                f"[狼人杀AI] {player.name} 流式发言{'中断' if sent else '失败'}："
+                f"{self.LLM_TIMEOUT_SECONDS}秒没有新内容"
+            )
+        except asyncio.CancelledError:
+            self.providers.release(model_id)
+            raise
+        except Exception as e:
+            if not received and isinstance(e, (NotImplementedError, AttributeError)):
+                # provider 未实现流式输出
+                self.providers.release(model_id)
+                return ""
+            failed = True
+            logger.warning(f"[狼人杀AI] {player.name} 流式发言{'中断' if sent else '失败'}: {e}")
+        finally:
+            await deltas.aclose()
+
+        speech = "".join(sent)
+        if failed or not speech:
+            self.providers.record_failure(model_id)
+        else:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.providers.record_success(model_id, latency_ms)
+            self._record_latency(model_id, latency_ms, action)
+        if speech:
+            logger.info(f"[狼人杀AI] {player.name} 流式发言（{len(sent)}段）: {speech[:100]}")
+        return speech
 
     async def generate_last_words(self, player: "Player", room: "GameRoom") -> str:
         """AI生成遗言"""
-        context = ContextBuilder.build_context(player, room)
+        context = self._build_context(player, room, "last_words")
         role_key = ContextBuilder.get_role_key(player)
         role_name = player.role.display_name if player.role else "玩家"
 
@@ -135,8 +261,9 @@ class SpeechAction(BaseAction):
             human_style=HUMAN_STYLE_TIPS
         )
 
-        response = await self._call_llm(prompt, player)
+        response = await self._call_llm(prompt, player, room=room, action="last_words")
         if response:
             return response[:100]
 
-        return "我没什么好说的了，祝大家好运。"
+        self._log_fallback(player, "last_words")
+        return HeuristicBrain.last_words(player, room)
@@ -1,9 +1,11 @@
 """狼人行动 - 杀人和密谋"""
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 from astrbot.api import logger
 
 from .base import BaseAction
+from ..heuristic import HeuristicBrain
 from ..validators import TargetValidator
+from ..protocol import Decision, DecisionParser, DecisionSpec, KIND_TEAM
 from ..context import ContextBuilder, SituationAnalyzer
 from ..prompts import (
     ANTI_HALLUCINATION_PROTOCOL,
@@ -21,48 +23,109 @@ class WerewolfAction(BaseAction):
 
     async def decide_kill(self, player: "Player", room: "GameRoom") -> Optional[int]:
         """AI狼人选择击杀目标"""
-        context = ContextBuilder.build_context(player, room)
+        context = self._build_context(player, room, "werewolf_kill")
         role_key = ContextBuilder.get_role_key(player)
         soul_setting = ROLE_SOUL_SETTINGS.get(role_key, "")
         tactical_directive = SituationAnalyzer.get_tactical_directive(player, room)
 
+        # 可刀任何存活的其他玩家（包括队友，支持自刀战术）
+        spec = DecisionSpec(
+            action="werewolf_kill",
+            valid_targets=TargetValidator.get_valid_targets(room, exclude_player=player)
+        )
+
         prompt = ROLE_PROMPTS["werewolf_kill"].format(
             anti_hallucination=ANTI_HALLUCINATION_PROTOCOL,
             soul_setting=soul_setting,
             context=context,
-            tactical_directive=tactical_directive
+            tactical_directive=tactical_directive,
+            output_format=self._output_format(room, spec)
         )
 
-        response = await self._call_llm(prompt, player)
-        if response:
-            target = self.extract_number(response)
+        decision = await self._decide(prompt, player, room, spec)
+        if decision:
+            return decision.target
+        self._log_fallback(player, spec.action)
+        return HeuristicBrain.werewolf_kill(player, room)
+
+    async def decide_team(self, wolves: List["Player"], room: "GameRoom") -> Optional[Dict[int, Decision]]:
+        """狼队统一决策：一次调用生成所有AI狼人的密谋和刀人选择
+
+        Args:
+            wolves: 需要决策的AI狼人（第一个作为指挥，使用其模型和上下文）
+
+        Returns:
+            {狼人编号: 决策}，密谋内容在 speech 中；失败返回 None
+        """
+        leader = wolves[0]
+        context = self._build_context(leader, room, "werewolf_team")
+        soul_setting = ROLE_SOUL_SETTINGS.get("werewolf", "")
+        tactical_directive = SituationAnalyzer.get_tactical_directive(leader, room)
+
+        ai_numbers = {w.number for w in wolves}
+        members = []
+        for wolf in room.get_alive_werewolves():
+            tag = "AI，由你代言" if wolf.number in ai_numbers else "真人队友"
+            members.append(f"- {wolf.display_name}（{tag}）")
+
+        spec = DecisionSpec(
+            action="werewolf_team",
+            kind=KIND_TEAM,
+            valid_targets=TargetValidator.get_valid_targets(room),
+            members=[w.number for w in wolves]
+        )
+
+        prompt = ROLE_PROMPTS["werewolf_team"].format(
+            anti_hallucination=ANTI_HALLUCINATION_PROTOCOL,
+            soul_setting=soul_setting,
+            context=context,
+            tactical_directive=tactical_directive,
+            members="\n".join(members),
+            human_plans=self._get_human_plans(leader, room),
+            output_format=self._output_format(room, spec)
+        )
+
+        response = await self._call_llm(prompt, leader, room=room, action=spec.action)
+        if not response:
+            return None
+        plan = DecisionParser.parse_team(response, spec)
+        if plan is None:
+            logger.warning(f"[狼人杀AI] 狼队统一决策解析失败: {response[:100]}")
+        return plan
+
+    @staticmethod
+    def _get_human_plans(leader: "Player", room: "GameRoom") -> str:
+        """汇总真人狼队友今晚的密谋和已选目标"""
+        human_wolves = [w for w in room.get_alive_werewolves() if not w.is_ai]
+        if not human_wolves:
+            return "无（狼队全部由AI组成）"
+
+        lines = []
+        human_names = {w.display_name for w in human_wolves}
+        if leader.ai_context:
+            for msg in leader.ai_context.wolf_chat_messages:
+                if msg["round"] == room.current_round and msg["sender"] in human_names:
+                    lines.append(f"{msg['sender']}：{msg['content']}")
+
+        for wolf in human_wolves:
+            target_id = room.vote_state.night_votes.get(wolf.id)
+            target = room.get_player(target_id) if target_id else None
             if target:
-                # 使用验证器确保目标有效
-                validated = TargetValidator.validate_kill_target(room, target, player)
-                if validated:
-                    return validated
-                # 如果验证失败，尝试随机选择存活目标
-                logger.warning(f"[狼人杀AI] 狼人 {player.name} 选择的目标无效，随机选择")
-                valid_targets = TargetValidator.get_valid_targets(room, exclude_player=player)
-                # 排除狼队友
-                wolves = room.get_alive_werewolves()
-                wolf_numbers = [w.number for w in wolves]
-                valid_targets = [t for t in valid_targets if t not in wolf_numbers]
-                if valid_targets:
-                    import random
-                    return random.choice(valid_targets)
-        return None
+                lines.append(f"{wolf.display_name} 已选择刀 {target.display_name}")
+
+        return "\n".join(lines) if lines else "真人队友暂时还没有发言"
 
     async def decide_chat(self, player: "Player", room: "GameRoom") -> Optional[str]:
         """AI狼人生成密谋消息"""
-        context = ContextBuilder.build_context(player, room)
+        context = self._build_context(player, room, "werewolf_chat")
 
         prompt = ROLE_PROMPTS["werewolf_chat"].format(
             context=context,
             human_style=HUMAN_STYLE_TIPS
         )
 
-        response = await self._call_llm(prompt, player)
+        response = await self._call_llm(prompt, player, room=room, action="werewolf_chat")
         if response:
             return response[:50]
-        return None
+        self._log_fallback(player, "werewolf_chat")
+        return HeuristicBrain.werewolf_chat(player, room)
@@ -1,9 +1,10 @@
 """女巫行动 - 用药决策"""
 from typing import Optional, Tuple, TYPE_CHECKING
-from astrbot.api import logger
 
 from .base import BaseAction
+from ..heuristic import HeuristicBrain
 from ..validators import TargetValidator
+from ..protocol import DecisionSpec, KIND_WITCH, WITCH_PASS, WITCH_POISON, WITCH_SAVE
 from ..context import ContextBuilder
 from ..prompts import (
     ANTI_HALLUCINATION_PROTOCOL,
@@ -27,37 +28,40 @@ class WitchAction(BaseAction):
         killed_player_name: Optional[str] = None
     ) -> Tuple[str, Optional[int]]:
         """AI女巫决定用药"""
-        context = ContextBuilder.build_context(player, room)
+        context = self._build_context(player, room, "witch_action")
         role_key = ContextBuilder.get_role_key(player)
         soul_setting = ROLE_SOUL_SETTINGS.get(role_key, "")
 
         available_actions = []
+        witch_actions = []
         if killed_player_name and can_save:
             available_actions.append(f"💊 今晚 {killed_player_name} 被狼人杀害，你可以使用【解药】救他")
+            witch_actions.append(WITCH_SAVE)
         if can_poison:
             available_actions.append("☠️ 你可以使用【毒药】毒死一个人")
-        if not available_actions:
-            available_actions.append("❌ 你的药都用完了，今晚无法行动")
+            witch_actions.append(WITCH_POISON)
+
+        # 没有可用的药，无需询问模型
+        if not witch_actions:
+            return (WITCH_PASS, None)
+
+        spec = DecisionSpec(
+            action="witch_action",
+            kind=KIND_WITCH,
+            valid_targets=TargetValidator.get_valid_targets(room, exclude_player=player),
+            witch_actions=witch_actions
+        )
 
         prompt = ROLE_PROMPTS["witch_action"].format(
             anti_hallucination=ANTI_HALLUCINATION_PROTOCOL,
             soul_setting=soul_setting,
             context=context,
-            available_actions="\n".join(available_actions)
+            available_actions="\n".join(available_actions),
+            output_format=self._output_format(room, spec)
         )
 
-        response = await self._call_llm(prompt, player)
-        if response:
-            response_lower = response.lower()
-            if "救" in response_lower or "save" in response_lower:
-                return ("save", None)
-            elif "毒" in response_lower or "poison" in response_lower:
-                target = self.extract_number(response)
-                if target:
-                    # 验证毒药目标
-                    validated = TargetValidator.validate_poison_target(room, target, player)
-                    if validated:
-                        return ("poison", validated)
-                    # 如果目标无效，不毒
-                    logger.warning(f"[狼人杀AI] 女巫 {player.name} 毒的目标 {target} 无效，取消操作")
-        return ("pass", None)
+        decision = await self._decide(prompt, player, room, spec)
+        if decision:
+            return (decision.action, decision.target)
+        self._log_fallback(player, spec.action)
+        return HeuristicBrain.witch_action(player, room, can_save, can_poison, killed_player_name)
@@ -0,0 +1,128 @@
+"""LLM响应缓存 - 用于回放、基准测试和模拟对局
+
+相同的（模型, 系统提示词, 提示词, 采样参数）直接返回缓存的回复，
+让全AI对局的回放/回归测试更快且可复现。线上对局默认不启用。
+LRU淘汰 + TTL过期，以JSON持久化到数据目录（写盘在线程中执行，不阻塞事件循环）。
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from astrbot.api import logger
+
+# 最大缓存条数（超出后淘汰最久未使用的）
+MAX_ENTRIES = 2000
+# 缓存有效期（秒）
+TTL_SECONDS = 7 * 24 * 3600
+# 每新增多少条写一次磁盘
+SAVE_EVERY = 20
+
+
+class LLMResponseCache:
+    """LLM响应缓存"""
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # {键: (写入时间, 回复)}
+        self._loaded = False
+        self._unsaved = 0
+        self._save_lock = asyncio.Lock()
+
+    @staticmethod
+    def make_key(model_id: str, system_prompt: str, prompt: str, params: Optional[dict] = None) -> str:
+        """生成缓存键"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw = json.dumps(
+            [model_id, system_prompt, prompt_hash, params or {}],
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存（过期返回 None）"""
+        self._ensure_loaded()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        created_at, response = entry
+        if time.time() - created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return response
+
+    def put(self, key: str, response: str) -> None:
+        """写入缓存（攒够 SAVE_EVERY 条后 needs_save 为真，由调用方 await save()）"""
+        self._ensure_loaded()
+        self._entries[key] = (time.time(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        self._unsaved += 1
+
+    @property
+    def needs_save(self) -> bool:
+        """新增条目是否已攒够一次写盘"""
+        return self._unsaved >= SAVE_EVERY
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+    # ==================== 持久化 ====================
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时从磁盘加载"""
+        if not self._loaded:
+            self._loaded = True
+            self.load()
+
+    def load(self) -> None:
+        """从磁盘加载（跳过已过期的条目）"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[狼人杀AI] 读取响应缓存失败: {e}")
+            return
+
+        now = time.time()
+        entries = sorted(
+            (item for item in data if now - item[1] <= self.ttl_seconds),
+            key=lambda item: item[1]
+        )
+        for key, created_at, response in entries[-self.max_entries:]:
+            self._entries[key] = (created_at, response)
+        logger.info(f"[狼人杀AI] 已加载 {len(self._entries)} 条响应缓存")
+
+    async def save(self) -> None:
+        """写入磁盘（在事件循环中取快照，线程中写文件；同一时间只有一个写入）"""
+        async with self._save_lock:
+            if not self._loaded or not self._unsaved:
+                return
+            items = [[key, created_at, response] for key, (created_at, response) in self._entries.items()]
+            unsaved, self._unsaved = self._unsaved, 0
+            try:
+                await asyncio.to_thread(self._write, items)
+            except OSError as e:
+                self._unsaved += unsaved
+                logger.warning(f"[狼人杀AI] 保存响应缓存失败: {e}")
+
+    def _write(self, items: List[list]) -> None:
+        """先写临时文件再替换，避免写一半损坏"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -1,5 +1,12 @@
 """上下文模块 - 管理AI玩家的游戏上下文"""
 from .builder import ContextBuilder
 from .analyzer import SituationAnalyzer, BehaviorAnalyzer
+from .budget import ContextBudget, PromptSection, estimate_tokens
+from .summary import RoundSummarizer, extract_claims
+from .tagger import BehaviorTagger
 
-__all__ = ['ContextBuilder', 'SituationAnalyzer', 'BehaviorAnalyzer']
+__all__ = [
+    'ContextBuilder', 'SituationAnalyzer', 'BehaviorAnalyzer',
+    'ContextBudget', 'PromptSection', 'estimate_tokens', 'RoundSummarizer', 'extract_claims',
+    'BehaviorTagger'
+]
@@ -1,8 +1,7 @@
 """局势分析器 - 分析游戏局势和玩家行为"""
-import re
 from typing import Dict, List, TYPE_CHECKING
-from astrbot.api import logger
 
+from ....models.events import EventType
 from ..prompts import (
     SITUATION_TEMPLATE,
     TACTICAL_DIRECTIVES,
@@ -11,6 +10,8 @@ from ..prompts import (
     BEHAVIOR_TAG_DEFINITIONS
 )
 
+from .tagger import BehaviorTagger
+
 if TYPE_CHECKING:
     from ....models import GameRoom, Player
 
@@ -59,20 +60,18 @@ class SituationAnalyzer:
                 return TACTICAL_DIRECTIVES["wolf_final_push"]
             elif wolf_count == 1 and alive_count >= 4:
                 return TACTICAL_DIRECTIVES["wolf_disadvantage"]
-            elif player.ai_context:
-                events = player.ai_context.game_events
-                for event in events[-5:]:
-                    if "查杀" in event and any(
-                        teammate.display_name in event
-                        for teammate in alive_wolves
-                        if teammate.id != player.id
-                    ):
+
+            # 本轮或上一轮有队友被报查杀
+            teammate_numbers = {w.number for w in alive_wolves if w.id != player.id}
+            for round_num in (room.current_round - 1, room.current_round):
+                for claim in room.events.in_round(round_num, EventType.CLAIM):
+                    if claim.data.get("result") == "狼人" and claim.data.get("check") in teammate_numbers:
                         return TACTICAL_DIRECTIVES["wolf_teammate_exposed"]
-            if player.ai_context:
-                events = player.ai_context.game_events
-                for event in events[-10:]:
-                    if "预言家" in event and ("死" in event or "出局" in event):
-                        return TACTICAL_DIRECTIVES["good_confused"]
+
+            # 跳过预言家的玩家已经出局
+            seer_claimers = SituationAnalyzer.get_seer_claimers(room)
+            if any(death.target in seer_claimers for death in room.events.of_type(EventType.DEATH)):
+                return TACTICAL_DIRECTIVES["good_confused"]
             return TACTICAL_DIRECTIVES["normal"]
 
         # 好人视角
@@ -81,22 +80,19 @@ class SituationAnalyzer:
                 return TACTICAL_DIRECTIVES["good_desperate"]
             return ""
 
+    @staticmethod
+    def get_seer_claimers(room: "GameRoom") -> List[str]:
+        """跳过预言家（或报过查验）的玩家，按首次起跳顺序"""
+        claimers = (c.actor for c in room.events.of_type(EventType.CLAIM) if c.data.get("role") == "预言家")
+        return list(dict.fromkeys(claimers))
+
     @staticmethod
     def get_duel_context(player: "Player", room: "GameRoom") -> str:
         """检测对跳并生成辩论提示词"""
         if not player.ai_context:
             return ""
 
-        events = player.ai_context.game_events
-        seer_jumpers = []
-
-        for event in events:
-            if "预言家" in event and ("跳" in event or "是预言家" in event):
-                match = re.search(r'(\d+号\S*|\S+).*?预言家', event)
-                if match:
-                    jumper = match.group(1)
-                    if jumper not in seer_jumpers:
-                        seer_jumpers.append(jumper)
+        seer_jumpers = SituationAnalyzer.get_seer_claimers(room)
 
         if len(seer_jumpers) >= 2:
             if player.display_name in seer_jumpers:
@@ -114,6 +110,13 @@ class SituationAnalyzer:
 class BehaviorAnalyzer:
     """玩家行为分析器"""
 
+    @staticmethod
+    def record_speech(room: "GameRoom", player_name: str, speech: str) -> List[str]:
+        """发言记录时打标签，写入房间的行为标签表（以最近一次发言为准）"""
+        tags = BehaviorTagger.for_room(room).tag(speech)
+        room.behavior_tags[player_name] = tags
+        return tags
+
     @staticmethod
     def analyze_player_behaviors(room: "GameRoom") -> Dict[str, List[str]]:
         """分析所有玩家的行为并生成标签"""
@@ -124,13 +127,8 @@ class BehaviorAnalyzer:
             if not p.ai_context:
                 continue
 
-            speeches = p.ai_context.speeches if hasattr(p.ai_context, 'speeches') else []
-            player_speeches = [s for s in speeches if s.get('player') == p.display_name]
-
-            if player_speeches:
-                last_speech = player_speeches[-1].get('content', '') if player_speeches else ''
-                if len(last_speech) < 15 or any(kw in last_speech for kw in ['过了', '没想法', '听不出']):
-                    tags.append("划水")
+            if "划水" in room.behavior_tags.get(p.display_name, []):
+                tags.append("划水")
 
             votes = p.ai_context.vote_history if hasattr(p.ai_context, 'vote_history') else []
             player_votes = [v for v in votes if v.get('voter') == p.display_name]
@@ -144,7 +142,7 @@ class BehaviorAnalyzer:
 
     @staticmethod
     def get_behavior_analysis_prompt(player: "Player", room: "GameRoom") -> str:
-        """生成玩家行为分析提示词"""
+        """生成玩家行为分析提示词（读取发言时已计算好的标签）"""
         if not player.ai_context:
             return ""
 
@@ -155,25 +153,7 @@ class BehaviorAnalyzer:
             if p.id == player.id:
                 continue
 
-            tags = []
-            speeches = player.ai_context.speeches
-            votes = player.ai_context.vote_history
-
-            p_speeches = [s for s in speeches if s.get('player') == p.display_name]
-            p_votes = [v for v in votes if v.get('voter') == p.display_name]
-
-            if p_speeches:
-                last_speech = p_speeches[-1].get('content', '')
-                if len(last_speech) < 20 or any(kw in last_speech for kw in ['过了', '没想法', '听不出', '不知道']):
-                    tags.append("划水")
-                if any(kw in last_speech for kw in ['！', '?!', '什么鬼', '搞笑']):
-                    tags.append("情绪激动")
-                if any(kw in last_speech for kw in ['因为', '所以', '逻辑', '分析', '证据']):
-                    tags.append("逻辑清晰")
-                if any(kw in last_speech for kw in ['不一定是狼', '可能冤枉', '再看看', '先别投']):
-                    tags.append("试图保人")
-                if any(kw in last_speech for kw in ['假预言家', '悍跳', '不信', '骗子']):
-                    tags.append("攻击预言家")
+            tags = room.behavior_tags.get(p.display_name)
 
             if tags:
                 lines.append(f"- {p.display_name}：【标签：{'】【标签：'.join(tags)}】")
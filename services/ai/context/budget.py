@@ -0,0 +1,211 @@
+"""上下文预算 - 按行动控制提示词中上下文的token用量
+
+提示词由多个段落拼接（规则、身份、事件、发言、投票、局势分析……），
+后期对局很容易膨胀。每个行动有自己的预算（夜间和只需编号的行动更小），
+每个段落按行动分配优先级，超出预算时从优先级最低的段落开始
+先精简（减少展示条数、换用精简规则），仍超出再整段删除；核心段落永不删除。
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
+from astrbot.api import logger
+
+from ..metrics import metrics
+from ..prompts import GAME_RULES_BRIEF
+
+if TYPE_CHECKING:
+    from ....models import AIPlayerContext, GameRoom
+
+# 默认上下文预算（token）
+DEFAULT_CONTEXT_BUDGET = 3000
+
+# 各行动的预算占比（相对 ai_context_budget，未列出的行动使用完整预算）
+# 夜间和只需输出编号的行动用不到完整的发言和讨论记录
+ACTION_BUDGET_SHARES: Dict[str, float] = {
+    "seer_check": 0.5,
+    "witch_action": 0.5,
+    "werewolf_kill": 0.6,
+    "hunter_shoot": 0.6,
+    "werewolf_team": 0.8,
+    "werewolf_chat": 0.8,
+}
+
+# 优先级达到该值的段落不会被裁剪
+KEEP_PRIORITY = 90
+
+# 段落默认优先级（越高越重要）
+DEFAULT_PRIORITIES: Dict[str, int] = {
+    "identity": 100,
+    "phase": 95,
+    "alive": 95,
+    "night_deaths": 95,
+    "first_day": 90,
+    "witch": 90,
+    "seer_results": 90,
+    "special_event": 80,
+    "exiles": 75,
+    "summaries": 70,
+    "vote_discussions": 70,
+    "votes": 65,
+    "wolf_chat": 60,
+    "speeches": 60,
+    "situation": 55,
+    "tactical": 50,
+    "duel": 45,
+    "events": 40,
+    "behavior": 30,
+    "rules": 20,
+}
+
+# 各行动的优先级调整（未列出的段落使用默认优先级）
+ACTION_PROFILES: Dict[str, Dict[str, int]] = {
+    "day_vote": {"vote_discussions": 85, "votes": 80, "speeches": 70, "behavior": 50},
+    "day_speech": {"speeches": 80, "duel": 70, "tactical": 65},
+    "pk_speech": {"speeches": 80, "duel": 75, "votes": 75},
+    "last_words": {"speeches": 75, "votes": 70},
+    "werewolf_kill": {"wolf_chat": 85, "tactical": 80, "vote_discussions": 40},
+    "werewolf_team": {"wolf_chat": 85, "tactical": 80, "vote_discussions": 40},
+    "werewolf_chat": {"wolf_chat": 85, "vote_discussions": 40},
+    "seer_check": {"speeches": 35, "vote_discussions": 40},  # 验人主要看轮次摘要，发言原文先裁
+    "witch_action": {"events": 60, "vote_discussions": 40},
+    "hunter_shoot": {"votes": 80, "speeches": 70},
+}
+
+_CJK_RE = re.compile(r"[\u2e80-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中文约1字1token，其余约4字符1token"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@dataclass
+class PromptSection:
+    """提示词段落"""
+    key: str
+    text: str
+    shrink: Optional[Callable[[], Optional[str]]] = None  # 返回更短的文本，无法再精简时返回 None
+    priority: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+class ContextBudget:
+    """上下文预算"""
+
+    def __init__(self, action: str, max_tokens: int):
+        self.action = action
+        self.max_tokens = max_tokens
+        self.priorities = {**DEFAULT_PRIORITIES, **ACTION_PROFILES.get(action, {})}
+
+    @classmethod
+    def for_room(cls, room: Optional["GameRoom"], action: str) -> "ContextBudget":
+        """按房间配置创建预算
+
+        默认为 ai_context_budget 乘以该行动的预算占比；
+        ai_context_budget_overrides 可按行动指定具体数值，如 "day_vote:2000"。
+        """
+        share = ACTION_BUDGET_SHARES.get(action, 1.0)
+        if room is None:
+            return cls(action, int(DEFAULT_CONTEXT_BUDGET * share))
+
+        max_tokens = int(room.config.ai_context_budget * share)
+        for item in room.config.ai_context_budget_overrides:
+            name, _, value = str(item).partition(":")
+            if name.strip() == action:
+                try:
+                    max_tokens = int(value)
+                except ValueError:
+                    logger.warning(f"[狼人杀AI] 无效的上下文预算配置: {item}")
+                break
+        return cls(action, max_tokens)
+
+    @staticmethod
+    def sections_from_context(ctx: "AIPlayerContext") -> List[PromptSection]:
+        """将AI玩家上下文拆成可裁剪的段落"""
+        from ....models.ai_player import PROMPT_SECTION_LIMITS
+
+        sections = []
+        for key, text in ctx.to_prompt_sections():
+            if key == "rules":
+                shrink = _brief_rules_shrinker()
+            elif key in PROMPT_SECTION_LIMITS:
+                shrink = _halving_shrinker(ctx, key, PROMPT_SECTION_LIMITS[key])
+            else:
+                shrink = None
+            sections.append(PromptSection(key, text, shrink))
+        return sections
+
+    def fit(self, sections: List[PromptSection], player_name: str = "") -> str:
+        """按预算裁剪段落并拼接（保持原有顺序）"""
+        sections = [s for s in sections if s.text]
+        for section in sections:
+            section.priority = self.priorities.get(section.key, 50)
+
+        before = total = sum(s.tokens for s in sections)
+        summarized, dropped = [], []
+
+        if self.max_tokens > 0 and total > self.max_tokens:
+            trimmable = sorted(
+                (s for s in sections if s.priority < KEEP_PRIORITY),
+                key=lambda s: s.priority
+            )
+            # 先从低优先级开始逐段精简
+            for section in trimmable:
+                while total > self.max_tokens and section.shrink:
+                    shorter = section.shrink()
+                    if shorter is None:
+                        break
+                    total += estimate_tokens(shorter) - section.tokens
+                    section.text = shorter
+                    if section.key not in summarized:
+                        summarized.append(section.key)
+            # 精简后仍超出，再从低优先级开始整段删除
+            for section in trimmable:
+                if total <= self.max_tokens:
+                    break
+                total -= section.tokens
+                section.text = ""
+                dropped.append(section.key)
+
+        metrics.observe(f"context_tokens.{self.action}", total)
+        if summarized or dropped:
+            metrics.incr(f"context_trimmed.{self.action}")
+            logger.info(
+                f"[狼人杀AI] {player_name} {self.action} 上下文 {before}→{total} tokens"
+                f"（预算{self.max_tokens}，精简: {','.join(summarized) or '无'}，"
+                f"删除: {','.join(dropped) or '无'}）"
+            )
+        else:
+            logger.debug(f"[狼人杀AI] {player_name} {self.action} 上下文 {total} tokens")
+
+        return "\n".join(s.text for s in sections if s.text)
+
+
+def _brief_rules_shrinker() -> Callable[[], Optional[str]]:
+    """完整规则 → 精简规则"""
+    used = False
+
+    def shrink() -> Optional[str]:
+        nonlocal used
+        if used:
+            return None
+        used = True
+        return GAME_RULES_BRIEF + "\n"
+
+    return shrink
+
+
+def _halving_shrinker(ctx: "AIPlayerContext", key: str, limit: int) -> Callable[[], Optional[str]]:
+    """记录类段落每次精简为一半条数，只剩1条时不再精简"""
+    def shrink() -> Optional[str]:
+        nonlocal limit
+        if limit <= 1:
+            return None
+        limit //= 2
+        return ctx.render_section(key, limit)
+
+    return shrink
@@ -1,8 +1,7 @@
 """上下文构建器 - 构建AI玩家的游戏上下文"""
-import re
 from typing import TYPE_CHECKING
-from astrbot.api import logger
 
+from ....models.events import EventType
 from ..prompts import (
     PEACEFUL_NIGHT_TIPS,
     DOUBLE_DEATH_TIPS
@@ -42,49 +41,24 @@ class ContextBuilder:
         if not player.ai_context:
             return ""
 
-        events = player.ai_context.game_events
         current_round = room.current_round
-        is_peaceful_night = False
-        has_death_event = False
-        saved_player_name = None
-        killed_target_name = None
-
-        for event in events[-10:]:
-            if f"第{current_round}夜：平安夜" in event:
-                is_peaceful_night = True
-            if f"第{current_round}夜死亡" in event:
-                has_death_event = True
-            if "救了" in event or "使用解药" in event:
-                match = re.search(r'救了\s*(\S+)', event)
-                if match:
-                    saved_player_name = match.group(1)
-
-        # 防御性检查
-        if is_peaceful_night and has_death_event:
-            logger.error(f"[BUG检测] 第{current_round}夜同时存在平安夜和死亡事件！")
-            return ""
-
-        if has_death_event or not is_peaceful_night:
+        dawn = room.events.last(current_round, EventType.DAWN)
+        if not dawn or dawn.data.get("deaths"):
             return ""
 
         role_key = ContextBuilder.get_role_key(player)
 
         if role_key == "witch":
-            if player.ai_context.last_killed_player:
-                saved_player_name = player.ai_context.last_killed_player
+            saved = room.events.last(current_round, EventType.SAVE)
+            saved_player_name = player.ai_context.last_killed_player or (saved.target if saved else None)
             if saved_player_name:
                 return PEACEFUL_NIGHT_TIPS["witch"].format(saved_player=saved_player_name)
             return ""
 
         if role_key == "werewolf":
-            for event in events[-10:]:
-                if "选择刀" in event or "击杀" in event:
-                    match = re.search(r'刀\s*(\S+)|击杀\s*(\S+)', event)
-                    if match:
-                        killed_target_name = match.group(1) or match.group(2)
-            if killed_target_name:
-                return PEACEFUL_NIGHT_TIPS["werewolf"].format(killed_target=killed_target_name)
-            return PEACEFUL_NIGHT_TIPS["werewolf"].format(killed_target="某人（你们昨晚的目标）")
+            kill = room.events.last(current_round, EventType.KILL)
+            killed_target = kill.target if kill and kill.target else "某人（你们昨晚的目标）"
+            return PEACEFUL_NIGHT_TIPS["werewolf"].format(killed_target=killed_target)
 
         return PEACEFUL_NIGHT_TIPS["good"]
 
@@ -94,58 +68,36 @@ class ContextBuilder:
         if not player.ai_context:
             return ""
 
-        events = player.ai_context.game_events
-        dead_players = []
-        wolf_killed_name = None
-        witch_poisoned_name = None
         current_round = room.current_round
-
-        for event in events[-10:]:
-            if "死亡" in event and f"第{current_round}夜" in event:
-                death_match = re.search(r'死亡[：:]\s*(.+)', event)
-                if death_match:
-                    dead_str = death_match.group(1)
-                    names = [n.strip() for n in dead_str.split(',') if n.strip()]
-                    for name in names:
-                        if name and name not in dead_players:
-                            dead_players.append(name)
-
-            if "选择刀" in event or "击杀" in event or "狼人杀" in event:
-                match = re.search(r'刀\s*(\S+)|击杀\s*(\S+)|杀.*?(\d+号)', event)
-                if match:
-                    wolf_killed_name = match.group(1) or match.group(2) or match.group(3)
-
-            if "毒" in event and ("使用" in event or "毒了" in event or "毒死" in event):
-                match = re.search(r'毒.*?(\d+号\S*|\S+)', event)
-                if match:
-                    witch_poisoned_name = match.group(1)
-
+        dawn = room.events.last(current_round, EventType.DAWN)
+        dead_players = dawn.data.get("deaths", []) if dawn else []
         if len(dead_players) < 2:
             return ""
 
-        dead_player_a = dead_players[-2] if len(dead_players) >= 2 else dead_players[0]
-        dead_player_b = dead_players[-1]
+        dead_player_a, dead_player_b = dead_players[-2], dead_players[-1]
+        kill = room.events.last(current_round, EventType.KILL)
+        poison = room.events.last(current_round, EventType.POISON)
 
         role_key = ContextBuilder.get_role_key(player)
 
         if role_key == "witch":
-            if witch_poisoned_name:
-                other_dead = dead_player_b if witch_poisoned_name in dead_player_a else dead_player_a
+            if poison:
+                other_dead = dead_player_a if poison.target == dead_player_b else dead_player_b
                 return DOUBLE_DEATH_TIPS["witch"].format(
                     dead_player_a=dead_player_a,
                     dead_player_b=dead_player_b,
-                    poisoned_player=witch_poisoned_name,
+                    poisoned_player=poison.target,
                     other_dead=other_dead
                 )
             return ""
 
         if role_key == "werewolf":
-            if wolf_killed_name:
-                witch_poisoned = dead_player_b if wolf_killed_name in dead_player_a else dead_player_a
+            if kill and kill.target:
+                witch_poisoned = dead_player_a if kill.target == dead_player_b else dead_player_b
                 return DOUBLE_DEATH_TIPS["werewolf"].format(
                     dead_player_a=dead_player_a,
                     dead_player_b=dead_player_b,
-                    wolf_killed=wolf_killed_name,
+                    wolf_killed=kill.target,
                     witch_poisoned=witch_poisoned
                 )
             return DOUBLE_DEATH_TIPS["werewolf"].format(
@@ -0,0 +1,169 @@
+"""回合摘要 - 天亮时把已结束回合的原始记录压缩为结构化摘要
+
+长局（4-5天、多次PK）中，发言/投票/讨论原始记录会占满提示词。
+每次天亮时，已结束回合的记录被提取为摘要（死亡、放逐、投票、跳身份、查验、遗言；
+狼人额外保留狼队刀人选择和密谋要点），
+并从AI上下文中移除原始条目，使提示词长度基本不随回合数增长。
+摘要由本地规则提取，不额外调用模型。
+"""
+import re
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ....models import AIPlayerContext
+
+# 遗言在摘要中保留的最大长度
+LAST_WORDS_LENGTH = 60
+# 狼人密谋要点在摘要中保留的最大长度
+WOLF_CHAT_DIGEST_LENGTH = 60
+
+# 跳身份（只认第一人称）："我是预言家"、"我跳女巫"、"本人是猎人"
+_CLAIM_RE = re.compile(
+    r"(?:我|本人)\s*(?:就|才|也|真)?\s*(?:是|跳|来跳)\s*(?:真的?|个|一个|一张)?\s*(预言家|女巫|猎人|村民|平民)"
+)
+# 跳身份前的假设说法（"如果我是预言家"不算跳身份）
+_HYPOTHETICAL_RE = re.compile(r"(?:如果|假如|要是|假设|若)\S{0,3}$")
+# 报查验："验了3号是金水"、"昨晚查验5号，查杀"
+_CHECK_RE = re.compile(r"验了?\s*(\d+)\s*号\S{0,8}?\s*(?:是|为)?\s*(金水|好人|查杀|狼人|狼)")
+_CHECK_RESULTS = {"金水": "好人", "好人": "好人", "查杀": "狼人", "狼人": "狼人", "狼": "狼人"}
+# 分句标点（判断查验是不是发言者本人报的）
+_CLAUSE_SPLIT_RE = re.compile(r"[，。,.!！?？；;\s]")
+_SEAT_RE = re.compile(r"\d+\s*号")
+
+_NIGHT_DEATH_RE = re.compile(r"^第\d+夜死亡：(.+)$")
+_LAST_WORDS_RE = re.compile(r"^遗言 (\S+?)：(.*)$", re.S)
+_WOLF_VOTE_RE = re.compile(r"^(?:狼队友 (\S+) |你)选择刀 (\S+)$")
+
+
+def extract_claims(content: str) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """提取发言中发言者本人的跳身份和报查验
+
+    只认第一人称的跳身份（"5号跳预言家"、"我不跳预言家"不算）；
+    报查验需要本段发言跳了预言家，或该分句由"我"报出（"我验了3号是金水"），
+    转述别人的查验（"3号验了7号是查杀"）不算。
+
+    Returns:
+        (自称的身份列表, [(查验编号, "好人"/"狼人"), ...])
+    """
+    roles = list(dict.fromkeys(
+        match.group(1) for match in _CLAIM_RE.finditer(content)
+        if not _HYPOTHETICAL_RE.search(content[:match.start()])
+    ))
+    claims_seer = "预言家" in roles
+    checks = list(dict.fromkeys(
+        (int(match.group(1)), _CHECK_RESULTS[match.group(2)])
+        for match in _CHECK_RE.finditer(content)
+        if claims_seer or _is_own_check(content[:match.start()])
+    ))
+    return roles, checks
+
+
+def _is_own_check(prefix: str) -> bool:
+    """查验所在分句是否由"我"报出（分句中没有别的玩家作主语）"""
+    clause = _CLAUSE_SPLIT_RE.split(prefix)[-1]
+    return ("我" in clause or "本人" in clause) and not _SEAT_RE.search(clause)
+
+
+class RoundSummarizer:
+    """回合摘要提取"""
+
+    @staticmethod
+    def compact(ctx: "AIPlayerContext", before_round: int) -> int:
+        """压缩 before_round 之前所有尚未压缩的回合
+
+        Returns:
+            本次压缩的回合数
+        """
+        rounds = range(ctx.compacted_round + 1, before_round)
+        for round_num in rounds:
+            ctx.round_summaries.append(RoundSummarizer.summarize(ctx, round_num))
+        if not rounds:
+            return 0
+
+        # 移除已压缩回合的原始记录
+        done = before_round - 1
+        ctx.speeches = [s for s in ctx.speeches if s.get("round", 0) > done]
+        ctx.vote_history = [v for v in ctx.vote_history if v.get("round", 0) > done]
+        ctx.vote_discussions = [d for d in ctx.vote_discussions if d.get("round", 0) > done]
+        ctx.wolf_chat_messages = [m for m in ctx.wolf_chat_messages if m.get("round", 0) > done]
+        kept = [(e, r) for e, r in zip(ctx.game_events, ctx.event_rounds) if r > done]
+        ctx.game_events = [e for e, _ in kept]
+        ctx.event_rounds = [r for _, r in kept]
+        ctx.compacted_round = done
+        return len(rounds)
+
+    @staticmethod
+    def summarize(ctx: "AIPlayerContext", round_num: int) -> Dict:
+        """提取单个回合的摘要"""
+        summary = {
+            "round": round_num,
+            "night": "",
+            "day": [],
+            "votes": [],
+            "claims": [],
+            "last_words": [],
+            "wolf_kills": [],
+            "wolf_chat": "",
+        }
+
+        for event, event_round in zip(ctx.game_events, ctx.event_rounds):
+            if event_round != round_num:
+                continue
+            death = _NIGHT_DEATH_RE.match(event)
+            if death:
+                summary["night"] = f"死亡 {death.group(1)}"
+            elif event.endswith("夜：平安夜"):
+                summary["night"] = "平安夜"
+            elif event.startswith(("投票放逐", "投票平票", "PK投票平票", "投票结果", "猎人 ")):
+                summary["day"].append(event.split("：", 1)[-1] if event.startswith("投票") else event)
+            elif _WOLF_VOTE_RE.match(event):
+                voter, target = _WOLF_VOTE_RE.match(event).groups()
+                summary["wolf_kills"].append(f"{voter or '我'}→{target}")
+            else:
+                last_words = _LAST_WORDS_RE.match(event)
+                if last_words:
+                    speaker, content = last_words.groups()
+                    summary["last_words"].append(f"{speaker}：{content[:LAST_WORDS_LENGTH]}")
+                    RoundSummarizer._extract_claims(speaker, content, summary["claims"])
+
+        summary["votes"] = RoundSummarizer._group_votes(
+            [v for v in ctx.vote_history if v.get("round") == round_num]
+        )
+
+        for speech in ctx.speeches:
+            if speech.get("round") == round_num:
+                RoundSummarizer._extract_claims(speech["player"], speech["content"], summary["claims"])
+
+        if ctx.is_werewolf:
+            chat = "；".join(
+                f"{m['sender']}：{m['content']}" for m in ctx.wolf_chat_messages if m.get("round") == round_num
+            )
+            if len(chat) > WOLF_CHAT_DIGEST_LENGTH:
+                chat = chat[:WOLF_CHAT_DIGEST_LENGTH] + "…"
+            summary["wolf_chat"] = chat
+
+        return summary
+
+    @staticmethod
+    def _group_votes(votes: List[dict]) -> List[str]:
+        """按目标汇总投票：[PK]目标←投票人1,投票人2"""
+        groups: Dict[tuple, List[str]] = {}
+        for vote in votes:
+            groups.setdefault((vote.get("is_pk", False), vote["target"]), []).append(vote["voter"])
+        return [
+            f"{'[PK]' if is_pk else ''}{target}←{','.join(voters)}"
+            for (is_pk, target), voters in groups.items()
+        ]
+
+    @staticmethod
+    def _extract_claims(speaker: str, content: str, claims: List[str]) -> None:
+        """提取发言中的跳身份和报查验"""
+        roles, checks = extract_claims(content)
+        for role in roles:
+            claim = f"{speaker} 自称{role}"
+            if claim not in claims:
+                claims.append(claim)
+        for number, result in checks:
+            claim = f"{speaker} 报{number}号是{result}"
+            if claim not in claims:
+                claims.append(claim)
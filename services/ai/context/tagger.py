@@ -0,0 +1,73 @@
+"""行为标签器 - 发言记录时一次性打标签
+
+所有标签的关键词编译成一个正则，一次扫描即可得到发言命中的全部标签；
+结果写入房间的行为标签表，构建提示词时直接读取，不再逐个AI、逐条发言重复扫描。
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, TYPE_CHECKING
+from astrbot.api import logger
+
+from ..prompts import BEHAVIOR_TAG_KEYWORDS
+
+if TYPE_CHECKING:
+    from ....models import GameRoom
+
+# 发言短于该长度视为划水（划水标签的关键词被配置为空时不再判定）
+SHORT_SPEECH_LENGTH = 20
+SHORT_SPEECH_TAG = "划水"
+
+
+class BehaviorTagger:
+    """多关键词行为标签器"""
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.tags = list(keywords)
+        self._short_speech = bool(keywords.get(SHORT_SPEECH_TAG))
+        keyword_tags: Dict[str, set] = {}
+        for tag, words in keywords.items():
+            for word in words:
+                if word:
+                    keyword_tags.setdefault(word, set()).add(tag)
+
+        # 同一位置优先匹配最长的关键词，被其包含的短关键词的标签一并计入
+        ordered = sorted(keyword_tags, key=len, reverse=True)
+        self._implied = {
+            word: set().union(*(tags for other, tags in keyword_tags.items() if other in word))
+            for word in ordered
+        }
+        self._pattern = (
+            re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))") if ordered else None
+        )
+
+    def tag(self, text: str) -> List[str]:
+        """返回发言命中的标签（按定义顺序）"""
+        hits = set()
+        if self._short_speech and len(text) < SHORT_SPEECH_LENGTH:
+            hits.add(SHORT_SPEECH_TAG)
+        if self._pattern:
+            for match in self._pattern.finditer(text):
+                hits |= self._implied[match.group(1)]
+        return [tag for tag in self.tags if tag in hits]
+
+    @staticmethod
+    def parse_overrides(items: Iterable[str]) -> Dict[str, List[str]]:
+        """解析配置中的标签定义（"标签:关键词1,关键词2"），覆盖或追加到默认关键词"""
+        keywords = {tag: list(words) for tag, words in BEHAVIOR_TAG_KEYWORDS.items()}
+        for item in items:
+            tag, sep, words = str(item).partition(":")
+            if not sep or not tag.strip():
+                logger.warning(f"[狼人杀AI] 无效的行为标签配置: {item}")
+                continue
+            keywords[tag.strip()] = [w.strip() for w in re.split(r"[,，]", words) if w.strip()]
+        return keywords
+
+    @staticmethod
+    def for_room(room: "GameRoom") -> "BehaviorTagger":
+        """获取房间配置对应的标签器（相同配置共用一个已编译的实例）"""
+        return _build_tagger(tuple(room.config.ai_behavior_tags))
+
+
+@lru_cache(maxsize=8)
+def _build_tagger(overrides: Tuple[str, ...]) -> BehaviorTagger:
+    return BehaviorTagger(BehaviorTagger.parse_overrides(overrides))
@@ -0,0 +1,255 @@
+"""规则决策 - 不调用LLM的确定性AI决策
+
+只读取房间中的公开信息（跳身份/报查验、发言、当轮投票）和本人可知的私有信息
+（狼队友、自己的查验结果），微秒级完成。用途：
+- LLM调用失败、熔断或超过决策时限时的兜底（代替弃票/默认发言）
+- ai_brain_mode = heuristic 时完全代替LLM（压测、回归对局）
+
+策略：
+- 狼人：不刀队友，优先刀跳预言家的玩家，其次跳神职的、发言最多的好人
+- 预言家：优先查验发言最多且未验过的玩家，白天报出查验结果
+- 女巫：第一晚必救；毒药只毒被报查杀的狼人
+- 投票：跟预言家的查杀，否则跟当轮票数最多的人；狼人不投队友
+同分时按编号从小到大取，同一局面下结果固定。
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from ...models import EventType, Role
+from .protocol import Decision, WITCH_PASS, WITCH_POISON, WITCH_SAVE
+
+if TYPE_CHECKING:
+    from ...models import GameRoom, Player
+
+# 决策模式
+BRAIN_LLM = "llm"
+BRAIN_HEURISTIC = "heuristic"
+
+# 没有可用信息时的默认发言
+DEFAULT_SPEECHES = [
+    "我先听听大家怎么说吧",
+    "目前信息太少了，我再观察一下",
+    "emmm 我暂时没什么想法",
+]
+DEFAULT_LAST_WORDS = "我没什么好说的了，祝大家好运。"
+
+# 跳了这些身份的玩家是狼人的优先刀口
+_GOD_CLAIMS = ("预言家", "女巫", "猎人")
+
+
+class HeuristicBrain:
+    """规则决策（接口与 AIPlayerService 的决策方法一一对应）"""
+
+    # ==================== 狼人 ====================
+
+    @staticmethod
+    def werewolf_kill(player: "Player", room: "GameRoom") -> Optional[int]:
+        """刀人：跳预言家的 > 跳神职的 > 发言最多的好人"""
+        targets = [p for p in room.get_alive_players() if p.role != Role.WEREWOLF]
+        if not targets:
+            return None
+        claims = _claimed_roles(room)
+        loudness = _speech_chars(room)
+
+        def threat(p: "Player") -> Tuple[int, int, int]:
+            role = claims.get(p.display_name)
+            rank = 2 if role == "预言家" else 1 if role in _GOD_CLAIMS else 0
+            return rank, loudness.get(p.display_name, 0), -p.number
+
+        return max(targets, key=threat).number
+
+    @staticmethod
+    def werewolf_team(wolves: List["Player"], room: "GameRoom") -> Dict[int, Decision]:
+        """狼队统一决策：全队刀同一个目标"""
+        target = HeuristicBrain.werewolf_kill(wolves[0], room)
+        chat = f"今晚刀{target}号" if target else ""
+        return {wolf.number: Decision(target=target, speech=chat) for wolf in wolves}
+
+    @staticmethod
+    def werewolf_chat(player: "Player", room: "GameRoom") -> Optional[str]:
+        """狼人密谋：报出自己的刀口"""
+        target = HeuristicBrain.werewolf_kill(player, room)
+        return f"我建议刀{target}号" if target else None
+
+    # ==================== 神职 ====================
+
+    @staticmethod
+    def seer_check(player: "Player", room: "GameRoom") -> Optional[int]:
+        """查验：未验过的玩家中发言最多的"""
+        checked = set(_own_checks(player, room))
+        loudness = _speech_chars(room)
+        candidates = [p for p in room.get_alive_players() if p.id != player.id]
+        unchecked = [p for p in candidates if p.display_name not in checked] or candidates
+        if not unchecked:
+            return None
+        return max(unchecked, key=lambda p: (loudness.get(p.display_name, 0), -p.number)).number
+
+    @staticmethod
+    def witch_action(
+        player: "Player",
+        room: "GameRoom",
+        can_save: bool,
+        can_poison: bool,
+        killed_player_name: Optional[str] = None
+    ) -> Tuple[str, Optional[int]]:
+        """女巫：第一晚必救，毒药只毒被报查杀的狼人"""
+        if can_save and killed_player_name and room.is_first_night:
+            return (WITCH_SAVE, None)
+        if can_poison:
+            wolves = [n for n in _exposed_wolves(player, room) if n != player.number]
+            if wolves:
+                return (WITCH_POISON, wolves[0])
+        return (WITCH_PASS, None)
+
+    @staticmethod
+    def hunter_shoot(player: "Player", room: "GameRoom") -> Optional[int]:
+        """猎人：带走被报查杀的狼人，没有把握时不开枪"""
+        wolves = [n for n in _exposed_wolves(player, room) if n != player.number]
+        return wolves[0] if wolves else None
+
+    # ==================== 白天 ====================
+
+    @staticmethod
+    def vote(
+        player: "Player",
+        room: "GameRoom",
+        is_pk: bool = False,
+        pk_candidates: List[int] = None
+    ) -> Tuple[str, Optional[int]]:
+        """投票：跟查杀，其次跟当轮票型；狼人不投队友，优先投跳预言家的"""
+        candidates = {p.number for p in room.get_alive_players() if p.id != player.id}
+        if is_pk and pk_candidates:
+            candidates = candidates & set(pk_candidates) or candidates
+        if not candidates:
+            return ("", None)
+
+        if player.role == Role.WEREWOLF:
+            teammates = {w.number for w in room.get_alive_werewolves()}
+            allowed = candidates - teammates or candidates
+            claims = _claimed_roles(room)
+            seers = sorted(n for n in allowed if claims.get(_name_of(room, n)) == "预言家")
+            if seers:
+                return (f"{seers[0]}号的预言家我不认，投他", seers[0])
+            bloc = _vote_bloc(room, allowed)
+            if bloc:
+                return (f"跟大家的票，投{bloc}号", bloc)
+            return (f"{min(allowed)}号发言有问题，投他", min(allowed))
+
+        wolves = [n for n in _exposed_wolves(player, room) if n in candidates]
+        if wolves:
+            reason = "我验的查杀" if player.role == Role.SEER else "跟预言家的查杀"
+            return (f"{reason}，投{wolves[0]}号", wolves[0])
+        bloc = _vote_bloc(room, candidates)
+        if bloc:
+            return (f"跟大家的票，投{bloc}号", bloc)
+        return ("没什么信息，先弃票", None)
+
+    @staticmethod
+    def speech(player: "Player", room: "GameRoom", is_pk: bool = False) -> str:
+        """发言：预言家报查验，其他人表态跟查杀"""
+        if player.role == Role.SEER:
+            report = _check_report(player, room)
+            if report:
+                return f"我是预言家，{report}，大家跟我的票"
+
+        wolves = _exposed_wolves(player, room)
+        if player.role == Role.WEREWOLF:
+            teammates = {w.number for w in room.get_alive_werewolves()}
+            wolves = [n for n in wolves if n not in teammates]
+            if is_pk:
+                return "我是好人，大家别投错了"
+        elif is_pk:
+            return "我是好人，跟着查杀走就行"
+        if wolves:
+            return f"我相信预言家，今天出{wolves[0]}号"
+        return DEFAULT_SPEECHES[(player.number + room.current_round) % len(DEFAULT_SPEECHES)]
+
+    @staticmethod
+    def last_words(player: "Player", room: "GameRoom") -> str:
+        """遗言：预言家公布全部查验"""
+        if player.role == Role.SEER:
+            report = _check_report(player, room)
+            if report:
+                return f"我是预言家，{report}"
+        return DEFAULT_LAST_WORDS
+
+
+# ==================== 局面信息 ====================
+
+def _name_of(room: "GameRoom", number: int) -> Optional[str]:
+    player = room.get_player_by_number(number)
+    return player.display_name if player else None
+
+
+def _speech_chars(room: "GameRoom") -> Dict[str, int]:
+    """各玩家累计发言字数"""
+    chars: Counter = Counter()
+    for event in room.events.of_type(EventType.SPEECH):
+        chars[event.actor] += len(event.data.get("text") or "")
+    return chars
+
+
+def _claimed_roles(room: "GameRoom") -> Dict[str, str]:
+    """各玩家最近一次跳的身份"""
+    return {
+        event.actor: event.data["role"]
+        for event in room.events.of_type(EventType.CLAIM)
+        if event.actor and event.data.get("role")
+    }
+
+
+def _own_checks(player: "Player", room: "GameRoom") -> Dict[str, bool]:
+    """预言家自己的查验结果 {玩家: 是否狼人}"""
+    return {
+        event.target: bool(event.data.get("is_werewolf"))
+        for event in room.events.of_type(EventType.CHECK)
+        if event.actor == player.display_name and event.target
+    }
+
+
+def _check_report(player: "Player", room: "GameRoom") -> str:
+    """查验结果的报告文本（与跳身份识别的格式一致）"""
+    players = {p.display_name: p for p in room.players.values()}
+    parts = [
+        f"验了{players[name].number}号是{'狼人' if is_wolf else '金水'}"
+        for name, is_wolf in _own_checks(player, room).items()
+        if name in players
+    ]
+    return "，".join(parts)
+
+
+def _exposed_wolves(player: "Player", room: "GameRoom") -> List[int]:
+    """该玩家认定的存活狼人编号
+
+    预言家用自己的查验；其他人只信第一个起跳的预言家报的查杀。
+    """
+    alive = {p.number for p in room.get_alive_players()}
+    if player.role == Role.SEER:
+        players = {p.display_name: p.number for p in room.players.values()}
+        own = [players[name] for name, is_wolf in _own_checks(player, room).items() if is_wolf and name in players]
+        return [n for n in own if n in alive]
+
+    trusted: Optional[str] = None
+    wolves: List[int] = []
+    seen: Set[int] = set()
+    for event in room.events.of_type(EventType.CLAIM):
+        if event.data.get("role") != "预言家" or event.actor == player.display_name:
+            continue
+        trusted = trusted or event.actor
+        number = event.data.get("check")
+        if event.actor == trusted and event.data.get("result") == "狼人" and number not in seen:
+            seen.add(number)
+            wolves.append(number)
+    return [n for n in wolves if n in alive and n != player.number]
+
+
+def _vote_bloc(room: "GameRoom", candidates: Set[int]) -> Optional[int]:
+    """当轮已投票中得票最多的候选人（同票取编号小的）"""
+    counts: Counter = Counter()
+    for target_id in room.vote_state.day_votes.values():
+        target = room.get_player(target_id)
+        if target and target.number in candidates:
+            counts[target.number] += 1
+    if not counts:
+        return None
+    return min(counts, key=lambda n: (-counts[n], n))
@@ -0,0 +1,62 @@
+"""AI运行指标 - 计数器和耗时统计（进程内，仅用于日志和调优）"""
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+# 每个耗时指标保留的最近样本数
+MAX_SAMPLES = 200
+
+
+class AIMetrics:
+    """AI指标收集器"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timings: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """计数器加一"""
+        self.counters[name] += value
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """记录一次耗时（毫秒）"""
+        self.timings[name].append(value_ms)
+
+    def count(self, name: str) -> int:
+        """获取计数"""
+        return self.counters.get(name, 0)
+
+    def ratio(self, numerator: str, denominator: str) -> float:
+        """计算两个计数器的比值"""
+        total = self.count(denominator)
+        return self.count(numerator) / total if total else 0.0
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """获取耗时分位数（q 取 0-1），无样本时返回 None"""
+        samples = self.timings.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(int(len(ordered) * q), len(ordered) - 1)
+        return ordered[index]
+
+    def summary(self) -> str:
+        """生成指标摘要文本"""
+        lines = []
+        for name in sorted(self.counters):
+            lines.append(f"{name}={self.counters[name]}")
+        for name in sorted(self.timings):
+            samples = self.timings[name]
+            if samples:
+                p50 = self.percentile(name, 0.5)
+                p90 = self.percentile(name, 0.9)
+                lines.append(f"{name}: n={len(samples)} p50={p50:.0f}ms p90={p90:.0f}ms")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """清空所有指标"""
+        self.counters.clear()
+        self.timings.clear()
+
+
+# 进程级单例
+metrics = AIMetrics()
@@ -2,15 +2,16 @@
 from .base import ANTI_HALLUCINATION_PROTOCOL, HUMAN_STYLE_TIPS
 from .roles import ROLE_SOUL_SETTINGS, PERSONALITY_TEMPLATES
 from .strategies import SPEECH_TIPS, VOTE_TIPS, PK_TIPS, LAST_WORDS_TIPS
-from .templates import ROLE_PROMPTS
+from .templates import ROLE_PROMPTS, LEGACY_OUTPUT_FORMATS
 from .events import PEACEFUL_NIGHT_TIPS, DOUBLE_DEATH_TIPS, PERSONALITY_NAMES
-from .rules import GAME_RULES
+from .rules import GAME_RULES, GAME_RULES_BRIEF
 from .tactics import (
     SITUATION_TEMPLATE,
     TACTICAL_DIRECTIVES,
     DUEL_CONTEXT_TEMPLATE,
     BEHAVIOR_ANALYSIS_TIPS,
-    BEHAVIOR_TAG_DEFINITIONS
+    BEHAVIOR_TAG_DEFINITIONS,
+    BEHAVIOR_TAG_KEYWORDS
 )
 
 __all__ = [
@@ -19,6 +20,7 @@ __all__ = [
     'HUMAN_STYLE_TIPS',
     # 游戏规则
     'GAME_RULES',
+    'GAME_RULES_BRIEF',
     # 角色设定
     'ROLE_SOUL_SETTINGS',
     'PERSONALITY_TEMPLATES',
@@ -30,6 +32,7 @@ __all__ = [
     'LAST_WORDS_TIPS',
     # 场景模板
     'ROLE_PROMPTS',
+    'LEGACY_OUTPUT_FORMATS',
     # 特殊事件
     'PEACEFUL_NIGHT_TIPS',
     'DOUBLE_DEATH_TIPS',
@@ -39,4 +42,5 @@ __all__ = [
     'DUEL_CONTEXT_TEMPLATE',
     'BEHAVIOR_ANALYSIS_TIPS',
     'BEHAVIOR_TAG_DEFINITIONS',
+    'BEHAVIOR_TAG_KEYWORDS',
 ]
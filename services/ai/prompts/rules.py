@@ -64,3 +64,12 @@ GAME_RULES = """【狼人杀游戏规则 - 公共知识】
 - 注意观察：谁在保谁、谁的票投给了谁、谁的发言有漏洞
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
+
+# 精简版规则（上下文超出预算时替换完整规则）
+GAME_RULES_BRIEF = """【狼人杀规则要点】
+- 本局没有警长，不要提竞选警长或警徽流
+- 好人：村民、预言家、女巫、猎人；狼人互相知道队友
+- 夜晚：狼人刀人（可自刀）→ 预言家查验 → 女巫得知刀口后决定用药（同晚只能用一瓶，可自救）
+- 猎人被投出或被刀可开枪，被毒不能开枪
+- 狼人胜利：神职全死，或狼人数 >= 好人数；好人胜利：放逐所有狼人
+- 狼人会说谎、会悍跳预言家，要结合发言逻辑和投票行为判断"""
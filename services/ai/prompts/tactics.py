@@ -182,3 +182,12 @@ BEHAVIOR_TAG_DEFINITIONS = {
     "带节奏": "试图引导场上舆论，可能是真好人也可能是狼",
     "捞人": "帮助某个玩家脱离嫌疑"
 }
+
+# 发言行为标签的关键词（发言包含任一关键词即打上该标签）
+BEHAVIOR_TAG_KEYWORDS = {
+    "划水": ["过了", "没想法", "听不出", "不知道"],
+    "情绪激动": ["！", "?!", "什么鬼", "搞笑"],
+    "逻辑清晰": ["因为", "所以", "逻辑", "分析", "证据"],
+    "试图保人": ["不一定是狼", "可能冤枉", "再看看", "先别投"],
+    "攻击预言家": ["假预言家", "悍跳", "不信", "骗子"],
+}
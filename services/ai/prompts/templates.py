@@ -46,7 +46,7 @@ ROLE_PROMPTS = {
 - 如果队友已有明确目标，尽量配合
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-请只回复一个数字（1-9的目标编号）：""",
+{output_format}""",
 
     # 狼人夜间密谋
     "werewolf_chat": """【🐺 狼人密谋 - 只有队友能看到】
@@ -73,6 +73,33 @@ ROLE_PROMPTS = {
 
 请简短发言（30字内），直接说：""",
 
+    # 狼队统一决策（一次调用生成所有AI狼人的密谋和刀人选择）
+    "werewolf_team": """【🐺 狼队夜间会议 - 统一决策】
+
+{anti_hallucination}
+
+{soul_setting}
+
+{context}
+
+{tactical_directive}
+
+【狼队成员】
+{members}
+
+【真人队友今晚的密谋和选择】
+{human_plans}
+
+【会议要求】
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+你是狼队的指挥，需要同时替上面每一个AI狼人发言和选刀：
+💬 密谋：每个AI狼人一句话（30字内），口吻各不相同，像真人在群里聊天
+🎯 选刀：优先刀预言家、女巫等神职，其次是带节奏的强势好人
+🤝 配合：一般全队统一目标；真人队友已经有选择时尽量跟他一致
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+{output_format}""",
+
     # 预言家验人
     "seer_check": """【🔮 预言家验人 - 选择验证目标】
 
@@ -107,7 +134,7 @@ ROLE_PROMPTS = {
 - ❌ 不要重复验同一个人
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-请只回复一个数字（1-9的目标编号）：""",
+{output_format}""",
 
     # 女巫用药
     "witch_action": """【🧪 女巫行动 - 用药决策】
@@ -134,7 +161,7 @@ ROLE_PROMPTS = {
 ⚠️ 重要：救和毒不能同一晚用！
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-请回复：救人 / 毒人 X号 / 不操作""",
+{output_format}""",
 
     # 猎人开枪
     "hunter_shoot": """【🔫 猎人开枪 - 最后的决策】
@@ -163,7 +190,7 @@ ROLE_PROMPTS = {
 - 好人已经大优势
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-请回复：数字（1-9）或"不开枪"：""",
+{output_format}""",
 
     # 白天发言
     "day_speech": """【☀️ 白天发言 - 轮到你了】
@@ -250,13 +277,7 @@ ROLE_PROMPTS = {
 
 {human_style}
 
-请按格式回复（两行）：
-[发言]你的投票理由和看法（50-80字，要有分析）
-[投票]数字 或 弃票
-
-示例：
-[发言]综合分析下来，3号的发言逻辑太混乱了，先说站预言家后面又改口，而且他的票型很可疑，我认为他是狼
-[投票]3""",
+{output_format}""",
 
     # 遗言
     "last_words": """【💀 遗言 - 最后的声音】
@@ -284,3 +305,18 @@ ROLE_PROMPTS = {
 
 请发表遗言："""
 }
+
+# 旧版输出格式（未启用结构化输出时使用）
+LEGACY_OUTPUT_FORMATS = {
+    "werewolf_kill": "请只回复一个数字（1-9的目标编号）：",
+    "seer_check": "请只回复一个数字（1-9的目标编号）：",
+    "witch_action": "请回复：救人 / 毒人 X号 / 不操作",
+    "hunter_shoot": '请回复：数字（1-9）或"不开枪"：',
+    "day_vote": """请按格式回复（两行）：
+[发言]你的投票理由和看法（50-80字，要有分析）
+[投票]数字 或 弃票
+
+示例：
+[发言]综合分析下来，3号的发言逻辑太混乱了，先说站预言家后面又改口，而且他的票型很可疑，我认为他是狼
+[投票]3""",
+}
@@ -0,0 +1,384 @@
+"""结构化决策协议 - 约束AI输出格式并严格解析
+
+AI决策统一输出一行JSON，提示词中附带明确的可选目标列表：
+  目标类（刀人/验人/开枪）：{"target": 3}
+  投票：{"speech": "理由", "target": 3}
+  女巫：{"action": "poison", "target": 3}
+  狼队：{"wolves": [{"number": 2, "chat": "密谋", "target": 3}, ...]}
+
+解析流程：严格解析（整段即JSON）→ 本地修复（提取JSON、全角标点、
+旧版标签格式、中文数字等）→ 都失败时由调用方重新询问模型。
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .metrics import metrics
+
+# 决策类型
+KIND_TARGET = "target"
+KIND_VOTE = "vote"
+KIND_WITCH = "witch"
+KIND_TEAM = "team"
+
+# 女巫动作
+WITCH_SAVE = "save"
+WITCH_POISON = "poison"
+WITCH_PASS = "pass"
+
+# 全角标点 -> 半角
+_PUNCT_TABLE = str.maketrans({
+    "｛": "{", "｝": "}", "：": ":", "，": ",",
+    "“": '"', "”": '"', "‘": "'", "’": "'",
+})
+
+_CN_DIGITS = {"一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10}
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_OBJECT_RE = re.compile(r"\{.*?\}", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_TARGET_KV_RE = re.compile(r'"?target"?\s*[:=]\s*"?(\d+|null|none)"?', re.IGNORECASE)
+_ACTION_KV_RE = re.compile(r'"?action"?\s*[:=]\s*"?(save|poison|pass)"?', re.IGNORECASE)
+_SPEECH_KV_RE = re.compile(r'"?speech"?\s*[:=]\s*"(.*?)"\s*[,}]', re.DOTALL)
+_TAG_TARGET_RE = re.compile(r"[\[【](?:投票|目标|开枪|验人|刀)[\]】]\s*(\d+|弃票|不开枪)")
+_TAG_SPEECH_RE = re.compile(r"[\[【]发言[\]】]\s*(.+?)(?=[\[【](?:投票|目标)[\]】]|$)", re.DOTALL)
+_CN_NUMBER_RE = re.compile(r"([一二两三四五六七八九十])号")
+# 女巫动作短语："毒5号"、"毒死五号"（"毒药"等名词不算）
+_POISON_PHRASE_RE = re.compile(r"毒(?:死|杀|掉)?\s*(\d+|[一二两三四五六七八九十])\s*号")
+# 女巫否定说法："不救"、"暂时不毒3号"、"不用解药"、"留着解药"、"毒药先留着"
+_WITCH_DECLINE_RE = re.compile(
+    r"(?:不|没|别|不用|不要|不想|不打算)\s*(?:用|使用)?\s*(?:救|毒|解药|毒药)"
+    r"|留着?(?:解药|毒药)|(?:解药|毒药)\s*(?:先|还|就)?\s*留"
+)
+_NUMBER_RE = re.compile(r"\d+")
+
+# 流式输出中的完整目标（编号后已出现分隔符）：JSON键值、旧版标签、开头的裸数字
+_PARTIAL_TARGET_RES = (
+    re.compile(r'"target"\s*:\s*"?(\d+|null)"?\s*[,}\s]'),
+    re.compile(r"[\[【](?:投票|目标|开枪|验人|刀)[\]】]\s*(\d+|弃票|不开枪)(?=\D)"),
+    re.compile(r"^\s*(\d+)(?=\D)"),
+)
+
+
+@dataclass
+class DecisionSpec:
+    """决策约束"""
+    action: str                                          # 行动类型（用于指标，如 werewolf_kill）
+    kind: str = KIND_TARGET                              # 决策类型
+    valid_targets: List[int] = field(default_factory=list)  # 可选目标编号
+    allow_none: bool = False                             # 是否允许不选目标
+    none_label: str = "不选"                              # 不选目标的说法（弃票/不开枪）
+    witch_actions: List[str] = field(default_factory=list)  # 女巫可用动作
+    members: List[int] = field(default_factory=list)        # 狼队决策中需要代言的AI狼人编号
+
+
+@dataclass
+class Decision:
+    """解析后的决策"""
+    target: Optional[int] = None
+    action: str = ""
+    speech: str = ""
+    repaired: bool = False
+
+
+def format_instructions(spec: DecisionSpec) -> str:
+    """生成输出格式说明（附带可选目标列表）"""
+    targets = "、".join(f"{n}号" for n in spec.valid_targets) or "无"
+    lines = [
+        "【输出格式 - 必须严格遵守】",
+        f"可选目标编号：{targets}",
+        "只输出一行JSON，不要输出任何其他文字、解释或代码块标记：",
+    ]
+
+    if spec.kind == KIND_VOTE:
+        lines.append('{"speech": "你的投票理由和看法（50-80字，要有分析）", "target": 目标编号}')
+        lines.append(f'如果{spec.none_label}，target 写 null：{{"speech": "理由", "target": null}}')
+    elif spec.kind == KIND_TEAM:
+        members = "、".join(f"{n}号" for n in spec.members)
+        lines.append('{"wolves": [{"number": 狼人编号, "chat": "这名狼人的密谋发言（30字内）", "target": 目标编号}]}')
+        lines.append(f"wolves 中必须为每个AI狼人各写一项：{members}")
+    elif spec.kind == KIND_WITCH:
+        if WITCH_SAVE in spec.witch_actions:
+            lines.append('使用解药救人：{"action": "save"}')
+        if WITCH_POISON in spec.witch_actions:
+            lines.append('使用毒药：{"action": "poison", "target": 目标编号}')
+        lines.append('不操作：{"action": "pass"}')
+    else:
+        lines.append('{"target": 目标编号}')
+        if spec.allow_none:
+            lines.append(f'如果{spec.none_label}：{{"target": null}}')
+
+    return "\n".join(lines)
+
+
+def build_retry_prompt(prompt: str, spec: DecisionSpec, bad_response: str) -> str:
+    """本地修复失败后重新询问模型的提示词"""
+    return (
+        f"{prompt}\n\n"
+        f"⚠️ 你上一次的回复无法识别：{bad_response[:80]}\n"
+        f"{format_instructions(spec)}"
+    )
+
+
+class DecisionParser:
+    """决策解析器"""
+
+    @staticmethod
+    def parse(response: str, spec: DecisionSpec) -> Optional[Decision]:
+        """解析决策，失败返回 None（会记录解析指标）"""
+        metrics.incr(f"parse.{spec.action}.total")
+
+        decision = DecisionParser._parse_strict(response, spec)
+        if decision:
+            metrics.incr(f"parse.{spec.action}.strict")
+            return decision
+
+        decision = DecisionParser._repair(response, spec)
+        if decision:
+            decision.repaired = True
+            metrics.incr(f"parse.{spec.action}.repaired")
+            return decision
+
+        metrics.incr(f"parse.{spec.action}.failed")
+        return None
+
+    @staticmethod
+    def parse_partial(text: str, spec: DecisionSpec) -> Optional[Decision]:
+        """从未完成的流式输出中提前解析目标，目标还不完整或不合法时返回 None
+
+        只用于只需要编号的决策（目标类、投票）；投票还要求发言已经完整。
+        """
+        if spec.kind not in (KIND_TARGET, KIND_VOTE):
+            return None
+
+        normalized = text.translate(_PUNCT_TABLE)
+        for pattern in _PARTIAL_TARGET_RES:
+            match = pattern.search(normalized)
+            if not match:
+                continue
+
+            value = match.group(1)
+            target = int(value) if value.isdigit() else None
+            if not DecisionParser._target_allowed(target, spec):
+                return None
+
+            speech = ""
+            if spec.kind == KIND_VOTE:
+                speech = DecisionParser._extract_speech(normalized)
+                if not speech:
+                    return None
+
+            metrics.incr(f"parse.{spec.action}.total")
+            metrics.incr(f"parse.{spec.action}.early")
+            return Decision(target=target, speech=speech)
+        return None
+
+    @staticmethod
+    def parse_team(response: str, spec: DecisionSpec) -> Optional[Dict[int, Decision]]:
+        """解析狼队决策，返回 {狼人编号: 决策}（chat 放在 speech 中），失败返回 None"""
+        metrics.incr(f"parse.{spec.action}.total")
+
+        text = _FENCE_RE.sub("", response.strip())
+        repaired = False
+        try:
+            data = json.loads(text)
+        except ValueError:
+            # 本地修复：提取最外层JSON对象
+            repaired = True
+            data = None
+            start, end = text.find("{"), text.rfind("}")
+            if start != -1:
+                candidate = _TRAILING_COMMA_RE.sub(r"\1", text[start:end + 1].translate(_PUNCT_TABLE))
+                try:
+                    data = json.loads(candidate)
+                except ValueError:
+                    pass
+
+        plan: Dict[int, Decision] = {}
+        entries = data.get("wolves") if isinstance(data, dict) else None
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            number = entry.get("number")
+            if isinstance(number, str) and number.strip().isdigit():
+                number = int(number.strip())
+            if number not in spec.members:
+                continue
+            target = entry.get("target")
+            if isinstance(target, str) and target.strip().isdigit():
+                target = int(target.strip())
+            if isinstance(target, bool):
+                target = None
+            plan[number] = Decision(
+                target=target if target in spec.valid_targets else None,
+                speech=str(entry.get("chat") or "").strip(),
+                repaired=repaired
+            )
+
+        if not plan:
+            metrics.incr(f"parse.{spec.action}.failed")
+            return None
+        metrics.incr(f"parse.{spec.action}.{'repaired' if repaired else 'strict'}")
+        return plan
+
+    @staticmethod
+    def failure_rate(action: str) -> float:
+        """获取某类行动的解析失败率"""
+        return metrics.ratio(f"parse.{action}.failed", f"parse.{action}.total")
+
+    # ---------- 严格解析 ----------
+
+    @staticmethod
+    def _parse_strict(response: str, spec: DecisionSpec) -> Optional[Decision]:
+        """整段回复必须是合法JSON"""
+        try:
+            data = json.loads(_FENCE_RE.sub("", response.strip()))
+        except (ValueError, TypeError):
+            return None
+        return DecisionParser._from_dict(data, spec)
+
+    @staticmethod
+    def _from_dict(data, spec: DecisionSpec) -> Optional[Decision]:
+        """校验JSON对象并转换为决策"""
+        if not isinstance(data, dict):
+            return None
+
+        target = data.get("target")
+        if isinstance(target, str) and target.strip().isdigit():
+            target = int(target.strip())
+        # bool 是 int 的子类，true/false 不能当作编号
+        if target is not None and (isinstance(target, bool) or not isinstance(target, int)):
+            return None
+
+        if spec.kind == KIND_WITCH:
+            action = str(data.get("action", "")).lower()
+            if action == WITCH_PASS:
+                return Decision(action=WITCH_PASS)
+            if action not in spec.witch_actions:
+                return None
+            if action == WITCH_POISON and target not in spec.valid_targets:
+                return None
+            return Decision(action=action, target=target if action == WITCH_POISON else None)
+
+        if not DecisionParser._target_allowed(target, spec):
+            return None
+
+        speech = data.get("speech", "") if spec.kind == KIND_VOTE else ""
+        return Decision(target=target, speech=str(speech or "").strip())
+
+    @staticmethod
+    def _target_allowed(target: Optional[int], spec: DecisionSpec) -> bool:
+        """目标是否合法"""
+        if target is None:
+            return spec.allow_none
+        return target in spec.valid_targets
+
+    # ---------- 本地修复 ----------
+
+    @staticmethod
+    def _repair(response: str, spec: DecisionSpec) -> Optional[Decision]:
+        """本地修复：不再调用模型"""
+        text = response.translate(_PUNCT_TABLE)
+
+        # 1. 提取回复中的JSON对象（修正单引号和尾逗号）
+        for match in _OBJECT_RE.finditer(text):
+            candidate = match.group(0)
+            if '"' not in candidate:
+                candidate = candidate.replace("'", '"')
+            candidate = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+            try:
+                decision = DecisionParser._from_dict(json.loads(candidate), spec)
+            except ValueError:
+                continue
+            if decision:
+                return decision
+
+        # 2. 键值对 / 旧版标签格式
+        if spec.kind == KIND_WITCH:
+            return DecisionParser._repair_witch(text, spec)
+
+        speech = DecisionParser._extract_speech(text) if spec.kind == KIND_VOTE else ""
+        target = DecisionParser._extract_target(text, spec)
+        if target is False:
+            return None
+        return Decision(target=target, speech=speech)
+
+    @staticmethod
+    def _extract_target(text: str, spec: DecisionSpec):
+        """从文本提取目标，返回编号、None（不选）或 False（失败）"""
+        for pattern in (_TARGET_KV_RE, _TAG_TARGET_RE):
+            match = pattern.search(text)
+            if match:
+                value = match.group(1).lower()
+                if value.isdigit():
+                    number = int(value)
+                    if number in spec.valid_targets:
+                        return number
+                elif spec.allow_none:
+                    return None
+
+        # 回复中只出现一个合法编号时采用它（"我不想弃票，投5号"）
+        numbers = {int(n) for n in _NUMBER_RE.findall(text)}
+        numbers.update(_CN_DIGITS[c] for c in _CN_NUMBER_RE.findall(text))
+        candidates = numbers & set(spec.valid_targets)
+        if len(candidates) == 1:
+            return candidates.pop()
+
+        # 没有唯一的合法编号时，才把"弃票"等说法当作不选
+        if spec.allow_none and spec.none_label and spec.none_label in text:
+            return None
+        return False
+
+    @staticmethod
+    def _extract_speech(text: str) -> str:
+        """提取投票发言"""
+        for pattern in (_SPEECH_KV_RE, _TAG_SPEECH_RE):
+            match = pattern.search(text)
+            if match:
+                return match.group(1).strip()
+        return ""
+
+    @staticmethod
+    def _repair_witch(text: str, spec: DecisionSpec) -> Optional[Decision]:
+        """修复女巫决策
+
+        只认显式的 action 键或无歧义的说法（"毒N号"、只提到"救"）；
+        "不操作"和否定说法（"不救"、"暂时不毒3号"、"留着解药"）不会被当成对应动作，
+        只有否定说法时视为不操作；同时肯定地提到救和毒时不猜测，交给调用方重新询问或兜底。
+        """
+        match = _ACTION_KV_RE.search(text)
+        if match:
+            action = match.group(1).lower()
+            if action == WITCH_PASS:
+                return Decision(action=WITCH_PASS)
+            if action not in spec.witch_actions:
+                return None
+            if action == WITCH_SAVE:
+                return Decision(action=WITCH_SAVE)
+            target = DecisionParser._extract_target(text, DecisionSpec(
+                action=spec.action, valid_targets=spec.valid_targets
+            ))
+            return Decision(action=WITCH_POISON, target=target) if target else None
+
+        if "不操作" in text:
+            return Decision(action=WITCH_PASS)
+
+        # 去掉否定说法后再看肯定地提到了哪些动作
+        affirmed = _WITCH_DECLINE_RE.sub(" ", text)
+        declined = affirmed != text
+        mentions_save = "救" in affirmed
+        mentions_poison = "毒" in affirmed
+        if mentions_save and mentions_poison:
+            return None
+
+        phrase = _POISON_PHRASE_RE.search(affirmed)
+        if phrase and WITCH_POISON in spec.witch_actions:
+            value = phrase.group(1)
+            target = int(value) if value.isdigit() else _CN_DIGITS[value]
+            return Decision(action=WITCH_POISON, target=target) if target in spec.valid_targets else None
+        if mentions_save and WITCH_SAVE in spec.witch_actions:
+            return Decision(action=WITCH_SAVE)
+        if declined and not mentions_poison:
+            return Decision(action=WITCH_PASS)
+        return None
@@ -0,0 +1,209 @@
+"""模型提供商注册表 - 缓存 provider 句柄，跟踪健康状况并熔断"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Set
+from astrbot.api import logger
+
+# 默认模型在缓存中的键
+DEFAULT_PROVIDER_KEY = ""
+
+# 熔断器状态
+CIRCUIT_CLOSED = "closed"        # 正常
+CIRCUIT_OPEN = "open"            # 熔断中，直接跳过
+CIRCUIT_HALF_OPEN = "half_open"  # 冷却结束，放行一个探测请求
+
+# 熔断参数
+HEALTH_WINDOW = 20               # 滚动窗口内保留的最近调用结果数
+FAILURE_THRESHOLD = 3            # 连续失败次数达到该值即熔断
+ERROR_RATE_THRESHOLD = 0.5       # 窗口内错误率达到该值即熔断
+ERROR_RATE_MIN_CALLS = 6         # 计算错误率所需的最少调用数
+COOLDOWN_SECONDS = 60            # 熔断后多久进入半开状态
+PROBE_TIMEOUT_SECONDS = 60       # 探测请求超过该时间未结束视为丢失
+
+
+@dataclass
+class ProviderHealth:
+    """单个模型的健康状况"""
+    state: str = CIRCUIT_CLOSED
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probe_started_at: Optional[float] = None
+
+    @property
+    def error_rate(self) -> float:
+        """滚动窗口内的错误率"""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """成功调用耗时的分位数（毫秒）"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class ProviderRegistry:
+    """模型提供商注册表
+
+    按模型ID缓存 provider 句柄，避免每次调用都通过 context 查找；
+    同时按模型统计滚动错误率和耗时，连续失败或错误率过高时熔断，
+    冷却后半开放行一个探测请求，成功则恢复。
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self._providers: Dict[str, object] = {}
+        self._health: Dict[str, ProviderHealth] = {}
+        self._warmed: Set[str] = set()
+        self._called: Set[str] = set()
+
+    def get(self, model_id: str = "") -> Optional[object]:
+        """获取 provider（带缓存，找不到指定模型时回退到默认模型）"""
+        key = model_id or DEFAULT_PROVIDER_KEY
+        provider = self._providers.get(key)
+        if provider is not None:
+            return provider
+
+        provider = self._resolve(model_id)
+        if provider is not None:
+            self._providers[key] = provider
+        return provider
+
+    def _resolve(self, model_id: str) -> Optional[object]:
+        """通过 context 解析 provider"""
+        if model_id:
+            provider = self.context.get_provider_by_id(model_id)
+            if provider:
+                return provider
+            logger.warning(f"[狼人杀AI] 未找到模型 '{model_id}'，使用默认模型")
+        return self.context.get_using_provider()
+
+    def invalidate(self, model_id: str = None) -> None:
+        """清除缓存（model_id 为 None 时清除全部）"""
+        if model_id is None:
+            self._providers.clear()
+            self._warmed.clear()
+        else:
+            key = model_id or DEFAULT_PROVIDER_KEY
+            self._providers.pop(key, None)
+            self._warmed.discard(key)
+
+    # ==================== 健康状况与熔断 ====================
+
+    def health(self, model_id: str = "") -> ProviderHealth:
+        """获取模型健康状况"""
+        key = model_id or DEFAULT_PROVIDER_KEY
+        if key not in self._health:
+            self._health[key] = ProviderHealth()
+        return self._health[key]
+
+    def is_available(self, model_id: str = "") -> bool:
+        """熔断器是否放行该模型的请求"""
+        health = self.health(model_id)
+        now = time.monotonic()
+
+        if health.state == CIRCUIT_OPEN:
+            if now - health.opened_at < COOLDOWN_SECONDS:
+                return False
+            health.state = CIRCUIT_HALF_OPEN
+            health.probe_started_at = None
+            logger.info(f"[狼人杀AI] 模型 '{model_id or '默认'}' 熔断冷却结束，进入半开状态")
+
+        if health.state == CIRCUIT_HALF_OPEN:
+            # 同一时间只放行一个探测请求
+            return (
+                health.probe_started_at is None
+                or now - health.probe_started_at > PROBE_TIMEOUT_SECONDS
+            )
+
+        return True
+
+    def available(self, model_ids: Iterable[str]) -> List[str]:
+        """过滤出熔断器放行的模型（保持顺序，去重）"""
+        return [m for m in dict.fromkeys(model_ids) if self.is_available(m)]
+
+    def begin(self, model_id: str = "") -> None:
+        """请求开始（半开状态下占用探测名额）"""
+        health = self.health(model_id)
+        if health.state == CIRCUIT_HALF_OPEN:
+            health.probe_started_at = time.monotonic()
+
+    def release(self, model_id: str = "") -> None:
+        """请求被取消（不计入成败，释放探测名额）"""
+        self.health(model_id).probe_started_at = None
+
+    def record_success(self, model_id: str, latency_ms: float) -> None:
+        """记录一次成功调用"""
+        health = self.health(model_id)
+        health.outcomes.append(True)
+        health.latencies.append(latency_ms)
+        health.consecutive_failures = 0
+        health.probe_started_at = None
+        if health.state != CIRCUIT_CLOSED:
+            health.state = CIRCUIT_CLOSED
+            logger.info(f"[狼人杀AI] 模型 '{model_id or '默认'}' 探测成功，熔断恢复")
+
+    def record_failure(self, model_id: str) -> None:
+        """记录一次失败调用（异常、超时或空响应）"""
+        health = self.health(model_id)
+        health.outcomes.append(False)
+        health.consecutive_failures += 1
+        health.probe_started_at = None
+
+        if health.state == CIRCUIT_HALF_OPEN:
+            self._open(model_id, health, "探测失败")
+        elif health.state == CIRCUIT_CLOSED:
+            if health.consecutive_failures >= FAILURE_THRESHOLD:
+                self._open(model_id, health, f"连续失败{health.consecutive_failures}次")
+            elif len(health.outcomes) >= ERROR_RATE_MIN_CALLS and health.error_rate >= ERROR_RATE_THRESHOLD:
+                self._open(model_id, health, f"错误率{health.error_rate:.0%}")
+
+    def _open(self, model_id: str, health: ProviderHealth, reason: str) -> None:
+        """打开熔断器"""
+        health.state = CIRCUIT_OPEN
+        health.opened_at = time.monotonic()
+        logger.warning(
+            f"[狼人杀AI] 模型 '{model_id or '默认'}' 熔断（{reason}），{COOLDOWN_SECONDS}秒后尝试恢复"
+        )
+
+    def latency_percentile(self, model_id: str, q: float) -> Optional[float]:
+        """模型近期成功调用耗时的分位数（毫秒）"""
+        return self.health(model_id).latency_percentile(q)
+
+    def latency_samples(self, model_id: str) -> int:
+        """模型近期成功调用的耗时样本数"""
+        return len(self.health(model_id).latencies)
+
+    def status_summary(self) -> str:
+        """各模型健康状况摘要"""
+        lines = []
+        for key, health in self._health.items():
+            p50 = health.latency_percentile(0.5)
+            lines.append(
+                f"{key or '默认'}: {health.state} 错误率{health.error_rate:.0%} "
+                f"P50={f'{p50:.0f}ms' if p50 is not None else '-'}"
+            )
+        return "\n".join(lines)
+
+    # ==================== 预热 ====================
+
+    def mark_warmed(self, model_id: str = "") -> None:
+        """标记模型已预热"""
+        self._warmed.add(model_id or DEFAULT_PROVIDER_KEY)
+
+    def is_warmed(self, model_id: str = "") -> bool:
+        """模型是否已预热"""
+        return (model_id or DEFAULT_PROVIDER_KEY) in self._warmed
+
+    def first_call(self, model_id: str = "") -> bool:
+        """是否是该模型的首次调用（调用后即标记）"""
+        key = model_id or DEFAULT_PROVIDER_KEY
+        if key in self._called:
+            return False
+        self._called.add(key)
+        return True
@@ -0,0 +1,99 @@
+"""模型路由 - 按行动类型选择模型档位，负载高或阶段快超时时降级到快速档
+
+只需要输出编号的决策（刀人、验人、开枪、投票、用药）默认走快速档，
+发言、遗言和狼队统一决策走强档（玩家自己的模型）。
+进行中的LLM请求过多，或当前阶段定时器即将到期时，强档行动临时降级到快速档。
+未配置快速档模型（ai_fast_model）时两档都使用玩家自己的模型，只记录档位指标。
+"""
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, TYPE_CHECKING
+from astrbot.api import logger
+
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from ...models import GameRoom, Player
+
+# 模型档位
+TIER_FAST = "fast"
+TIER_STRONG = "strong"
+
+# 默认路由（未列出的行动走强档）
+DEFAULT_ROUTES: Dict[str, str] = {
+    "werewolf_kill": TIER_FAST,
+    "seer_check": TIER_FAST,
+    "witch_action": TIER_FAST,
+    "hunter_shoot": TIER_FAST,
+    "day_vote": TIER_FAST,
+}
+
+# 降级原因
+DOWNGRADE_QUEUE = "queue"
+DOWNGRADE_DEADLINE = "deadline"
+
+
+class ModelRouter:
+    """按行动路由模型（所有行动模块共享，统计进行中的请求数）"""
+
+    def __init__(self):
+        self.inflight = 0
+        self._routes: Tuple[Tuple[str, ...], Dict[str, str]] = ((), DEFAULT_ROUTES)
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """统计一次进行中的LLM调用"""
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+
+    def routes(self, room: "GameRoom") -> Dict[str, str]:
+        """行动档位表（ai_model_routes 可按行动覆盖，如 "day_speech:fast"；解析结果按配置缓存）"""
+        key = tuple(room.config.ai_model_routes)
+        if key == self._routes[0]:
+            return self._routes[1]
+
+        routes = dict(DEFAULT_ROUTES)
+        for item in key:
+            name, _, tier = str(item).partition(":")
+            tier = tier.strip()
+            if tier not in (TIER_FAST, TIER_STRONG):
+                logger.warning(f"[狼人杀AI] 无效的模型路由配置: {item}")
+                continue
+            routes[name.strip()] = tier
+        self._routes = (key, routes)
+        return routes
+
+    def tier_for(self, room: "GameRoom", action: str) -> Tuple[str, Optional[str]]:
+        """行动的档位，返回 (档位, 降级原因)"""
+        tier = self.routes(room).get(action, TIER_STRONG)
+        if tier == TIER_FAST:
+            return tier, None
+
+        config = room.config
+        if config.ai_route_queue_threshold and self.inflight >= config.ai_route_queue_threshold:
+            return TIER_FAST, DOWNGRADE_QUEUE
+        remaining = room.timer_remaining()
+        if remaining is not None and remaining < config.ai_route_deadline_margin:
+            return TIER_FAST, DOWNGRADE_DEADLINE
+        return tier, None
+
+    def route(self, player: "Player", room: Optional["GameRoom"], action: str) -> str:
+        """为一次行动选择模型ID（空字符串为默认模型）"""
+        home = player.ai_config.model_id if player.ai_config else ""
+        if room is None or not action:
+            return home
+
+        tier, reason = self.tier_for(room, action)
+        metrics.incr(f"route.{action}.{tier}")
+        if reason:
+            metrics.incr(f"route.downgrade.{reason}")
+
+        fast_model = room.config.ai_fast_model
+        if tier != TIER_FAST or not fast_model:
+            return home
+        if reason:
+            detail = f"进行中请求{self.inflight}个" if reason == DOWNGRADE_QUEUE else "阶段即将超时"
+            logger.info(f"[狼人杀AI] {player.name} 的{action}决策降级到快速档模型 '{fast_model}'（{detail}）")
+        return fast_model
@@ -3,13 +3,23 @@
 这是原 ai_player_service.py 的模块化重构版本。
 将2000+行的单文件拆分为多个职责清晰的模块。
 """
+import asyncio
+import os
 import random
-from typing import Optional, List, Tuple, Dict, TYPE_CHECKING
+import time
+from typing import Awaitable, Callable, Optional, List, Tuple, Dict, Iterable, TypeVar, TYPE_CHECKING
 from astrbot.api import logger
+from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
+from .cache import LLMResponseCache
+from .heuristic import BRAIN_HEURISTIC, HeuristicBrain
 from .prompts import PERSONALITY_TEMPLATES, PERSONALITY_NAMES
-from .context import ContextBuilder
+from .context import BehaviorAnalyzer, ContextBuilder, RoundSummarizer, extract_claims
+from .metrics import metrics
+from .providers import ProviderRegistry
+from .router import ModelRouter
 from .actions import (
+    PLAYER_SYSTEM_PROMPT,
     WerewolfAction,
     SeerAction,
     WitchAction,
@@ -20,6 +30,9 @@ from .actions import (
 
 if TYPE_CHECKING:
     from ...models import GameRoom, Player, GamePhase
+    from .protocol import Decision
+
+T = TypeVar("T")
 
 
 class AIPlayerService:
@@ -30,13 +43,80 @@ class AIPlayerService:
         self._retry_counts: Dict[str, int] = {}
         self._player_personalities: Dict[str, str] = {}
 
+        # 所有行动模块共享 provider 句柄缓存、响应缓存和模型路由
+        self.providers = ProviderRegistry(context)
+        self.response_cache = LLMResponseCache(
+            os.path.join(get_astrbot_data_path(), "werewolf_data", "llm_cache.json")
+        )
+        self.router = ModelRouter()
+
         # 初始化各行动模块
-        self._werewolf_action = WerewolfAction(context)
-        self._seer_action = SeerAction(context)
-        self._witch_action = WitchAction(context)
-        self._hunter_action = HunterAction(context)
-        self._speech_action = SpeechAction(context)
-        self._vote_action = VoteAction(context)
+        shared = (self.providers, self.response_cache, self.router)
+        self._werewolf_action = WerewolfAction(context, *shared)
+        self._seer_action = SeerAction(context, *shared)
+        self._witch_action = WitchAction(context, *shared)
+        self._hunter_action = HunterAction(context, *shared)
+        self._speech_action = SpeechAction(context, *shared)
+        self._vote_action = VoteAction(context, *shared)
+
+    # ==================== 预热 ====================
+
+    async def warm_up(self, model_ids: Iterable[str], send_probe: bool = False, timeout: float = 15) -> None:
+        """预热模型：解析并缓存 provider 句柄，可选发送一次极小的请求"""
+        for model_id in dict.fromkeys(model_ids):
+            if self.providers.is_warmed(model_id):
+                continue
+
+            provider = self.providers.get(model_id)
+            if not provider:
+                logger.warning(f"[狼人杀AI] 预热失败：无法获取模型 '{model_id or '默认'}'")
+                continue
+
+            if send_probe:
+                start = time.perf_counter()
+                try:
+                    await asyncio.wait_for(
+                        provider.text_chat(prompt="回复1", system_prompt=PLAYER_SYSTEM_PROMPT),
+                        timeout=timeout
+                    )
+                    latency_ms = (time.perf_counter() - start) * 1000
+                    self.providers.record_success(model_id, latency_ms)
+                    metrics.observe("warmup_probe_latency", latency_ms)
+                    logger.info(f"[狼人杀AI] 模型 '{model_id or '默认'}' 预热请求耗时 {latency_ms:.0f}ms")
+                except Exception as e:
+                    self.providers.record_failure(model_id)
+                    logger.warning(f"[狼人杀AI] 模型 '{model_id or '默认'}' 预热请求失败: {e}")
+                    continue
+
+            self.providers.mark_warmed(model_id)
+
+    async def save_cache(self) -> None:
+        """将响应缓存写入磁盘"""
+        await self.response_cache.save()
+
+    # ==================== 规则决策 ====================
+
+    async def _run(
+        self,
+        room: "GameRoom",
+        action: str,
+        call: Callable[[], Awaitable[T]],
+        fallback: Callable[[], T]
+    ) -> T:
+        """执行一次AI决策：规则模式直接使用规则决策；超过决策时限时改用规则决策"""
+        if room.config.ai_brain_mode == BRAIN_HEURISTIC:
+            metrics.incr(f"heuristic.mode.{action}")
+            return fallback()
+
+        deadline = room.config.ai_decision_deadline
+        if deadline <= 0:
+            return await call()
+        try:
+            return await asyncio.wait_for(call(), timeout=deadline)
+        except asyncio.TimeoutError:
+            metrics.incr(f"heuristic.deadline.{action}")
+            logger.warning(f"[狼人杀AI] {action}决策超过{deadline}秒，改用规则决策")
+            return fallback()
 
     # ==================== 性格管理 ====================
 
@@ -52,17 +132,41 @@ class AIPlayerService:
 
     async def decide_werewolf_kill(self, player: "Player", room: "GameRoom") -> Optional[int]:
         """AI狼人选择击杀目标"""
-        return await self._werewolf_action.decide_kill(player, room)
+        return await self._run(
+            room, "werewolf_kill",
+            lambda: self._werewolf_action.decide_kill(player, room),
+            lambda: HeuristicBrain.werewolf_kill(player, room)
+        )
+
+    async def decide_werewolf_team(
+        self,
+        wolves: List["Player"],
+        room: "GameRoom"
+    ) -> Optional[Dict[int, "Decision"]]:
+        """AI狼队统一决策（一次调用生成所有AI狼人的密谋和刀人选择）"""
+        return await self._run(
+            room, "werewolf_team",
+            lambda: self._werewolf_action.decide_team(wolves, room),
+            lambda: HeuristicBrain.werewolf_team(wolves, room)
+        )
 
     async def decide_werewolf_chat(self, player: "Player", room: "GameRoom") -> Optional[str]:
         """AI狼人生成密谋消息"""
-        return await self._werewolf_action.decide_chat(player, room)
+        return await self._run(
+            room, "werewolf_chat",
+            lambda: self._werewolf_action.decide_chat(player, room),
+            lambda: HeuristicBrain.werewolf_chat(player, room)
+        )
 
     # ==================== 预言家行动 ====================
 
     async def decide_seer_check(self, player: "Player", room: "GameRoom") -> Optional[int]:
         """AI预言家选择验人目标"""
-        return await self._seer_action.decide_check(player, room)
+        return await self._run(
+            room, "seer_check",
+            lambda: self._seer_action.decide_check(player, room),
+            lambda: HeuristicBrain.seer_check(player, room)
+        )
 
     # ==================== 女巫行动 ====================
 
@@ -75,21 +179,49 @@ class AIPlayerService:
         killed_player_name: Optional[str] = None
     ) -> Tuple[str, Optional[int]]:
         """AI女巫决定用药"""
-        return await self._witch_action.decide_action(
-            player, room, can_save, can_poison, killed_player_name
+        return await self._run(
+            room, "witch_action",
+            lambda: self._witch_action.decide_action(player, room, can_save, can_poison, killed_player_name),
+            lambda: HeuristicBrain.witch_action(player, room, can_save, can_poison, killed_player_name)
         )
 
     # ==================== 猎人行动 ====================
 
     async def decide_hunter_shoot(self, player: "Player", room: "GameRoom") -> Optional[int]:
         """AI猎人决定开枪目标"""
-        return await self._hunter_action.decide_shoot(player, room)
+        return await self._run(
+            room, "hunter_shoot",
+            lambda: self._hunter_action.decide_shoot(player, room),
+            lambda: HeuristicBrain.hunter_shoot(player, room)
+        )
 
     # ==================== 白天发言 ====================
 
     async def generate_speech(self, player: "Player", room: "GameRoom", is_pk: bool = False) -> str:
         """AI生成白天发言"""
-        return await self._speech_action.generate_speech(player, room, is_pk)
+        return await self._run(
+            room, "pk_speech" if is_pk else "day_speech",
+            lambda: self._speech_action.generate_speech(player, room, is_pk),
+            lambda: HeuristicBrain.speech(player, room, is_pk)
+        )
+
+    async def stream_speech(
+        self,
+        player: "Player",
+        room: "GameRoom",
+        on_chunk: Callable[[str], Awaitable[None]],
+        is_pk: bool = False
+    ) -> str:
+        """AI流式生成白天发言（逐句通过 on_chunk 发出），返回完整发言
+
+        已发出的句子无法撤回，因此不受整体决策时限限制，而是限制首段和段间的等待时间
+        （超时以已发出的内容结束，一句都没发出则回退为普通生成）；规则模式整段发出规则发言。
+        """
+        if room.config.ai_brain_mode == BRAIN_HEURISTIC:
+            speech = HeuristicBrain.speech(player, room, is_pk)
+            await on_chunk(speech)
+            return speech
+        return await self._speech_action.stream_speech(player, room, on_chunk, is_pk)
 
     # ==================== 投票 ====================
 
@@ -98,16 +230,24 @@ class AIPlayerService:
         player: "Player",
         room: "GameRoom",
         is_pk: bool = False,
-        pk_candidates: List[str] = None
+        pk_candidates: List[int] = None
     ) -> Tuple[str, Optional[int]]:
         """AI生成投票决策"""
-        return await self._vote_action.decide_vote(player, room, is_pk, pk_candidates)
+        return await self._run(
+            room, "day_vote",
+            lambda: self._vote_action.decide_vote(player, room, is_pk, pk_candidates),
+            lambda: HeuristicBrain.vote(player, room, is_pk, pk_candidates)
+        )
 
     # ==================== 遗言 ====================
 
     async def generate_last_words(self, player: "Player", room: "GameRoom") -> str:
         """AI生成遗言"""
-        return await self._speech_action.generate_last_words(player, room)
+        return await self._run(
+            room, "last_words",
+            lambda: self._speech_action.generate_last_words(player, room),
+            lambda: HeuristicBrain.last_words(player, room)
+        )
 
     # ==================== 上下文管理 ====================
 
@@ -138,6 +278,46 @@ class AIPlayerService:
         player.ai_context = ctx
         logger.info(f"[狼人杀AI] 初始化 {player.name} 的上下文: {ctx.role_name}")
 
+    def restore_ai_context(self, player: "Player", room: "GameRoom") -> None:
+        """插件重启后重建AI玩家上下文：从事件记录恢复查验结果、狼队密谋/刀人和女巫用药"""
+        from ...models import EventType
+
+        self.initialize_ai_context(player, room)
+        ctx = player.ai_context
+        if ctx is None:
+            return
+
+        me = player.display_name
+        numbers = {p.display_name: p.number for p in room.players.values()}
+        for event in room.events:
+            if event.type == EventType.CHECK and event.actor == me and event.target:
+                ctx.seer_results.append({
+                    "target": event.target,
+                    "target_number": numbers.get(event.target),
+                    "is_werewolf": bool(event.data.get("is_werewolf")),
+                    "round": event.round,
+                })
+            elif ctx.is_werewolf and event.type == EventType.WOLF_CHAT and event.actor != me:
+                ctx.wolf_chat_messages.append({
+                    "sender": event.actor,
+                    "content": event.data.get("text", ""),
+                    "round": event.round,
+                })
+            elif ctx.is_werewolf and event.type == EventType.WOLF_VOTE and event.actor:
+                who = "你" if event.actor == me else f"狼队友 {event.actor} "
+                ctx.game_events.append(f"{who}选择刀 {event.target}")
+                ctx.event_rounds.append(event.round)
+            elif event.type == EventType.SAVE and event.actor == me:
+                ctx.witch_saved_player = event.target
+            elif event.type == EventType.POISON and event.actor == me:
+                ctx.witch_poisoned_player = event.target
+
+        self.update_ai_context(player, room)
+        logger.info(
+            f"[狼人杀AI] 恢复 {player.name} 的上下文：查验 {len(ctx.seer_results)} 条，"
+            f"狼队密谋 {len(ctx.wolf_chat_messages)} 条"
+        )
+
     def update_ai_context(self, player: "Player", room: "GameRoom") -> None:
         """更新AI玩家的游戏上下文"""
         if not player.is_ai or not player.ai_context:
@@ -158,6 +338,41 @@ class AIPlayerService:
                 killed = room.get_player(room.last_killed_id)
                 ctx.last_killed_player = killed.display_name if killed else None
 
+    def record_speech(self, player: "Player", room: "GameRoom", speech: str) -> None:
+        """发言记录时计算行为标签、提取跳身份/报查验事件（提示词构建时直接读取）"""
+        from ...models import EventType
+
+        tags = BehaviorAnalyzer.record_speech(room, player.display_name, speech)
+        if tags:
+            logger.debug(f"[狼人杀AI] {player.display_name} 发言标签: {'、'.join(tags)}")
+
+        roles, checks = extract_claims(speech)
+        for role in roles:
+            room.record_event(EventType.CLAIM, player.display_name, role=role)
+        for number, result in checks:
+            room.record_event(
+                EventType.CLAIM, player.display_name, f"{number}号",
+                role="预言家", check=number, result=result
+            )
+
+    def compact_ai_context(self, player: "Player", room: "GameRoom") -> None:
+        """天亮时把已结束回合的原始记录压缩为摘要"""
+        if not player.is_ai or not player.ai_context:
+            return
+
+        ctx = player.ai_context
+        ctx.current_round = room.current_round
+        if not room.config.ai_round_compaction:
+            return
+
+        before = len(ctx.to_prompt_context())
+        compacted = RoundSummarizer.compact(ctx, room.current_round)
+        if compacted:
+            logger.info(
+                f"[狼人杀AI] {player.name} 压缩了{compacted}个回合的记录，"
+                f"上下文 {before}→{len(ctx.to_prompt_context())} 字"
+            )
+
     def _get_phase_description(self, room: "GameRoom") -> str:
         """获取当前阶段的人类可读描述"""
         from ...models import GamePhase
@@ -1862,7 +1862,7 @@ class AIPlayerService:
 
     # ==================== 投票 ====================
 
-    async def decide_vote(self, player: "Player", room: "GameRoom", is_pk: bool = False, pk_candidates: List[str] = None) -> Tuple[str, Optional[int]]:
+    async def decide_vote(self, player: "Player", room: "GameRoom", is_pk: bool = False, pk_candidates: List[int] = None) -> Tuple[str, Optional[int]]:
         """AI生成投票决策"""
         context = self._build_context(player, room)
         context += "\n" + self._get_situation_awareness(room)
@@ -1,9 +1,37 @@
-"""AI复盘服务"""
-from typing import Optional, TYPE_CHECKING
+"""AI复盘服务
+
+复盘有两种生成方式：
+- single：完整游戏日志放进一次调用
+- map_reduce：按夜晚/白天切段并发总结，再由各段摘要生成最终报告（长对局提示词更短、更快）
+ai_review_mode 为 auto 时按游戏日志长度自动选择。
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from astrbot.api import logger
 
+from ..models import EventType, render_event
+from .review_queue import ReviewJob
+
 if TYPE_CHECKING:
     from ..models import GameRoom
+    from .game_report import GameReport
+
+# auto 模式下游戏数据超过该字数时使用分段总结
+MAP_REDUCE_MIN_CHARS = 6000
+# 分段总结的最大并发数
+MAP_CONCURRENCY = 4
+# 分段总结失败时保留的原始日志字数
+SEGMENT_FALLBACK_CHARS = 800
+
+SEGMENT_SYSTEM_PROMPT = (
+    "你是狼人杀复盘助手。下面是一局游戏中某一晚或某一天的日志，请用不超过150字总结该阶段的关键信息：\n"
+    "1. 谁跳了什么身份、报了什么查验，女巫和猎人的操作\n"
+    "2. 投票走向和出局结果\n"
+    "3. 明显的好操作或失误（指出玩家）\n"
+    "4. 如有精彩、搞笑或关键的狼人密谋，原文引用一句，格式：💬 「XXX：原话内容」\n"
+    "只输出总结，不要评选MVP。"
+)
 
 
 class AIReviewer:
@@ -11,43 +39,146 @@ class AIReviewer:
 
     def __init__(self, context):
         self.context = context
+        # 各模式累计：调用次数、耗时、提示词字数（用于对比两种模式）
+        self._stats: Dict[str, Dict[str, float]] = {}
 
-    async def generate_review(self, room: "GameRoom", winning_faction: str) -> str:
-        """生成AI复盘报告"""
-        try:
-            # 检查是否启用AI复盘
-            if not room.config.enable_ai_review:
-                logger.info("[狼人杀] AI复盘已关闭，跳过生成")
-                return ""
+    def build_job(
+        self, room: "GameRoom", winning_faction: str, report: Optional["GameReport"] = None
+    ) -> Optional[ReviewJob]:
+        """整理复盘所需数据（在房间清理前调用），未启用复盘时返回 None
 
-            # 获取LLM provider
-            provider = self._get_provider(room)
-            if not provider:
-                logger.warning("[狼人杀] 无法获取LLM provider，跳过AI复盘")
-                return ""
+        Args:
+            report: 本地战报（传入时以其统计代替玩家身份列表，并作为失败兜底）
+        """
+        # 检查是否启用AI复盘
+        if not room.config.enable_ai_review:
+            logger.info("[狼人杀] AI复盘已关闭，跳过生成")
+            return None
 
-            # 整理游戏数据
-            game_data = self._format_game_data(room, winning_faction)
+        # 整理游戏数据
+        header = self._format_header(room, winning_faction, report)
+        game_data = self._format_game_data(room, header, compact_votes=report is not None)
+        fallback = report.render_text() if report else ""
 
-            # 构造prompt
-            system_prompt, user_prompt = self._build_prompts(room, game_data, winning_faction)
+        mode = room.config.ai_review_mode
+        if mode == "auto":
+            mode = "map_reduce" if len(game_data) >= MAP_REDUCE_MIN_CHARS else "single"
+        if mode == "map_reduce":
+            segments = self._split_segments(room)
+            if len(segments) > 1:
+                return ReviewJob(
+                    room=room,
+                    winning_faction=winning_faction,
+                    header=header,
+                    segments=segments,
+                    fallback=fallback,
+                )
 
-            # 调用AI
-            response = await provider.text_chat(
-                prompt=user_prompt,
-                system_prompt=system_prompt
-            )
+        # 构造prompt
+        system_prompt, user_prompt = self._build_prompts(room, game_data, winning_faction)
+        return ReviewJob(
+            room=room, winning_faction=winning_faction,
+            system_prompt=system_prompt, user_prompt=user_prompt, fallback=fallback,
+        )
 
-            if response.result_chain:
-                review_text = response.result_chain.get_plain_text()
-                return f"\n\n🤖 AI复盘\n{'='*30}\n{review_text}\n{'='*30}"
-            else:
-                return ""
+    async def request_review(self, job: ReviewJob, timeout: float) -> str:
+        """调用AI生成复盘报告
 
-        except Exception as e:
-            logger.error(f"[狼人杀] AI复盘生成失败: {e}")
+        超时、调用失败或返回空内容时抛出异常，由复盘队列重试；
+        没有可用 provider 时返回空字符串（重试无意义，由复盘队列改发本地战报）。
+        """
+        # 获取LLM provider
+        provider = self._get_provider(job.room)
+        if not provider:
+            logger.warning("[狼人杀] 无法获取LLM provider，跳过AI复盘")
             return ""
 
+        start = time.perf_counter()
+        if job.segments:
+            # map：各段并发总结；reduce：由摘要生成最终报告
+            summaries = await self._summarize_segments(provider, job, timeout)
+            game_data = job.header + "\n【分段摘要】\n" + "\n\n".join(summaries)
+            system_prompt, user_prompt = self._build_prompts(job.room, game_data, job.winning_faction)
+            prompt_sizes = [len(SEGMENT_SYSTEM_PROMPT) + len(job.header) + len(text) for _, text in job.segments]
+        else:
+            system_prompt, user_prompt = job.system_prompt, job.user_prompt
+            prompt_sizes = []
+        prompt_sizes.append(len(system_prompt) + len(user_prompt))
+
+        # 调用AI
+        response = await asyncio.wait_for(
+            provider.text_chat(prompt=user_prompt, system_prompt=system_prompt),
+            timeout=timeout
+        )
+        self._record_stats(job, prompt_sizes, (time.perf_counter() - start) * 1000)
+
+        review_text = response.result_chain.get_plain_text().strip() if response.result_chain else ""
+        if not review_text:
+            raise ValueError("AI复盘返回空内容")
+        return f"\n\n🤖 AI复盘\n{'='*30}\n{review_text}\n{'='*30}"
+
+    # ==================== 分段总结（map-reduce） ====================
+
+    @staticmethod
+    def _split_segments(room: "GameRoom") -> List[Tuple[str, str]]:
+        """按夜晚/白天切分游戏日志，返回 [(标题, 日志文本)]"""
+        segments: List[Tuple[str, List[str]]] = []
+        for event in room.events:
+            if event.type == EventType.ROUND_START:
+                segments.append((f"第{event.round}晚", []))
+                continue
+            if event.type == EventType.DAWN:
+                deaths = "、".join(event.data.get("deaths", [])) or "无（平安夜）"
+                if segments:
+                    segments[-1][1].append(f"☀️ 天亮，死亡：{deaths}")
+                segments.append((f"第{event.round}天", []))
+                continue
+            line = render_event(event)
+            if line and segments:
+                segments[-1][1].append(line)
+        return [(title, "\n".join(lines)) for title, lines in segments if lines]
+
+    async def _summarize_segments(self, provider, job: ReviewJob, timeout: float) -> List[str]:
+        """并发总结各段（单段失败时保留截断的原始日志）"""
+        semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+
+        async def summarize(title: str, text: str) -> str:
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    provider.text_chat(
+                        prompt=f"{job.header}\n【{title}】\n{text}",
+                        system_prompt=SEGMENT_SYSTEM_PROMPT,
+                    ),
+                    timeout=timeout
+                )
+            return response.result_chain.get_plain_text() if response.result_chain else ""
+
+        results = await asyncio.gather(
+            *(summarize(title, text) for title, text in job.segments), return_exceptions=True
+        )
+        summaries = []
+        for (title, text), result in zip(job.segments, results):
+            if isinstance(result, BaseException) or not result:
+                logger.warning(f"[狼人杀] 复盘分段「{title}」总结失败，使用原始日志: {result or '空回复'}")
+                result = text[:SEGMENT_FALLBACK_CHARS]
+            summaries.append(f"【{title}】\n{result}")
+        return summaries
+
+    def _record_stats(self, job: ReviewJob, prompt_sizes: List[int], latency_ms: float) -> None:
+        """记录本次复盘的调用次数、提示词字数和耗时，并输出该模式的累计均值"""
+        stats = self._stats.setdefault(job.mode, {"reviews": 0, "chars": 0, "max_chars": 0, "ms": 0.0})
+        stats["reviews"] += 1
+        stats["chars"] += sum(prompt_sizes)
+        stats["max_chars"] += max(prompt_sizes)
+        stats["ms"] += latency_ms
+        n = stats["reviews"]
+        logger.info(
+            f"[狼人杀] AI复盘完成（{job.mode}）：调用 {len(prompt_sizes)} 次，提示词共 {sum(prompt_sizes)} 字"
+            f"（单次最长 {max(prompt_sizes)} 字），耗时 {latency_ms:.0f}ms；累计 {n} 局，"
+            f"平均提示词 {stats['chars'] / n:.0f} 字（单次最长 {stats['max_chars'] / n:.0f} 字），"
+            f"平均耗时 {stats['ms'] / n:.0f}ms"
+        )
+
     def _get_provider(self, room: "GameRoom"):
         """获取LLM provider"""
         if room.config.ai_review_model:
@@ -97,8 +228,10 @@ class AIReviewer:
             "💤 本局超级划水：[玩家昵称] - [简短理由]"
         )
 
-    def _format_game_data(self, room: "GameRoom", winning_faction: str) -> str:
-        """整理游戏数据为AI可读格式"""
+    def _format_header(
+        self, room: "GameRoom", winning_faction: str, report: Optional["GameReport"] = None
+    ) -> str:
+        """整理游戏结果和玩家身份（有本地战报时附带各玩家统计）"""
         from ..models import Role
 
         lines = []
@@ -109,6 +242,10 @@ class AIReviewer:
         lines.append(f"胜利方：{faction_name}")
         lines.append("")
 
+        if report:
+            lines.append(report.to_prompt())
+            return "\n".join(lines)
+
         # 玩家身份
         lines.append("【玩家身份】")
         role_names = {
@@ -123,11 +260,44 @@ class AIReviewer:
             lines.append(f"{player.display_name} - {role_name}")
         lines.append("")
 
+        return "\n".join(lines)
+
+    def _format_game_data(self, room: "GameRoom", header: str, compact_votes: bool = False) -> str:
+        """整理游戏数据为AI可读格式
+
+        Args:
+            compact_votes: 同一轮投票合并为一行（如"3→1，4弃票"），有本地战报统计时使用
+        """
+        lines = [header]
+
         # 游戏日志
-        if room.game_log:
+        log = self._render_compact_log(room) if compact_votes else room.game_log
+        if log:
             lines.append("【游戏进程】")
-            for log_entry in room.game_log:
+            for log_entry in log:
                 lines.append(log_entry)
             lines.append("")
 
         return "\n".join(lines)
+
+    @staticmethod
+    def _render_compact_log(room: "GameRoom") -> List[str]:
+        """渲染游戏日志，连续的投票合并为一行"""
+        lines: List[str] = []
+        votes: List[str] = []
+        vote_title = ""
+        for event in room.events:
+            if event.type == EventType.VOTE:
+                voter = (event.actor or "").split("号")[0]
+                votes.append(f"{voter}→{event.target.split('号')[0]}" if event.target else f"{voter}弃票")
+                vote_title = f"第{event.round}轮{'PK投票' if event.data.get('is_pk') else '投票'}"
+                continue
+            if votes:
+                lines.append(f"🗳️ {vote_title}：{'，'.join(votes)}")
+                votes = []
+            line = render_event(event)
+            if line is not None:
+                lines.append(line)
+        if votes:
+            lines.append(f"🗳️ {vote_title}：{'，'.join(votes)}")
+        return lines
@@ -9,12 +9,19 @@ if TYPE_CHECKING:
 class BanService:
     """禁言管理服务"""
 
+    @staticmethod
+    def _journal(room: "GameRoom", op: str, **data) -> None:
+        """记入预写日志（设置类操作在调用前记录，撤销类操作在成功后记录），插件重启后据此撤销"""
+        if room.journal:
+            room.journal.append_op(op, **data)
+
     @staticmethod
     async def ban_player(room: "GameRoom", player_id: str) -> bool:
         """禁言玩家"""
         if not room.bot:
             return False
 
+        BanService._journal(room, "ban", player=player_id)
         try:
             duration = 86400 * room.config.ban_duration_days
             await room.bot.set_group_ban(
@@ -42,6 +49,7 @@ class BanService:
                 duration=0
             )
             room.banned_player_ids.discard(player_id)
+            BanService._journal(room, "unban", player=player_id)
             logger.info(f"[狼人杀] 已解除禁言 {player_id}")
             return True
         except Exception as e:
@@ -78,6 +86,7 @@ class BanService:
         if not room.bot:
             return False
 
+        BanService._journal(room, "admin", player=player_id)
         try:
             await room.bot.set_group_admin(
                 group_id=int(room.group_id),
@@ -104,6 +113,7 @@ class BanService:
                 enable=False
             )
             room.temp_admin_ids.discard(player_id)
+            BanService._journal(room, "unadmin", player=player_id)
             logger.info(f"[狼人杀] 已取消临时管理员 {player_id}")
             return True
         except Exception as e:
@@ -148,6 +158,7 @@ class BanService:
                 player.original_card = player.name
 
             new_card = f"{player.number}号"
+            BanService._journal(room, "card", player=player.id, original=player.original_card)
             await BanService.set_group_card(room, player.id, new_card)
 
     @staticmethod
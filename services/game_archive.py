@@ -0,0 +1,319 @@
+"""对局存档 - 已结束的对局写入本地SQLite
+
+对局结束时只在内存中整理出一条记录并放入队列，由后台线程批量写入（一个事务写一批），
+结算和清理房间不等待磁盘。完整事件记录以 zlib 压缩后存为 BLOB，其余按表拆分并建立索引，
+"某群最近20局"这类查询走索引，毫秒级返回。战绩聚合表（见 game_stats）与对局在同一事务中更新。
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from astrbot.api import logger
+
+from ..models import EventLog, EventType
+from .game_stats import GameStats, LEADERBOARD_MIN_GAMES, STATS_SCHEMA
+
+if TYPE_CHECKING:
+    from ..models import GameRoom
+
+# 每批最多写入的对局数
+WRITE_BATCH_SIZE = 20
+# 攒批最长等待时间（秒）
+WRITE_BATCH_WAIT = 1.0
+
+# 记入行动表的事件类型（投票、发言单独成表）
+ACTION_EVENTS = (
+    EventType.WOLF_VOTE, EventType.KILL, EventType.SAVE, EventType.POISON, EventType.WITCH_PASS,
+    EventType.CHECK, EventType.DAWN, EventType.DEATH, EventType.EXILE, EventType.NO_EXILE,
+    EventType.SHOT, EventType.CLAIM,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_id TEXT NOT NULL,
+    started_at REAL,
+    ended_at REAL NOT NULL,
+    duration REAL,
+    rounds INTEGER NOT NULL,
+    winner TEXT,
+    player_count INTEGER NOT NULL,
+    transcript BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_games_group_date ON games (group_id, ended_at);
+CREATE INDEX IF NOT EXISTS idx_games_date ON games (ended_at);
+
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    player_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    role TEXT,
+    is_ai INTEGER NOT NULL,
+    alive INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    PRIMARY KEY (game_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_game_players_player ON game_players (player_id, game_id);
+
+CREATE TABLE IF NOT EXISTS game_actions (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    seq INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    actor_id TEXT,
+    target_id TEXT,
+    data TEXT,
+    PRIMARY KEY (game_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS game_votes (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    seq INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    voter_id TEXT NOT NULL,
+    target_id TEXT,
+    is_pk INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_game_votes_voter ON game_votes (voter_id);
+
+CREATE TABLE IF NOT EXISTS game_speeches (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    seq INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    player_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_game_speeches_player ON game_speeches (player_id);
+"""
+
+
+class GameArchive:
+    """对局存档（后台线程批量写入）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    # ==================== 写入 ====================
+
+    def record(self, room: "GameRoom", winner: Optional[str]) -> None:
+        """整理对局记录并放入写入队列（不等待磁盘）"""
+        try:
+            record = self.build_record(room, winner)
+        except Exception as e:
+            logger.error(f"[狼人杀] 整理对局存档失败: {e}")
+            return
+        self.submit(record)
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """将已整理好的记录放入写入队列"""
+        self._queue.put(record)
+        self._ensure_writer()
+
+    @staticmethod
+    def build_record(room: "GameRoom", winner: Optional[str]) -> Dict[str, Any]:
+        """从房间整理出一条存档记录"""
+        ids = {p.display_name: p.id for p in room.players.values()}
+        ended_at = time.time()
+        record = {
+            "group_id": room.group_id,
+            "started_at": room.started_at,
+            "ended_at": ended_at,
+            "duration": ended_at - room.started_at if room.started_at else None,
+            "rounds": room.current_round,
+            "winner": winner,
+            "players": [
+                (
+                    p.id, p.name, p.number, p.role.value if p.role else None, int(p.is_ai), int(p.is_alive),
+                    int(bool(winner) and p.role is not None and (p.is_werewolf == (winner == "werewolf"))),
+                )
+                for p in room.players.values()
+            ],
+            "actions": [],
+            "votes": [],
+            "speeches": [],
+            "transcript": zlib.compress(json.dumps(room.events.to_dicts(), ensure_ascii=False).encode("utf-8")),
+        }
+
+        for seq, event in enumerate(room.events):
+            actor_id, target_id = ids.get(event.actor or ""), ids.get(event.target or "")
+            if event.type == EventType.VOTE:
+                if actor_id:
+                    record["votes"].append((seq, event.round, actor_id, target_id, int(bool(event.data.get("is_pk")))))
+            elif event.type in (EventType.SPEECH, EventType.LAST_WORDS):
+                if actor_id:
+                    kind = "last_words" if event.type == EventType.LAST_WORDS else (
+                        "pk" if event.data.get("is_pk") else "speech"
+                    )
+                    record["speeches"].append((seq, event.round, actor_id, kind, event.data.get("text", "")))
+            elif event.type in ACTION_EVENTS:
+                data = json.dumps(event.data, ensure_ascii=False) if event.data else None
+                record["actions"].append((seq, event.round, event.type.value, actor_id, target_id, data))
+        return record
+
+    def _ensure_writer(self) -> None:
+        """按需启动后台写入线程"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name="werewolf-archive", daemon=True)
+                self._thread.start()
+
+    def _writer_loop(self) -> None:
+        """后台线程：攒批写入，收到 None 时写完剩余记录后退出"""
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"[狼人杀] 打开对局存档失败: {e}")
+            return
+        try:
+            while True:
+                item = self._queue.get()
+                batch, stop = [], item is None
+                if item is not None:
+                    batch.append(item)
+                deadline = time.monotonic() + WRITE_BATCH_WAIT
+                while not stop and len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                    else:
+                        batch.append(item)
+                if batch:
+                    self._write_batch(conn, batch)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Dict[str, Any]]) -> None:
+        """在一个事务中写入一批对局"""
+        try:
+            with conn:
+                for record in batch:
+                    self.insert_record(conn, record)
+            logger.info(f"[狼人杀] 已存档 {len(batch)} 局对局")
+        except sqlite3.Error as e:
+            logger.error(f"[狼人杀] 写入对局存档失败: {e}")
+
+    @staticmethod
+    def insert_record(conn: sqlite3.Connection, record: Dict[str, Any]) -> int:
+        """写入一局对局（调用方负责事务），返回对局ID"""
+        cursor = conn.execute(
+            "INSERT INTO games (group_id, started_at, ended_at, duration, rounds, winner, player_count, transcript)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record["group_id"], record["started_at"], record["ended_at"], record["duration"],
+                record["rounds"], record["winner"], len(record["players"]), record["transcript"],
+            )
+        )
+        game_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO game_players VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(game_id, *row) for row in record["players"]]
+        )
+        conn.executemany(
+            "INSERT INTO game_actions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(game_id, *row) for row in record["actions"]]
+        )
+        conn.executemany(
+            "INSERT INTO game_votes VALUES (?, ?, ?, ?, ?, ?)",
+            [(game_id, *row) for row in record["votes"]]
+        )
+        conn.executemany(
+            "INSERT INTO game_speeches VALUES (?, ?, ?, ?, ?, ?)",
+            [(game_id, *row) for row in record["speeches"]]
+        )
+        GameStats.apply(conn, record)
+        return game_id
+
+    def close(self, timeout: float = 5.0) -> None:
+        """写完队列中的记录后停止后台线程"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # ==================== 查询 ====================
+
+    def recent_games(self, group_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """某群最近的对局（不含完整记录）"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT id, started_at, ended_at, duration, rounds, winner, player_count FROM games"
+                " WHERE group_id = ? ORDER BY ended_at DESC LIMIT ?",
+                (group_id, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def player_games(self, player_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """某玩家最近的对局及其身份、胜负"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT g.id, g.group_id, g.ended_at, g.winner, p.number, p.role, p.won FROM game_players p"
+                " JOIN games g ON g.id = p.game_id WHERE p.player_id = ? ORDER BY p.game_id DESC LIMIT ?",
+                (player_id, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def transcript(self, game_id: int) -> Optional[EventLog]:
+        """读取一局的完整事件记录"""
+        with self._reader() as conn:
+            row = conn.execute("SELECT transcript FROM games WHERE id = ?", (game_id,)).fetchone()
+        if not row or row["transcript"] is None:
+            return None
+        return EventLog.from_dicts(json.loads(zlib.decompress(row["transcript"]).decode("utf-8")))
+
+    def player_stats(self, group_id: str, player_id: str):
+        """玩家在某群的战绩（只读聚合表），返回 (总战绩, 各身份战绩)"""
+        with self._reader() as conn:
+            return GameStats.player_summary(conn, group_id, player_id)
+
+    def leaderboard(
+        self, group_id: str, limit: int = 10, min_games: int = LEADERBOARD_MIN_GAMES
+    ) -> List[Dict[str, Any]]:
+        """某群排行榜（只读聚合表）"""
+        with self._reader() as conn:
+            return GameStats.leaderboard(conn, group_id, limit, min_games)
+
+    def group_stats(self, group_id: str) -> Optional[Dict[str, Any]]:
+        """某群总体统计（只读聚合表）"""
+        with self._reader() as conn:
+            return GameStats.group_summary(conn, group_id)
+
+    def rebuild_stats(self) -> int:
+        """由对局明细表重建全部聚合表（补录历史对局后使用），返回统计的对局数"""
+        with self._reader() as conn:
+            with conn:
+                return GameStats.rebuild(conn)
+
+    # ==================== 连接 ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开连接（首次打开时建表）"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            conn.executescript(SCHEMA + STATS_SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _reader(self) -> "closing[sqlite3.Connection]":
+        """只读查询用的短连接（WAL模式下不阻塞后台写入）"""
+        return closing(self._connect())
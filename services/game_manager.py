@@ -1,18 +1,26 @@
 """游戏管理器"""
+import asyncio
+import os
 import random
-from typing import Dict, Optional, Tuple, TYPE_CHECKING
+import time
+from typing import Dict, Optional, Set, Tuple, TYPE_CHECKING
 from astrbot.api import logger
+from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
-from ..models import GameRoom, GameConfig, GamePhase, Player, Role, AIPlayerConfig
+from ..models import GameRoom, GameConfig, GamePhase, Player, Role, AIPlayerConfig, EventType
 from ..roles import RoleFactory
 from .message_service import MessageService
 from .ban_service import BanService
 from .victory_checker import VictoryChecker
-from .ai_reviewer import AIReviewer
-from .ai import AIPlayerService
+from .room_store import RoomStore
+from .game_archive import GameArchive
+from .game_report import GameReport
+from .review_queue import ReviewQueue
 
 if TYPE_CHECKING:
     from astrbot.api.star import Context
+    from .ai_reviewer import AIReviewer
+    from .ai import AIPlayerService
 
 
 class GameManager:
@@ -23,10 +31,96 @@ class GameManager:
         self.config = config
         self.rooms: Dict[str, GameRoom] = {}  # {群ID: 房间}
 
-        # 初始化服务
+        # 初始化服务（AI相关服务首次使用时再创建）
         self.message_service = MessageService(context)
-        self.ai_reviewer = AIReviewer(context)
-        self.ai_player_service = AIPlayerService(context)
+        self._ai_reviewer: Optional["AIReviewer"] = None
+        self._review_queue: Optional[ReviewQueue] = None
+        self._ai_player_service: Optional["AIPlayerService"] = None
+
+        # 后台任务（保持引用，避免被垃圾回收）
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        # 房间持久化（快照 + 预写日志），启动时加载上次中断的对局
+        self.room_store: Optional[RoomStore] = None
+        self._pending_recovery: Dict[str, GameRoom] = {}
+        if config.enable_room_persistence:
+            self.room_store = RoomStore(os.path.join(get_astrbot_data_path(), "werewolf_data", "rooms"))
+            self._pending_recovery = {room.group_id: room for room in self.room_store.load_all(config)}
+
+        # 对局存档（后台线程写入SQLite）
+        self.archive: Optional[GameArchive] = None
+        if config.enable_game_archive:
+            self.archive = GameArchive(os.path.join(get_astrbot_data_path(), "werewolf_data", "games.db"))
+
+    @property
+    def ai_reviewer(self) -> "AIReviewer":
+        """AI复盘服务（延迟加载）"""
+        if self._ai_reviewer is None:
+            from .ai_reviewer import AIReviewer
+            self._ai_reviewer = AIReviewer(self.context)
+        return self._ai_reviewer
+
+    @property
+    def review_queue(self) -> ReviewQueue:
+        """AI复盘后台队列（延迟创建）"""
+        if self._review_queue is None:
+            self._review_queue = ReviewQueue(
+                self.ai_reviewer,
+                self.message_service.send_group_message,
+                self.has_active_ai_games,
+                timeout=self.config.ai_review_timeout,
+            )
+        return self._review_queue
+
+    @property
+    def ai_player_service(self) -> "AIPlayerService":
+        """AI玩家服务（延迟加载，会导入全部提示词模块）"""
+        if self._ai_player_service is None:
+            from .ai import AIPlayerService
+            self._ai_player_service = AIPlayerService(self.context)
+        return self._ai_player_service
+
+    # ========== 后台任务 ==========
+
+    def spawn_background(self, coro) -> asyncio.Task:
+        """创建后台任务并保持引用"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    def schedule_ai_warmup(self) -> None:
+        """后台预热所有配置的AI模型：玩家模型、快速档模型和备用模型（未启用预热时跳过）
+
+        只在AI玩家加入房间时调用，首次调用才构建AI服务。
+        """
+        if not self.config.enable_warmup:
+            return
+        config = self.config
+        model_ids = [config.ai_player_model] + [
+            m for m in [config.ai_fast_model] + config.ai_fallback_models if m
+        ]
+        self.spawn_background(self.ai_player_service.warm_up(
+            list(dict.fromkeys(model_ids)), send_probe=config.warmup_probe_request
+        ))
+
+    async def save_ai_cache(self) -> None:
+        """保存AI响应缓存（AI服务未加载时跳过）"""
+        if self._ai_player_service is not None:
+            await self._ai_player_service.save_cache()
+
+    def close_review_queue(self) -> None:
+        """停止后台AI复盘（队列未创建时跳过）"""
+        if self._review_queue is not None:
+            self._review_queue.close()
+
+    def has_active_ai_games(self) -> bool:
+        """是否有进行中且包含AI玩家的对局"""
+        return any(
+            room.phase not in (GamePhase.WAITING, GamePhase.FINISHED)
+            and any(p.is_ai for p in room.players.values())
+            for room in self.rooms.values()
+        )
 
     # ========== 房间管理 ==========
 
@@ -92,11 +186,105 @@ class GameManager:
         except Exception as e:
             logger.error(f"[狼人杀] 取消临时管理员失败: {e}")
 
+        # 保存本局产生的AI响应缓存
+        if self.config.ai_response_cache:
+            await self.save_ai_cache()
+
+        # 删除持久化文件
+        if self.room_store:
+            self.room_store.discard(room)
+
         # 删除房间
         del self.rooms[group_id]
 
         logger.info(f"[狼人杀] 群 {group_id} 房间已清理")
 
+    # ========== 持久化与恢复 ==========
+
+    async def recover_rooms(self) -> None:
+        """插件启动后恢复上次中断的对局（拿不到Bot的群等该群下一条消息时再处理）"""
+        for group_id, room in list(self._pending_recovery.items()):
+            room.bot = self._resolve_bot(room.msg_origin)
+            if room.bot is None:
+                logger.warning(f"[狼人杀] 群 {group_id} 暂无可用的Bot，等待该群下一条消息时再恢复")
+                continue
+            del self._pending_recovery[group_id]
+            await self._recover_room(room)
+
+    async def recover_pending(self, group_id: str, bot) -> None:
+        """用收到的群消息中的Bot恢复该群等待中的对局"""
+        room = self._pending_recovery.pop(group_id, None)
+        if room:
+            room.bot = bot
+            await self._recover_room(room)
+
+    async def _recover_room(self, room: GameRoom) -> None:
+        """继续中断的对局；不能继续时撤销全员禁言、个人禁言、临时管理员和群昵称"""
+        existing = self.rooms.get(room.group_id)
+        if existing:
+            # 群里已经开了新房间：只撤销旧对局的个人改动，不覆盖新房间
+            logger.warning(f"[狼人杀] 群 {room.group_id} 已有新房间，只撤销中断对局的群内改动")
+            await BanService.restore_player_cards(room)
+            await BanService.unban_all_players(room)
+            await BanService.clear_temp_admins(room)
+            if not existing.journal:
+                self.room_store.discard(room)
+            return
+
+        self.rooms[room.group_id] = room
+        resumable = room.phase not in (GamePhase.WAITING, GamePhase.FINISHED) and room.msg_origin
+        if self.config.resume_interrupted_games and resumable:
+            try:
+                self.room_store.attach(room)
+                for player in room.players.values():
+                    if player.is_ai:
+                        self.ai_player_service.restore_ai_context(player, room)
+                await self.message_service.send_group_message(
+                    room, f"🔄 插件已重启，游戏从第{room.current_round}轮「{room.phase.value}」继续"
+                )
+                from ..phases import PhaseManager
+                await PhaseManager(self).resume_phase(room)
+                logger.info(f"[狼人杀] 群 {room.group_id} 已恢复中断的对局")
+                return
+            except Exception as e:
+                logger.error(f"[狼人杀] 群 {room.group_id} 恢复对局失败，改为撤销群内改动: {e}")
+
+        await self.message_service.send_group_message(
+            room, "⚠️ 插件重启前的狼人杀对局已中断，已解除禁言并恢复群昵称"
+        )
+        await self.cleanup_room(room.group_id)
+
+    async def suspend_rooms(self) -> None:
+        """插件终止时保存进行中的对局（不撤销群内改动），下次启动后继续"""
+        for group_id, room in list(self.rooms.items()):
+            if not room.journal:
+                continue
+            room.journal.checkpoint(room)
+            room.journal.close()
+            room.journal = None
+            room.cancel_timer()
+            for task in (room.wolf_ai_vote_task, room.wolf_ai_process_task):
+                if task and not task.done():
+                    task.cancel()
+            del self.rooms[group_id]
+            logger.info(f"[狼人杀] 群 {group_id} 的对局已保存，重启后继续")
+        if self.room_store:
+            # 等后台线程把快照写完再退出
+            await asyncio.to_thread(self.room_store.flush)
+
+    def _resolve_bot(self, msg_origin: Optional[str]):
+        """按消息来源（平台ID:消息类型:会话）找到对应平台的Bot客户端"""
+        if not msg_origin:
+            return None
+        platform_id = str(msg_origin).split(":", 1)[0]
+        try:
+            for platform in self.context.platform_manager.platform_insts:
+                if platform.meta().id == platform_id:
+                    return platform.get_client()
+        except Exception as e:
+            logger.warning(f"[狼人杀] 获取平台 {platform_id} 的Bot失败: {e}")
+        return None
+
     # ========== 玩家管理 ==========
 
     def add_player(self, room: GameRoom, player_id: str, player_name: str) -> Player:
@@ -156,18 +344,34 @@ class GameManager:
         random.shuffle(roles_pool)
         for player, role in zip(players_list, roles_pool):
             player.assign_role(role)
+        room.reindex()
 
         # 初始化游戏状态
         room.phase = GamePhase.NIGHT_WOLF
         room.current_round = 1
+        room.started_at = time.time()
 
         # 为AI玩家初始化上下文
         for player in players_list:
             if player.is_ai:
                 self.ai_player_service.initialize_ai_context(player, room)
 
-        # 记录日志
-        room.log_round_start()
+        # 记录开局事件
+        room.record_event(
+            EventType.GAME_START,
+            group_id=room.group_id,
+            creator_id=room.creator_id,
+            players=[
+                {"id": p.id, "name": p.name, "number": p.number,
+                 "role": p.role.value if p.role else None, "is_ai": p.is_ai}
+                for p in players_list
+            ],
+        )
+        room.record_event(EventType.ROUND_START)
+
+        # 开启持久化（之后的群操作都会先记入预写日志）
+        if self.room_store:
+            self.room_store.attach(room)
 
         # 修改群昵称为编号（仅人类玩家）
         await BanService.set_player_numbers(room)
@@ -221,6 +425,18 @@ class GameManager:
             return False
 
         room.phase = GamePhase.FINISHED
+        room.record_event(EventType.GAME_END, winner=winning_faction)
+
+        # 整理对局记录：存档（只入队，由后台线程写盘）和本地战报共用
+        record, report = None, None
+        try:
+            record = GameArchive.build_record(room, winning_faction)
+            if self.config.enable_game_report and winning_faction:
+                report = GameReport.from_record(record)
+        except Exception as e:
+            logger.error(f"[狼人杀] 整理对局记录失败: {e}")
+        if self.archive and record:
+            self.archive.submit(record)
 
         # 获取角色公布文本
         roles_text = VictoryChecker.get_all_players_roles(room)
@@ -228,14 +444,15 @@ class GameManager:
         # 发送胜利消息
         await self.message_service.announce_victory(room, victory_msg, roles_text)
 
-        # 生成AI复盘（失败不影响游戏结束）
+        # AI复盘只整理数据并入队，由后台生成后再发送（失败时改发本地战报，不影响游戏结束）
         try:
-            if winning_faction:
-                ai_review = await self.ai_reviewer.generate_review(room, winning_faction)
-                if ai_review:
-                    await self.message_service.send_group_message(room, ai_review)
+            job = self.ai_reviewer.build_job(room, winning_faction, report) if winning_faction else None
+            if job:
+                self.review_queue.submit(job)
+            elif report:
+                await self.message_service.send_group_message(room, report.render_text())
         except Exception as e:
-            logger.error(f"[狼人杀] AI复盘生成失败: {e}")
+            logger.error(f"[狼人杀] AI复盘入队失败: {e}")
 
         # 清理房间（确保一定会执行）
         await self.cleanup_room(room.group_id)
@@ -269,16 +486,17 @@ class GameManager:
         # 记录被杀玩家（不立即移除，等女巫行动后确定）
         room.last_killed_id = killed_id
 
-        # 记录日志
+        # 记录事件
         killed_player = room.get_player(killed_id)
         if killed_player:
-            room.log(f"🌙 狼人最终决定刀 {killed_player.display_name}")
+            room.record_event(EventType.KILL, target=killed_player.display_name)
 
         return killed_id
 
     async def process_witch_action(self, room: GameRoom) -> None:
         """处理女巫行动结果"""
         witch_state = room.witch_state
+        self._record_night_events(room)
 
         # 如果女巫救人
         if witch_state.saved_player_id:
@@ -293,6 +511,18 @@ class GameManager:
             room.kill_player(witch_state.poisoned_player_id)
             await BanService.ban_player(room, witch_state.poisoned_player_id)
 
+    @staticmethod
+    def _record_night_events(room: GameRoom) -> None:
+        """记录今晚的死亡事件（刀人、救人、毒人在决定时已记录）"""
+        witch_state = room.witch_state
+        killed = None if witch_state.saved_player_id else room.get_player(room.last_killed_id or "")
+        poisoned = room.get_player(witch_state.poisoned_player_id or "")
+
+        if killed:
+            room.record_event(EventType.DEATH, target=killed.display_name, cause="wolf", night=True)
+        if poisoned:
+            room.record_event(EventType.DEATH, target=poisoned.display_name, cause="poison", night=True)
+
     # ========== 白天流程 ==========
 
     async def process_day_vote(self, room: GameRoom) -> Tuple[Optional[str], bool]:
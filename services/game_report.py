@@ -0,0 +1,177 @@
+"""本地战报 - 不调用LLM，由对局行动统计生成赛后报告
+
+输入为对局存档记录（GameArchive.build_record 的结果），只用行动、投票、发言三类数据，
+毫秒级完成。用于AI复盘关闭或生成失败时的兜底，开启AI复盘时也作为精简的结构化输入。
+MVP 与战绩统计（GameStats.pick_mvp）口径一致。
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ..models import Role
+from .game_stats import GameStats
+
+
+@dataclass
+class PlayerReport:
+    """单个玩家的本局统计"""
+    player_id: str
+    number: int
+    name: str
+    role: Optional[str]
+    won: bool
+    alive: bool
+    died_round: Optional[int] = None  # 死亡回合（存活为 None）
+    speeches: int = 0
+    speech_chars: int = 0
+    votes: int = 0
+    correct_votes: int = 0  # 好人投狼、狼人投好人
+    checks: int = 0
+    check_hits: int = 0
+    saves: int = 0
+    saves_on_good: int = 0
+    poisons: int = 0
+    poisons_on_wolves: int = 0
+    shot: Optional[bool] = None  # 猎人开枪是否带走狼人（未开枪为 None）
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.number}号.{self.name}"
+
+    @property
+    def is_werewolf(self) -> bool:
+        return self.role == Role.WEREWOLF.value
+
+    @property
+    def role_name(self) -> str:
+        return Role(self.role).display_name if self.role else "未知"
+
+
+@dataclass
+class GameReport:
+    """一局的本地战报"""
+    winner: Optional[str]
+    rounds: int
+    players: List[PlayerReport]
+    mvp_id: Optional[str] = None
+    slacker_id: Optional[str] = None
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "GameReport":
+        """由对局存档记录统计战报"""
+        players: Dict[str, PlayerReport] = {
+            pid: PlayerReport(pid, number, name, role, bool(won), bool(alive))
+            for pid, name, number, role, _, alive, won in record["players"]
+        }
+        roles = {pid: p.role for pid, p in players.items()}
+        wolf = Role.WEREWOLF.value
+
+        for _, round_num, event_type, actor_id, target_id, _ in record["actions"]:
+            actor = players.get(actor_id)
+            target_is_wolf = roles.get(target_id) == wolf
+            if event_type == "death" and target_id in players:
+                players[target_id].died_round = round_num
+            elif actor is None:
+                continue
+            elif event_type == "check":
+                actor.checks += 1
+                actor.check_hits += target_is_wolf
+            elif event_type == "save":
+                actor.saves += 1
+                actor.saves_on_good += target_id in players and not target_is_wolf
+            elif event_type == "poison":
+                actor.poisons += 1
+                actor.poisons_on_wolves += target_is_wolf
+            elif event_type == "shot" and target_id:
+                actor.shot = target_is_wolf
+
+        for _, _, voter_id, target_id, _ in record["votes"]:
+            voter = players.get(voter_id)
+            if voter is None or not target_id:
+                continue
+            voter.votes += 1
+            voter.correct_votes += voter.is_werewolf != (roles.get(target_id) == wolf)
+
+        for _, _, player_id, _, text in record["speeches"]:
+            if player_id in players:
+                players[player_id].speeches += 1
+                players[player_id].speech_chars += len(text or "")
+
+        report = cls(
+            winner=record["winner"],
+            rounds=record["rounds"],
+            players=sorted(players.values(), key=lambda p: p.number),
+        )
+        report.mvp_id = GameStats.pick_mvp(record)
+        report.slacker_id = report._pick_slacker()
+        return report
+
+    def _pick_slacker(self) -> Optional[str]:
+        """划水候选：有发言机会的玩家中发言最少、投票命中最少的（不含MVP）"""
+        candidates = [p for p in self.players if p.speeches and p.player_id != self.mvp_id]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda p: (p.speech_chars, p.correct_votes, p.number)).player_id
+
+    def get(self, player_id: Optional[str]) -> Optional[PlayerReport]:
+        return next((p for p in self.players if p.player_id == player_id), None)
+
+    # ==================== 渲染 ====================
+
+    def render_text(self) -> str:
+        """渲染为群消息文本"""
+        faction = "狼人" if self.winner == "werewolf" else "好人"
+        lines = [f"📊 本局战报（{faction}阵营获胜，共{self.rounds}轮）", ""]
+        for p in self.players:
+            lines.append(f"{'✅' if p.alive else '💀'} {p.display_name}（{p.role_name}）：{self._describe(p)}")
+
+        mvp, slacker = self.get(self.mvp_id), self.get(self.slacker_id)
+        lines.append("")
+        if mvp:
+            lines.append(f"🏆 本局MVP：{mvp.display_name} - {self._highlight(mvp)}")
+        if slacker:
+            lines.append(f"💤 本局划水：{slacker.display_name} - 发言 {slacker.speech_chars} 字")
+        return "\n".join(lines)
+
+    def to_prompt(self) -> str:
+        """渲染为复盘提示词中的结构化统计（代替玩家身份列表）"""
+        lines = ["【玩家身份与数据】"]
+        for p in self.players:
+            lines.append(f"{p.display_name} - {p.role_name}，{self._describe(p)}")
+        mvp, slacker = self.get(self.mvp_id), self.get(self.slacker_id)
+        if mvp or slacker:
+            lines.append(
+                f"数据参考：MVP候选 {mvp.display_name if mvp else '无'}，"
+                f"划水候选 {slacker.display_name if slacker else '无'}"
+            )
+        lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _describe(p: PlayerReport) -> str:
+        """一名玩家的统计描述"""
+        parts = ["存活至结束" if p.alive else f"第{p.died_round}轮出局"]
+        parts.append(f"发言{p.speeches}次/{p.speech_chars}字")
+        if p.votes:
+            parts.append(f"投票命中{p.correct_votes}/{p.votes}")
+        if p.checks:
+            parts.append(f"查杀{p.check_hits}/{p.checks}")
+        if p.saves:
+            parts.append(f"救人{p.saves}次（救好人{p.saves_on_good}）")
+        if p.poisons:
+            parts.append(f"毒人{p.poisons}次（毒中狼人{p.poisons_on_wolves}）")
+        if p.shot is not None:
+            parts.append("开枪带走狼人" if p.shot else "开枪误伤好人")
+        return "，".join(parts)
+
+    @staticmethod
+    def _highlight(p: PlayerReport) -> str:
+        """MVP的主要贡献"""
+        if p.check_hits:
+            return f"查杀 {p.check_hits} 只狼人"
+        if p.poisons_on_wolves:
+            return "毒中狼人"
+        if p.shot:
+            return "开枪带走狼人"
+        if p.votes:
+            return f"投票命中 {p.correct_votes}/{p.votes}"
+        return "存活到最后" if p.alive else "带领阵营获胜"
@@ -0,0 +1,231 @@
+"""战绩统计 - 按群维护的玩家/群聚合表
+
+每局存档时在同一个事务里增量更新聚合表（场次、胜场、各身份胜率、预言家查杀率、
+好人投票命中率、MVP次数），战绩和排行查询只读聚合表，不扫描历史对局。
+聚合表可随时由对局明细表重建（补录历史对局或调整统计口径后使用）。
+"""
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+# 排行榜最少场次
+LEADERBOARD_MIN_GAMES = 3
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_stats (
+    group_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    mvps INTEGER NOT NULL DEFAULT 0,
+    survived INTEGER NOT NULL DEFAULT 0,
+    seer_checks INTEGER NOT NULL DEFAULT 0,
+    seer_wolf_hits INTEGER NOT NULL DEFAULT 0,
+    good_votes INTEGER NOT NULL DEFAULT 0,
+    good_votes_on_wolves INTEGER NOT NULL DEFAULT 0,
+    last_played REAL,
+    PRIMARY KEY (group_id, player_id)
+);
+
+CREATE TABLE IF NOT EXISTS player_role_stats (
+    group_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, player_id, role)
+);
+
+CREATE TABLE IF NOT EXISTS group_stats (
+    group_id TEXT PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    werewolf_wins INTEGER NOT NULL DEFAULT 0,
+    villager_wins INTEGER NOT NULL DEFAULT 0,
+    total_rounds INTEGER NOT NULL DEFAULT 0,
+    total_duration REAL NOT NULL DEFAULT 0,
+    last_played REAL
+);
+"""
+
+# MVP评分：好人阵营
+_GOOD_SCORES = {"seer_wolf_hit": 2, "vote_on_wolf": 2, "poison_wolf": 3, "shot_wolf": 3, "save": 1, "survived": 1}
+# MVP评分：狼人阵营
+_WOLF_SCORES = {"vote_on_good": 1, "survived": 2}
+
+
+class GameStats:
+    """战绩聚合表维护与查询"""
+
+    # ==================== 增量更新 ====================
+
+    @staticmethod
+    def apply(conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+        """把一局存档记录累加到聚合表（调用方负责事务）"""
+        group_id, ended_at = record["group_id"], record["ended_at"]
+        players = {row[0]: row for row in record["players"]}  # id -> (id, name, number, role, is_ai, alive, won)
+        roles = {pid: row[3] for pid, row in players.items()}
+        mvp = GameStats.pick_mvp(record)
+
+        counters: Dict[str, Dict[str, int]] = {
+            pid: {"seer_checks": 0, "seer_wolf_hits": 0, "good_votes": 0, "good_votes_on_wolves": 0}
+            for pid in players
+        }
+        for _, _, event_type, actor_id, target_id, _ in record["actions"]:
+            if event_type == "check" and actor_id in counters:
+                counters[actor_id]["seer_checks"] += 1
+                counters[actor_id]["seer_wolf_hits"] += roles.get(target_id) == "werewolf"
+        for _, _, voter_id, target_id, _ in record["votes"]:
+            if voter_id in counters and target_id and roles.get(voter_id) != "werewolf":
+                counters[voter_id]["good_votes"] += 1
+                counters[voter_id]["good_votes_on_wolves"] += roles.get(target_id) == "werewolf"
+
+        conn.executemany(
+            "INSERT INTO player_stats (group_id, player_id, name, games, wins, mvps, survived, seer_checks,"
+            " seer_wolf_hits, good_votes, good_votes_on_wolves, last_played)"
+            " VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (group_id, player_id) DO UPDATE SET"
+            " name = excluded.name, games = games + 1, wins = wins + excluded.wins,"
+            " mvps = mvps + excluded.mvps, survived = survived + excluded.survived,"
+            " seer_checks = seer_checks + excluded.seer_checks,"
+            " seer_wolf_hits = seer_wolf_hits + excluded.seer_wolf_hits,"
+            " good_votes = good_votes + excluded.good_votes,"
+            " good_votes_on_wolves = good_votes_on_wolves + excluded.good_votes_on_wolves,"
+            " last_played = MAX(COALESCE(last_played, 0), excluded.last_played)",
+            [
+                (
+                    group_id, pid, name, won, int(pid == mvp), alive,
+                    counters[pid]["seer_checks"], counters[pid]["seer_wolf_hits"],
+                    counters[pid]["good_votes"], counters[pid]["good_votes_on_wolves"], ended_at,
+                )
+                for pid, name, _, _, _, alive, won in players.values()
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO player_role_stats (group_id, player_id, role, games, wins) VALUES (?, ?, ?, 1, ?)"
+            " ON CONFLICT (group_id, player_id, role) DO UPDATE SET games = games + 1, wins = wins + excluded.wins",
+            [(group_id, pid, role, won) for pid, _, _, role, _, _, won in players.values() if role]
+        )
+        winner = record["winner"]
+        conn.execute(
+            "INSERT INTO group_stats (group_id, games, werewolf_wins, villager_wins, total_rounds, total_duration,"
+            " last_played) VALUES (?, 1, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (group_id) DO UPDATE SET games = games + 1,"
+            " werewolf_wins = werewolf_wins + excluded.werewolf_wins,"
+            " villager_wins = villager_wins + excluded.villager_wins,"
+            " total_rounds = total_rounds + excluded.total_rounds,"
+            " total_duration = total_duration + excluded.total_duration,"
+            " last_played = MAX(COALESCE(last_played, 0), excluded.last_played)",
+            (
+                group_id, int(winner == "werewolf"), int(winner == "villager"),
+                record["rounds"], record["duration"] or 0, ended_at,
+            )
+        )
+
+    @staticmethod
+    def pick_mvp(record: Dict[str, Any]) -> Optional[str]:
+        """按本局贡献为获胜阵营选出MVP（同分取编号小的），返回玩家ID"""
+        players = {row[0]: row for row in record["players"]}
+        roles = {pid: row[3] for pid, row in players.items()}
+        winners = [pid for pid, row in players.items() if row[6]]
+        if not winners:
+            return None
+
+        scores = {pid: 0 for pid in winners}
+        for pid in winners:
+            table = _WOLF_SCORES if roles[pid] == "werewolf" else _GOOD_SCORES
+            scores[pid] += table["survived"] * players[pid][5]
+
+        for _, _, event_type, actor_id, target_id, _ in record["actions"]:
+            if actor_id not in scores or not target_id:
+                continue
+            target_is_wolf = roles.get(target_id) == "werewolf"
+            if event_type == "check" and target_is_wolf:
+                scores[actor_id] += _GOOD_SCORES["seer_wolf_hit"]
+            elif event_type == "poison" and target_is_wolf:
+                scores[actor_id] += _GOOD_SCORES["poison_wolf"]
+            elif event_type == "shot" and target_is_wolf:
+                scores[actor_id] += _GOOD_SCORES["shot_wolf"]
+            elif event_type == "save":
+                scores[actor_id] += _GOOD_SCORES["save"]
+
+        for _, _, voter_id, target_id, _ in record["votes"]:
+            if voter_id not in scores or not target_id:
+                continue
+            if roles[voter_id] == "werewolf":
+                scores[voter_id] += _WOLF_SCORES["vote_on_good"] * (roles.get(target_id) != "werewolf")
+            else:
+                scores[voter_id] += _GOOD_SCORES["vote_on_wolf"] * (roles.get(target_id) == "werewolf")
+
+        return max(winners, key=lambda pid: (scores[pid], -players[pid][2]))
+
+    # ==================== 重建 ====================
+
+    @staticmethod
+    def rebuild(conn: sqlite3.Connection) -> int:
+        """清空聚合表并由对局明细表重新计算（调用方负责事务），返回统计的对局数"""
+        conn.execute("DELETE FROM player_stats")
+        conn.execute("DELETE FROM player_role_stats")
+        conn.execute("DELETE FROM group_stats")
+
+        games = conn.execute(
+            "SELECT id, group_id, ended_at, duration, rounds, winner FROM games ORDER BY id"
+        ).fetchall()
+        for game_id, group_id, ended_at, duration, rounds, winner in games:
+            GameStats.apply(conn, {
+                "group_id": group_id,
+                "ended_at": ended_at,
+                "duration": duration,
+                "rounds": rounds,
+                "winner": winner,
+                "players": conn.execute(
+                    "SELECT player_id, name, number, role, is_ai, alive, won FROM game_players WHERE game_id = ?",
+                    (game_id,)
+                ).fetchall(),
+                "actions": conn.execute(
+                    "SELECT seq, round, type, actor_id, target_id, data FROM game_actions WHERE game_id = ?",
+                    (game_id,)
+                ).fetchall(),
+                "votes": conn.execute(
+                    "SELECT seq, round, voter_id, target_id, is_pk FROM game_votes WHERE game_id = ?",
+                    (game_id,)
+                ).fetchall(),
+            })
+        return len(games)
+
+    # ==================== 查询 ====================
+
+    @staticmethod
+    def player_summary(
+        conn: sqlite3.Connection, group_id: str, player_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """玩家在某群的战绩和各身份战绩"""
+        row = conn.execute(
+            "SELECT * FROM player_stats WHERE group_id = ? AND player_id = ?", (group_id, player_id)
+        ).fetchone()
+        if not row:
+            return None, []
+        roles = conn.execute(
+            "SELECT role, games, wins FROM player_role_stats WHERE group_id = ? AND player_id = ?"
+            " ORDER BY games DESC",
+            (group_id, player_id)
+        ).fetchall()
+        return dict(row), [dict(r) for r in roles]
+
+    @staticmethod
+    def leaderboard(
+        conn: sqlite3.Connection, group_id: str, limit: int = 10, min_games: int = LEADERBOARD_MIN_GAMES
+    ) -> List[Dict[str, Any]]:
+        """某群排行榜（按胜率，其次场次）"""
+        rows = conn.execute(
+            "SELECT player_id, name, games, wins, mvps FROM player_stats"
+            " WHERE group_id = ? AND games >= ?"
+            " ORDER BY CAST(wins AS REAL) / games DESC, games DESC, mvps DESC LIMIT ?",
+            (group_id, min_games, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    @staticmethod
+    def group_summary(conn: sqlite3.Connection, group_id: str) -> Optional[Dict[str, Any]]:
+        """某群总体统计"""
+        row = conn.execute("SELECT * FROM group_stats WHERE group_id = ?", (group_id,)).fetchone()
+        return dict(row) if row else None
@@ -1,4 +1,6 @@
 """消息发送服务"""
+import asyncio
+import time
 from typing import TYPE_CHECKING, Optional, List, Dict
 from astrbot.api import logger
 from astrbot.core.message.message_event_result import MessageChain
@@ -8,12 +10,18 @@ from ..utils import cmd
 if TYPE_CHECKING:
     from ..models import GameRoom, Player
 
+# 同一个群连续发送消息的最小间隔（秒），避免触发平台频率限制
+GROUP_MESSAGE_INTERVAL = 1.0
+
 
 class MessageService:
     """消息发送服务"""
 
     def __init__(self, context):
         self.context = context
+        # 每个群一个发送队列（锁按先来先得排队）和上次发送时间
+        self._group_locks: Dict[str, asyncio.Lock] = {}
+        self._group_last_sent: Dict[str, float] = {}
 
     async def send_group_message(self, room: "GameRoom", text: str) -> bool:
         """发送群消息"""
@@ -28,6 +36,18 @@ class MessageService:
             logger.error(f"[狼人杀] 发送群消息失败: {e}")
             return False
 
+    async def send_group_message_paced(self, room: "GameRoom", text: str) -> bool:
+        """按群排队发送群消息（保持顺序，并与上一条间隔至少 GROUP_MESSAGE_INTERVAL 秒）"""
+        lock = self._group_locks.setdefault(room.group_id, asyncio.Lock())
+        async with lock:
+            wait = self._group_last_sent.get(room.group_id, 0.0) + GROUP_MESSAGE_INTERVAL - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self.send_group_message(room, text)
+            finally:
+                self._group_last_sent[room.group_id] = time.monotonic()
+
     async def send_group_at_message(self, room: "GameRoom", player: "Player", text: str) -> bool:
         """发送群消息并@某人"""
         if not room.msg_origin:
@@ -0,0 +1,130 @@
+"""AI复盘队列 - 复盘在后台生成，不阻塞结算和房间清理
+
+对局结束时只整理复盘数据并入队，房间立即清理（解除禁言、恢复群昵称）。
+后台单个工作协程按顺序处理：有进行中的AI对局时先让路（最多等待 REVIEW_MAX_DEFER 秒），
+每次调用有独立超时，失败后按退避间隔重试，生成后发到原群；多次失败时改发本地战报。
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Tuple, TYPE_CHECKING
+from astrbot.api import logger
+
+if TYPE_CHECKING:
+    from ..models import GameRoom
+    from .ai_reviewer import AIReviewer
+
+# 最多排队的复盘数（超出时丢弃最早的）
+REVIEW_QUEUE_MAX = 16
+# 每局最多尝试次数
+REVIEW_MAX_ATTEMPTS = 3
+# 重试退避基数（秒），第 n 次重试等待 n 倍
+REVIEW_RETRY_DELAY = 10.0
+# 有进行中的AI对局时，开始生成前最多让路的时间（秒）
+REVIEW_MAX_DEFER = 120.0
+# 让路时的检查间隔（秒）
+REVIEW_DEFER_POLL = 5.0
+
+
+@dataclass
+class ReviewJob:
+    """一局复盘任务（复盘数据在房间清理前整理好）
+
+    segments 为空时一次调用生成（system_prompt/user_prompt）；
+    否则先并发总结各段（标题, 日志文本），再由 header + 各段摘要生成最终报告。
+    fallback 为多次失败后改发的本地战报（为空则不发）。
+    """
+    room: "GameRoom"
+    winning_faction: str
+    system_prompt: str = ""
+    user_prompt: str = ""
+    header: str = ""
+    segments: List[Tuple[str, str]] = field(default_factory=list)
+    fallback: str = ""
+    attempts: int = 0
+
+    @property
+    def mode(self) -> str:
+        return "map_reduce" if self.segments else "single"
+
+
+class ReviewQueue:
+    """AI复盘后台队列"""
+
+    def __init__(
+        self,
+        reviewer: "AIReviewer",
+        send: Callable[["GameRoom", str], Awaitable[bool]],
+        is_busy: Callable[[], bool],
+        timeout: float,
+    ):
+        """
+        Args:
+            reviewer: AI复盘服务
+            send: 发送群消息（房间, 文本）
+            is_busy: 是否有进行中的AI对局（为真时复盘让路）
+            timeout: 单次生成超时（秒）
+        """
+        self.reviewer = reviewer
+        self.send = send
+        self.is_busy = is_busy
+        self.timeout = timeout
+        self._queue: "asyncio.Queue[ReviewJob]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    def submit(self, job: ReviewJob) -> None:
+        """提交复盘任务（立即返回）"""
+        if self._queue.qsize() >= REVIEW_QUEUE_MAX:
+            dropped = self._queue.get_nowait()
+            logger.warning(f"[狼人杀] 复盘队列已满，丢弃群 {dropped.room.group_id} 的复盘")
+        self._queue.put_nowait(job)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        logger.info(f"[狼人杀] 群 {job.room.group_id} 的AI复盘已排队（队列 {self._queue.qsize()}）")
+
+    def close(self) -> None:
+        """停止后台生成（未完成的复盘丢弃）"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+        if not self._queue.empty():
+            logger.info(f"[狼人杀] 插件终止，丢弃 {self._queue.qsize()} 个未生成的AI复盘")
+
+    async def _run(self) -> None:
+        """后台工作协程：逐个生成复盘，队列空时退出"""
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            await self._yield_to_games()
+            await self._process(job)
+
+    async def _yield_to_games(self) -> None:
+        """有进行中的AI对局时先让路，避免与对局中的AI决策争抢模型"""
+        waited = 0.0
+        while waited < REVIEW_MAX_DEFER and self.is_busy():
+            await asyncio.sleep(REVIEW_DEFER_POLL)
+            waited += REVIEW_DEFER_POLL
+
+    async def _process(self, job: ReviewJob) -> None:
+        """生成并发送一局复盘，失败时退避重试"""
+        group_id = job.room.group_id
+        while job.attempts < REVIEW_MAX_ATTEMPTS:
+            job.attempts += 1
+            try:
+                review = await self.reviewer.request_review(job, self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"[狼人杀] 群 {group_id} AI复盘超时（第{job.attempts}次，{self.timeout:.0f}秒）")
+            except Exception as e:
+                logger.warning(f"[狼人杀] 群 {group_id} AI复盘生成失败（第{job.attempts}次）: {e}")
+            else:
+                if review:
+                    await self.send(job.room, review)
+                    logger.info(f"[狼人杀] 群 {group_id} AI复盘已发送")
+                    return
+                # 没有可用模型，重试无意义
+                break
+            if job.attempts < REVIEW_MAX_ATTEMPTS:
+                await asyncio.sleep(REVIEW_RETRY_DELAY * job.attempts)
+        logger.error(f"[狼人杀] 群 {group_id} AI复盘未能生成，已放弃")
+        if job.fallback:
+            await self.send(job.room, job.fallback)
+            logger.info(f"[狼人杀] 群 {group_id} 已改发本地战报")
@@ -0,0 +1,252 @@
+"""房间持久化 - 快照 + 预写日志，插件重启后恢复对局或撤销群内改动
+
+每个已开局的房间在数据目录下有两个文件：
+- {群号}.json：阶段切换（启动阶段定时器）时写入的完整快照
+- {群号}.wal：快照之后的事件和禁言/管理员/群昵称操作，每行一条JSON
+
+预写日志逐条写入并 flush，fsync 按批进行（攒够 WAL_FSYNC_BATCH 条或距上次超过
+WAL_FSYNC_INTERVAL 秒），进程崩溃不丢记录，系统掉电最多丢失最后一小批；
+快照先写临时文件再原子替换，写入成功后清空预写日志。
+事件循环中只做 JSON 序列化，写文件、fsync 和删除文件都按提交顺序在后台线程中执行。
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO
+from astrbot.api import logger
+
+from ..models import GameConfig, GameRoom, GameEvent, apply_event
+
+# 预写日志每攒够多少条 fsync 一次
+WAL_FSYNC_BATCH = 8
+# 距上次 fsync 超过该时间（秒）时，下一条记录写入后立即 fsync
+WAL_FSYNC_INTERVAL = 1.0
+
+
+class JournalWriter:
+    """后台写入线程：按提交顺序执行所有房间的磁盘操作"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, task: Callable[[], None]) -> None:
+        """提交一个磁盘操作（立即返回）"""
+        self._queue.put(task)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name="werewolf-journal", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        """阻塞直到已提交的操作全部完成（插件终止前调用）"""
+        self._queue.join()
+
+    def _writer_loop(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                task()
+            except Exception as e:
+                logger.warning(f"[狼人杀] 房间持久化写入失败: {e}")
+            finally:
+                self._queue.task_done()
+
+
+class RoomJournal:
+    """单个房间的快照和预写日志（磁盘操作交给 JournalWriter）"""
+
+    def __init__(self, snapshot_path: str, wal_path: str, writer: JournalWriter):
+        self.snapshot_path = snapshot_path
+        self.wal_path = wal_path
+        self.writer = writer
+        self._wal: Optional[TextIO] = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def checkpoint(self, room: GameRoom) -> None:
+        """写入完整快照并清空预写日志（在事件循环中序列化，后台写盘）"""
+        try:
+            data = json.dumps(room.to_snapshot(), ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"[狼人杀] 保存房间 {room.group_id} 快照失败: {e}")
+            return
+        self.writer.submit(lambda: self._write_snapshot(data, room.group_id))
+
+    def append_event(self, event: GameEvent) -> None:
+        """记录一条游戏事件"""
+        self._append({"event": event.to_dict()})
+
+    def append_op(self, op: str, **data: Any) -> None:
+        """记录一条群操作（ban/unban/admin/unadmin/card）"""
+        self._append({"op": op, **data})
+
+    def close(self) -> None:
+        """刷盘并关闭预写日志"""
+        self.writer.submit(self._close_wal)
+
+    def remove_files(self) -> None:
+        """关闭预写日志并删除持久化文件（排在已提交的写入之后）"""
+        self.writer.submit(self._close_wal)
+        self.writer.submit(lambda: _remove_files(self.snapshot_path, self.wal_path))
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        try:
+            line = json.dumps(entry, ensure_ascii=False) + "\n"
+        except (TypeError, ValueError) as e:
+            logger.warning(f"[狼人杀] 写入预写日志失败: {e}")
+            return
+        self.writer.submit(lambda: self._write_line(line))
+
+    # ==================== 后台线程中执行 ====================
+
+    def _write_snapshot(self, data: str, group_id: str) -> None:
+        try:
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            self._close_wal()
+            open(self.wal_path, "w").close()
+        except OSError as e:
+            logger.warning(f"[狼人杀] 保存房间 {group_id} 快照失败: {e}")
+
+    def _write_line(self, line: str) -> None:
+        try:
+            if self._wal is None:
+                self._wal = open(self.wal_path, "a", encoding="utf-8")
+            self._wal.write(line)
+            self._wal.flush()
+            self._pending += 1
+            if self._pending >= WAL_FSYNC_BATCH or time.monotonic() - self._last_sync >= WAL_FSYNC_INTERVAL:
+                self._sync()
+        except OSError as e:
+            logger.warning(f"[狼人杀] 写入预写日志失败: {e}")
+
+    def _sync(self) -> None:
+        """把已写入的记录刷到磁盘"""
+        if self._wal and self._pending:
+            os.fsync(self._wal.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _close_wal(self) -> None:
+        if self._wal is None:
+            return
+        try:
+            self._sync()
+            self._wal.close()
+        except OSError as e:
+            logger.warning(f"[狼人杀] 关闭预写日志失败: {e}")
+        self._wal = None
+
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"[狼人杀] 删除房间持久化文件失败: {e}")
+
+
+class RoomStore:
+    """进行中房间的持久化目录"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.writer = JournalWriter()
+
+    def attach(self, room: GameRoom) -> RoomJournal:
+        """为房间开启持久化并立即写入一次快照"""
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot_path, wal_path = self._paths(room.group_id)
+        journal = RoomJournal(snapshot_path, wal_path, self.writer)
+        room.journal = journal
+        journal.checkpoint(room)
+        return journal
+
+    def discard(self, room: GameRoom) -> None:
+        """房间结束后删除其持久化文件（排在该房间已提交的写入之后）"""
+        if room.journal:
+            room.journal.remove_files()
+            room.journal = None
+        else:
+            self.writer.submit(lambda: _remove_files(*self._paths(room.group_id)))
+
+    def flush(self) -> None:
+        """阻塞直到已提交的写入全部落盘（插件终止前在线程中调用）"""
+        self.writer.flush()
+
+    def load_all(self, config: GameConfig) -> List[GameRoom]:
+        """加载全部未结束的房间（快照 + 预写日志）"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        rooms = []
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".json"):
+                continue
+            snapshot_path = os.path.join(self.directory, filename)
+            try:
+                with open(snapshot_path, encoding="utf-8") as f:
+                    room = GameRoom.from_snapshot(json.load(f), config)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"[狼人杀] 读取房间快照 {filename} 失败: {e}")
+                continue
+            replayed = self._replay_wal(room, self._paths(room.group_id)[1])
+            rooms.append(room)
+            logger.info(
+                f"[狼人杀] 已加载群 {room.group_id} 的中断对局：{room.phase.value}，"
+                f"第{room.current_round}轮，预写日志 {replayed} 条"
+            )
+        return rooms
+
+    @staticmethod
+    def _replay_wal(room: GameRoom, wal_path: str) -> int:
+        """把快照之后的预写日志应用到房间，返回应用的条数"""
+        if not os.path.exists(wal_path):
+            return 0
+
+        count = 0
+        with open(wal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 崩溃时最后一行可能只写了一半
+                    logger.warning(f"[狼人杀] 群 {room.group_id} 预写日志末尾不完整，已忽略")
+                    break
+                if "event" in entry:
+                    apply_event(room, room.events.add_dict(entry["event"]))
+                else:
+                    RoomStore._apply_op(room, entry)
+                count += 1
+        return count
+
+    @staticmethod
+    def _apply_op(room: GameRoom, entry: Dict[str, Any]) -> None:
+        """应用一条群操作记录"""
+        op, player_id = entry.get("op"), entry.get("player", "")
+        if op == "ban":
+            room.banned_player_ids.add(player_id)
+        elif op == "unban":
+            room.banned_player_ids.discard(player_id)
+        elif op == "admin":
+            room.temp_admin_ids.add(player_id)
+        elif op == "unadmin":
+            room.temp_admin_ids.discard(player_id)
+        elif op == "card":
+            player = room.get_player(player_id)
+            if player and not player.original_card:
+                player.original_card = entry.get("original", "")
+
+    def _paths(self, group_id: str):
+        base = os.path.join(self.directory, str(group_id))
+        return f"{base}.json", f"{base}.wal"
@@ -16,13 +16,9 @@ class VictoryChecker:
         返回: (胜利消息, 胜利阵营) 或 (None, None) 表示游戏继续
         胜利阵营: "werewolf" 或 "villager"
         """
-        alive_players = room.get_alive_players()
-        alive_werewolves = [p for p in alive_players if p.is_werewolf]
-        alive_goods = [p for p in alive_players if p.is_good]
-        alive_gods = [p for p in alive_players if p.is_god]
-
-        werewolf_count = len(alive_werewolves)
-        good_count = len(alive_goods)
+        if room.config.debug_index_check:
+            room.check_indexes()
+        werewolf_count, good_count, god_count = room.alive_faction_counts()
 
         # 狼人全灭 -> 好人胜利
         if werewolf_count == 0:
@@ -33,7 +29,7 @@ class VictoryChecker:
             return "狼人胜利！好人数量不足！", "werewolf"
 
         # 神职全灭 -> 狼人胜利
-        if len(alive_gods) == 0 and werewolf_count > 0:
+        if god_count == 0 and werewolf_count > 0:
             return "狼人胜利！所有神职人员已出局！", "werewolf"
 
         # 游戏继续
@@ -0,0 +1,30 @@
+"""对局模拟 - 紧凑位掩码状态和规则函数，用于平衡性模拟和求解"""
+from .state import BitState, ROLE_CODES, CODE_ROLES, NO_SEAT
+from .rules import (
+    WEREWOLF_WIN,
+    VILLAGER_WIN,
+    check_victory,
+    tally,
+    resolve_wolf_kill,
+    resolve_night,
+    resolve_day_vote,
+)
+from .simulator import SimulationResult, simulate, play_game, wilson_interval
+
+__all__ = [
+    "BitState",
+    "ROLE_CODES",
+    "CODE_ROLES",
+    "NO_SEAT",
+    "WEREWOLF_WIN",
+    "VILLAGER_WIN",
+    "check_victory",
+    "tally",
+    "resolve_wolf_kill",
+    "resolve_night",
+    "resolve_day_vote",
+    "SimulationResult",
+    "simulate",
+    "play_game",
+    "wilson_interval",
+]
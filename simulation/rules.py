@@ -0,0 +1,126 @@
+"""对局规则（紧凑状态版）
+
+与实时流程保持一致：
+- 狼人刀人：得票最多者，平票随机（GameManager.process_night_kill）
+- 夜晚结算：女巫救人则刀口存活，否则刀口死亡；毒人必死；被毒的猎人不能开枪
+  （GameManager.process_witch_action、NightWitchPhase._handle_hunter_death）
+- 白天投票：弃票不计；平票进入PK，PK仍平票则无人出局（GameManager.process_day_vote）
+- 胜负判定：狼人全灭好人胜；好人数 ≤ 狼人数或神职全灭狼人胜（VictoryChecker.check）
+"""
+import random
+from typing import List, Optional, Sequence, Tuple
+
+from .state import (
+    BitState, HUNTER, HUNTER_POISONED, HUNTER_SHOT, NO_SEAT,
+    WITCH_ACTED, WITCH_ANTIDOTE_USED, WITCH_POISON_USED,
+)
+
+# 胜利阵营（与 VictoryChecker 返回值一致）
+WEREWOLF_WIN = "werewolf"
+VILLAGER_WIN = "villager"
+
+
+def check_victory(state: BitState) -> Optional[str]:
+    """胜负判定，返回胜利阵营或 None（游戏继续）"""
+    wolves = (state.alive & state.wolf_mask).bit_count()
+    if wolves == 0:
+        return VILLAGER_WIN
+    if (state.alive & state.good_mask).bit_count() <= wolves:
+        return WEREWOLF_WIN
+    if not state.alive & state.god_mask:
+        return WEREWOLF_WIN
+    return None
+
+
+def tally(targets: Sequence[int]) -> List[int]:
+    """统计票数（-1 为弃票），返回得票最多的座位（全部弃票时为空）"""
+    counts: dict = {}
+    for seat in targets:
+        if seat != NO_SEAT:
+            counts[seat] = counts.get(seat, 0) + 1
+    if not counts:
+        return []
+    top = max(counts.values())
+    return sorted(seat for seat, count in counts.items() if count == top)
+
+
+def resolve_wolf_kill(state: BitState, targets: Sequence[int], rng: random.Random) -> int:
+    """狼人刀人：得票最多者，平票随机；记录为本晚刀口并返回（无人投票时为 -1）"""
+    top = tally(targets)
+    state.killed = rng.choice(top) if top else NO_SEAT
+    return state.killed
+
+
+def witch_save(state: BitState) -> None:
+    """女巫救本晚刀口"""
+    state.saved = state.killed
+    state.witch |= WITCH_ANTIDOTE_USED | WITCH_ACTED
+
+
+def witch_poison(state: BitState, seat: int) -> None:
+    """女巫毒人"""
+    state.poison_target = seat
+    state.witch |= WITCH_POISON_USED | WITCH_ACTED
+
+
+def can_save(state: BitState) -> bool:
+    return not state.witch & (WITCH_ANTIDOTE_USED | WITCH_ACTED) and state.killed != NO_SEAT
+
+
+def can_poison(state: BitState) -> bool:
+    return not state.witch & (WITCH_POISON_USED | WITCH_ACTED)
+
+
+def resolve_night(state: BitState) -> Tuple[int, int]:
+    """夜晚结算（女巫行动后调用）
+
+    Returns:
+        (死亡座位掩码, 可开枪的猎人座位)，无猎人可开枪时为 -1
+    """
+    deaths = 0
+    shooter = NO_SEAT
+    if state.saved == NO_SEAT and state.killed != NO_SEAT:
+        deaths |= 1 << state.killed
+        if state.roles[state.killed] == HUNTER:
+            shooter = state.killed
+    else:
+        state.killed = NO_SEAT
+    if state.poison_target != NO_SEAT:
+        deaths |= 1 << state.poison_target
+        state.poisoned |= 1 << state.poison_target
+        if state.roles[state.poison_target] == HUNTER:
+            state.hunter |= HUNTER_POISONED
+            if shooter == state.poison_target:
+                shooter = NO_SEAT
+    state.alive &= ~deaths
+    if state.hunter & HUNTER_SHOT:
+        shooter = NO_SEAT
+    return deaths, shooter
+
+
+def resolve_day_vote(state: BitState, targets: Sequence[int], is_pk: bool = False) -> Tuple[int, List[int]]:
+    """白天投票结算
+
+    Returns:
+        (被放逐座位, PK座位列表)：有人出局时 PK 列表为空；首轮平票时返回 (-1, 平票座位)；
+        PK 平票或全部弃票时返回 (-1, [])
+    """
+    top = tally(targets)
+    if not top:
+        return NO_SEAT, []
+    if len(top) > 1:
+        return NO_SEAT, ([] if is_pk else top)
+    state.kill(top[0])
+    return top[0], []
+
+
+def hunter_can_shoot(state: BitState, seat: int) -> bool:
+    """座位上的猎人是否可以开枪"""
+    return state.roles[seat] == HUNTER and not state.hunter & (HUNTER_SHOT | HUNTER_POISONED)
+
+
+def hunter_shoot(state: BitState, target: int) -> None:
+    """猎人开枪（target 为 -1 表示不开枪）"""
+    state.hunter |= HUNTER_SHOT
+    if target != NO_SEAT:
+        state.kill(target)
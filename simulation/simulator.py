@@ -0,0 +1,326 @@
+"""平衡性模拟 - 规则型机器人自我对局，估计各板子配置的阵营胜率
+
+机器人不调用LLM，按简单策略行动：
+- 狼人：刀已跳身份的预言家，否则随机刀好人；白天按概率冲票跳出来的预言家，否则混在好人的票型里
+- 预言家：每晚随机查验未验过的玩家，第一个白天起跳报出全部金水/查杀（死亡留遗言时也会报出）
+- 女巫：第一晚必救，之后按概率用解药；毒已被报查杀的狼人，否则小概率随机用毒
+- 猎人：开枪带走已被报查杀的狼人，否则随机开枪
+- 好人（与 HeuristicBrain.vote 一致）：投被报查杀的狼人，否则跟当轮票数最多的人，
+  都没有时在未被报金水的玩家中随机投；不投跳出来的预言家和金水。
+  另外把投过跳出来的预言家的玩家视为嫌疑人，优先于票型投他们（公开票型中唯一的信息）
+
+流程与实时对局一致：第一晚被刀和被放逐有遗言，被毒的猎人不能开枪，
+平票进入PK（只能投平票玩家），PK仍平票无人出局；猎人开枪后再判定胜负。
+多局模拟按批分发到进程池，结果给出 Wilson 置信区间和每秒局数。
+"""
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from ..models import GameConfig
+from .rules import (
+    VILLAGER_WIN, WEREWOLF_WIN, can_poison, can_save, check_victory, hunter_can_shoot, hunter_shoot,
+    resolve_day_vote, resolve_night, resolve_wolf_kill, witch_poison, witch_save,
+)
+from .state import NO_SEAT, ROLE_CODES, SEER, WITCH, BitState
+
+# 超过该回合数仍未分出胜负时记为平局
+MAX_ROUNDS = 30
+# 每批模拟的局数（每个进程任务）
+BATCH_SIZE = 2000
+# 女巫非第一晚使用解药的概率
+WITCH_SAVE_RATE = 0.5
+# 无查杀信息时女巫随机用毒的概率
+WITCH_RANDOM_POISON_RATE = 0.1
+# 好人弃票概率
+ABSTAIN_RATE = 0.05
+# 预言家起跳后狼人白天冲票预言家的概率（否则跟好人的票型，避免暴露）
+WOLF_PUSH_SEER_RATE = 0.35
+# 默认板子（9人 3狼 + 预女猎 + 3民）狼人胜率的合理范围，超出说明机器人策略失衡
+PLAUSIBLE_WOLF_WIN_RATE = (0.3, 0.7)
+
+
+@dataclass
+class SimulationResult:
+    """模拟结果"""
+    roles: Tuple[int, ...]  # 角色代码池
+    games: int
+    werewolf_wins: int
+    villager_wins: int
+    draws: int
+    elapsed: float  # 耗时（秒）
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def win_rate(self, faction: str) -> Tuple[float, float, float]:
+        """阵营胜率及95%置信区间 (胜率, 下限, 上限)"""
+        wins = self.werewolf_wins if faction == WEREWOLF_WIN else self.villager_wins
+        low, high = wilson_interval(wins, self.games)
+        return (wins / self.games if self.games else 0.0), low, high
+
+    def format(self) -> str:
+        """渲染为文本报告"""
+        wolf, wolf_low, wolf_high = self.win_rate(WEREWOLF_WIN)
+        good, good_low, good_high = self.win_rate(VILLAGER_WIN)
+        return (
+            f"模拟 {self.games} 局，耗时 {self.elapsed:.1f}s（{self.games_per_second:.0f} 局/秒）\n"
+            f"狼人胜率：{wolf:.1%}（95%置信区间 {wolf_low:.1%} ~ {wolf_high:.1%}）\n"
+            f"好人胜率：{good:.1%}（95%置信区间 {good_low:.1%} ~ {good_high:.1%}）\n"
+            f"平局（超过{MAX_ROUNDS}轮）：{self.draws} 局"
+        )
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """二项比例的 Wilson 置信区间"""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+# ==================== 单局模拟 ====================
+
+class _Game:
+    """一局模拟（状态 + 公开信息）"""
+
+    __slots__ = ("state", "rng", "seer", "witch", "seer_found", "revealed", "cleared", "suspects", "seer_claimed")
+
+    def __init__(self, roles: List[int], rng: random.Random):
+        self.rng = rng
+        self.state = BitState(roles)
+        self.seer = self.state.first_seat(SEER)
+        self.witch = self.state.first_seat(WITCH)
+        self.seer_found = 0     # 预言家查到的狼人（私有）
+        self.revealed = 0       # 已公开报出的狼人
+        self.cleared = 0        # 已公开报出的金水
+        self.suspects = 0       # 投过跳出来的预言家的玩家（公开票型）
+        self.seer_claimed = False  # 预言家是否已跳身份
+
+    def play(self) -> Optional[str]:
+        """进行一局，返回胜利阵营（超过回合上限为 None）"""
+        state = self.state
+        while state.round <= MAX_ROUNDS:
+            winner = self._night()
+            if winner:
+                return winner
+            winner = self._day()
+            if winner:
+                return winner
+            state.first_night = False
+            state.start_night()
+        return None
+
+    # ---------- 夜晚 ----------
+
+    def _night(self) -> Optional[str]:
+        state, rng = self.state, self.rng
+
+        # 狼人刀人（每只存活狼人投一票）
+        if self.seer_claimed and state.is_alive(self.seer):
+            target = self.seer
+        else:
+            target = rng.choice(state.alive_seats(state.good_mask))
+        resolve_wolf_kill(state, [target] * state.alive_count(state.wolf_mask), rng)
+
+        # 预言家查验
+        if self.seer != NO_SEAT and state.is_alive(self.seer):
+            candidates = state.alive_seats(~(state.checked | 1 << self.seer))
+            if candidates:
+                seat = rng.choice(candidates)
+                state.checked |= 1 << seat
+                if state.wolf_mask >> seat & 1:
+                    self.seer_found |= 1 << seat
+
+        # 女巫（存活或今晚被刀时可行动）
+        witch = self.witch
+        if witch != NO_SEAT and state.is_alive(witch):
+            if can_save(state) and (state.first_night or rng.random() < WITCH_SAVE_RATE):
+                witch_save(state)
+            elif can_poison(state):
+                known = state.alive_seats(self.revealed)
+                if known:
+                    witch_poison(state, rng.choice(known))
+                elif rng.random() < WITCH_RANDOM_POISON_RATE:
+                    others = state.alive_seats(~(1 << witch))
+                    witch_poison(state, rng.choice(others))
+
+        _, shooter = resolve_night(state)
+
+        # 第一晚被刀的玩家有遗言（预言家遗言报出查杀）
+        if state.first_night and state.killed != NO_SEAT:
+            self._last_words(state.killed)
+
+        # 猎人开枪优先于胜负判定
+        if shooter != NO_SEAT:
+            self._hunter_shoot(shooter)
+        return check_victory(state)
+
+    # ---------- 白天 ----------
+
+    def _day(self) -> Optional[str]:
+        state = self.state
+
+        # 预言家第一个白天起跳，每天报出全部金水/查杀
+        if self.seer != NO_SEAT and state.is_alive(self.seer):
+            self._seer_report()
+
+        exiled, pk = resolve_day_vote(state, self._votes(state.alive_seats()))
+        if pk:
+            exiled, _ = resolve_day_vote(state, self._votes(pk), is_pk=True)
+        if exiled == NO_SEAT:
+            return None
+
+        # 被放逐的猎人开枪，然后判定胜负；否则先判定胜负再留遗言
+        if hunter_can_shoot(state, exiled):
+            self._hunter_shoot(exiled)
+            winner = check_victory(state)
+            if winner:
+                return winner
+            self._last_words(exiled)
+            return None
+        winner = check_victory(state)
+        if not winner:
+            self._last_words(exiled)
+        return winner
+
+    def _votes(self, candidates: Sequence[int]) -> List[int]:
+        """所有存活玩家依次投票（只能投给 candidates 中的玩家，后投的人能看到之前的票型）"""
+        state, rng = self.state, self.rng
+        known = [seat for seat in candidates if self.revealed >> seat & 1]
+        seer_target = self.seer if self.seer_claimed and self.seer in candidates else NO_SEAT
+        trusted = self.cleared | (1 << self.seer if self.seer_claimed else 0)
+        counts = [0] * state.n
+        votes = []
+        for voter in state.alive_seats():
+            options = [seat for seat in candidates if seat != voter]
+            if not options:
+                vote = NO_SEAT
+            elif state.wolf_mask >> voter & 1:
+                goods = [seat for seat in options if not state.wolf_mask >> seat & 1] or options
+                if seer_target != NO_SEAT and seer_target != voter and rng.random() < WOLF_PUSH_SEER_RATE:
+                    vote = seer_target
+                else:
+                    vote = self._bloc(counts, goods) if max(counts) else rng.choice(goods)
+            else:
+                allowed = [seat for seat in options if not trusted >> seat & 1] or options
+                targets = [seat for seat in known if seat != voter]
+                suspects = [seat for seat in allowed if self.suspects >> seat & 1]
+                if targets:
+                    vote = targets[0]
+                elif suspects:
+                    vote = self._bloc(counts, suspects)
+                elif max(counts):
+                    vote = self._bloc(counts, allowed)
+                elif rng.random() < ABSTAIN_RATE:
+                    vote = NO_SEAT
+                else:
+                    vote = rng.choice(allowed)
+            if vote != NO_SEAT:
+                counts[vote] += 1
+                if vote == seer_target:
+                    self.suspects |= 1 << voter
+            votes.append(vote)
+        return votes
+
+    @staticmethod
+    def _bloc(counts: List[int], options: Sequence[int]) -> int:
+        """options 中当前得票最多的（同票取编号小的；都没有票时取第一个）"""
+        return max(options, key=lambda seat: (counts[seat], -seat))
+
+    def _seer_report(self) -> None:
+        """预言家公开全部查验结果"""
+        state = self.state
+        self.seer_claimed = True
+        self.revealed |= self.seer_found
+        self.cleared |= state.checked & ~state.wolf_mask
+
+    def _last_words(self, seat: int) -> None:
+        """遗言：预言家报出全部查验"""
+        if seat == self.seer:
+            self._seer_report()
+
+    def _hunter_shoot(self, hunter: int) -> None:
+        state = self.state
+        known = state.alive_seats(self.revealed)
+        others = state.alive_seats(~(1 << hunter))
+        target = self.rng.choice(known or others) if others else NO_SEAT
+        hunter_shoot(state, target)
+
+
+def play_game(roles: Sequence[int], rng: random.Random) -> Optional[str]:
+    """随机分配座位后模拟一局，返回胜利阵营（平局为 None）"""
+    seats = list(roles)
+    rng.shuffle(seats)
+    return _Game(seats, rng).play()
+
+
+def _run_batch(roles: Tuple[int, ...], games: int, seed: int) -> Tuple[int, int, int]:
+    """进程池任务：模拟一批对局，返回 (狼人胜, 好人胜, 平局)"""
+    rng = random.Random(seed)
+    wolf = good = draw = 0
+    for _ in range(games):
+        winner = play_game(roles, rng)
+        if winner == WEREWOLF_WIN:
+            wolf += 1
+        elif winner == VILLAGER_WIN:
+            good += 1
+        else:
+            draw += 1
+    return wolf, good, draw
+
+
+# ==================== 入口 ====================
+
+def simulate(
+    config: GameConfig,
+    games: int = 100000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """按配置的角色数量模拟多局
+
+    Args:
+        config: 游戏配置（只使用各角色数量）
+        games: 模拟局数
+        workers: 进程数（None 为CPU核数，1 为在当前进程中运行）
+        seed: 随机种子（相同种子和进程数下结果可复现）
+
+    Raises:
+        ValueError: 配置无效（角色总数不等于总人数、没有狼人或没有好人）
+    """
+    if not config.validate():
+        raise ValueError("角色数量之和与总人数不一致")
+    roles = tuple(ROLE_CODES[role] for role in config.get_roles_pool())
+    if config.werewolf_count == 0 or config.werewolf_count == len(roles):
+        raise ValueError("至少需要一名狼人和一名好人")
+
+    base_seed = seed if seed is not None else random.randrange(1 << 30)
+    batches = [min(BATCH_SIZE, games - start) for start in range(0, games, BATCH_SIZE)]
+    seeds = [base_seed + i for i in range(len(batches))]
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_run_batch(roles, n, s) for n, s in zip(batches, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_batch, [roles] * len(batches), batches, seeds))
+    elapsed = time.perf_counter() - start
+
+    return SimulationResult(
+        roles=roles,
+        games=games,
+        werewolf_wins=sum(r[0] for r in results),
+        villager_wins=sum(r[1] for r in results),
+        draws=sum(r[2] for r in results),
+        elapsed=elapsed,
+    )
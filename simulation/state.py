@@ -0,0 +1,187 @@
+"""紧凑对局状态 - 按座位编号的角色数组 + 位掩码，用于大量模拟
+
+与 GameRoom 对应关系：
+- 座位 i 对应编号 i+1 的玩家，roles[i] 为角色代码（ROLE_CODES）
+- alive / checked / poisoned 为位掩码（第 i 位对应座位 i）
+- witch / hunter 状态各压缩为一个整数（见 WITCH_* / HUNTER_* 位）
+- 本晚刀口、救人、毒人为座位号，-1 表示无
+
+角色数组和阵营掩码开局后不变，clone 时共享，只复制可变的整数字段。
+"""
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from ..models import EventType, GameConfig, GamePhase, Player, Role
+
+if TYPE_CHECKING:
+    from ..models import GameRoom
+
+# 角色代码（座位角色数组中的取值）
+WEREWOLF, SEER, WITCH, HUNTER, VILLAGER = range(5)
+ROLE_CODES = {Role.WEREWOLF: WEREWOLF, Role.SEER: SEER, Role.WITCH: WITCH, Role.HUNTER: HUNTER, Role.VILLAGER: VILLAGER}
+CODE_ROLES = {code: role for role, code in ROLE_CODES.items()}
+
+# 女巫状态位
+WITCH_ANTIDOTE_USED = 1
+WITCH_POISON_USED = 2
+WITCH_ACTED = 4
+
+# 猎人状态位
+HUNTER_SHOT = 1
+HUNTER_POISONED = 2  # 被毒死，不能开枪
+
+NO_SEAT = -1
+
+
+class BitState:
+    """紧凑对局状态"""
+
+    __slots__ = (
+        "roles", "n", "wolf_mask", "god_mask", "good_mask", "role_masks",
+        "alive", "checked", "poisoned", "witch", "hunter",
+        "round", "first_night", "killed", "saved", "poison_target",
+    )
+
+    def __init__(self, roles: Sequence[int]):
+        self.roles: Tuple[int, ...] = tuple(roles)
+        self.n = len(self.roles)
+        self.role_masks: Tuple[int, ...] = tuple(
+            sum(1 << i for i, r in enumerate(self.roles) if r == code) for code in range(len(CODE_ROLES))
+        )
+        self.wolf_mask = self.role_masks[WEREWOLF]
+        self.god_mask = self.role_masks[SEER] | self.role_masks[WITCH] | self.role_masks[HUNTER]
+        self.good_mask = ((1 << self.n) - 1) & ~self.wolf_mask
+
+        self.alive = (1 << self.n) - 1
+        self.checked = 0       # 已被查验的座位
+        self.poisoned = 0      # 被毒死的座位
+        self.witch = 0
+        self.hunter = 0
+        self.round = 1
+        self.first_night = True
+        self.killed = NO_SEAT  # 本晚狼人刀口
+        self.saved = NO_SEAT   # 本晚女巫救的座位
+        self.poison_target = NO_SEAT  # 本晚女巫毒的座位
+
+    def clone(self) -> "BitState":
+        """复制（角色数组和掩码共享，只复制可变字段）"""
+        other = BitState.__new__(BitState)
+        other.roles = self.roles
+        other.n = self.n
+        other.role_masks = self.role_masks
+        other.wolf_mask = self.wolf_mask
+        other.god_mask = self.god_mask
+        other.good_mask = self.good_mask
+        other.alive = self.alive
+        other.checked = self.checked
+        other.poisoned = self.poisoned
+        other.witch = self.witch
+        other.hunter = self.hunter
+        other.round = self.round
+        other.first_night = self.first_night
+        other.killed = self.killed
+        other.saved = self.saved
+        other.poison_target = self.poison_target
+        return other
+
+    # ==================== 查询 ====================
+
+    def is_alive(self, seat: int) -> bool:
+        return bool(self.alive >> seat & 1)
+
+    def alive_seats(self, mask: int = -1) -> List[int]:
+        """存活座位列表（可用掩码过滤）"""
+        bits, seats = self.alive & mask, []
+        while bits:
+            low = bits & -bits
+            seats.append(low.bit_length() - 1)
+            bits ^= low
+        return seats
+
+    def first_seat(self, code: int) -> int:
+        """某角色编号最小的座位（无该角色时为 -1）"""
+        mask = self.role_masks[code]
+        return (mask & -mask).bit_length() - 1 if mask else NO_SEAT
+
+    def alive_count(self, mask: int = -1) -> int:
+        return (self.alive & mask).bit_count()
+
+    def kill(self, seat: int) -> None:
+        self.alive &= ~(1 << seat)
+
+    def start_night(self) -> None:
+        """开始新的夜晚（对应 GameRoom.start_new_night）"""
+        self.round += 1
+        self.killed = self.saved = self.poison_target = NO_SEAT
+        self.witch &= ~WITCH_ACTED
+
+    # ==================== 与 GameRoom 互转 ====================
+
+    @classmethod
+    def from_room(cls, room: "GameRoom") -> Tuple["BitState", List[str]]:
+        """由房间生成紧凑状态，返回 (状态, 按座位排列的玩家ID)"""
+        players = sorted(room.players.values(), key=lambda p: p.number)
+        seat_of = {p.id: i for i, p in enumerate(players)}
+        state = cls([ROLE_CODES[p.role] for p in players])
+        state.alive = sum(1 << i for i, p in enumerate(players) if p.is_alive)
+        state.round = max(room.current_round, 1)
+        state.first_night = room.is_first_night
+
+        ws, hs = room.witch_state, room.hunter_state
+        state.witch = (
+            (WITCH_ANTIDOTE_USED if ws.antidote_used else 0)
+            | (WITCH_POISON_USED if ws.poison_used else 0)
+            | (WITCH_ACTED if ws.has_acted else 0)
+        )
+        state.hunter = (HUNTER_SHOT if hs.has_shot else 0) | (
+            HUNTER_POISONED if hs.death_type is not None and hs.death_type.value == "poison" else 0
+        )
+        state.killed = seat_of.get(room.last_killed_id, NO_SEAT)
+        state.saved = seat_of.get(ws.saved_player_id, NO_SEAT)
+        state.poison_target = seat_of.get(ws.poisoned_player_id, NO_SEAT)
+
+        # 被查验过、被毒死的座位分别由查验事件和死亡事件得出
+        seat_by_name = {p.display_name: i for i, p in enumerate(players)}
+        for event in room.events.of_type(EventType.CHECK):
+            if event.target in seat_by_name:
+                state.checked |= 1 << seat_by_name[event.target]
+        for event in room.events.of_type(EventType.DEATH):
+            if event.data.get("cause") == "poison" and event.target in seat_by_name:
+                state.poisoned |= 1 << seat_by_name[event.target]
+        return state, [p.id for p in players]
+
+    def to_room(self, config: Optional[GameConfig] = None, names: Optional[Sequence[str]] = None) -> "GameRoom":
+        """生成等价的房间（玩家ID为 sim_{编号}，用于调试和把模拟局面交给真实流程）"""
+        from ..models import GameRoom
+        from ..roles import HunterDeathType
+
+        room = GameRoom(group_id="simulation", creator_id="", config=config or GameConfig())
+        for seat, code in enumerate(self.roles):
+            number = seat + 1
+            name = names[seat] if names else f"P{number}"
+            player = Player(f"sim_{number}", name, number, is_alive=self.is_alive(seat))
+            player.assign_role(CODE_ROLES[code])
+            room.add_player(player)
+            room.number_to_player[number] = player.id
+        room.current_round = self.round
+        room.is_first_night = self.first_night
+        room.phase = GamePhase.NIGHT_WOLF
+
+        def seat_id(seat: int) -> Optional[str]:
+            return f"sim_{seat + 1}" if seat != NO_SEAT else None
+
+        room.last_killed_id = seat_id(self.killed)
+        room.witch_state.antidote_used = bool(self.witch & WITCH_ANTIDOTE_USED)
+        room.witch_state.poison_used = bool(self.witch & WITCH_POISON_USED)
+        room.witch_state.has_acted = bool(self.witch & WITCH_ACTED)
+        room.witch_state.saved_player_id = seat_id(self.saved)
+        room.witch_state.poisoned_player_id = seat_id(self.poison_target)
+        room.hunter_state.has_shot = bool(self.hunter & HUNTER_SHOT)
+        if self.hunter & HUNTER_POISONED:
+            room.hunter_state.death_type = HunterDeathType.POISON
+        return room
+
+    def __repr__(self) -> str:
+        return (
+            f"BitState(n={self.n}, round={self.round}, alive={self.alive:0{self.n}b}, "
+            f"witch={self.witch:03b}, hunter={self.hunter:02b})"
+        )